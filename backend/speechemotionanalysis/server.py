@@ -3,8 +3,12 @@ import logging
 import os
 import random
 import re
+import sys
+import threading
 import time
 import uuid
+import wave
+from array import array
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional
 
@@ -16,7 +20,8 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 import requests
-from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi import FastAPI, File, HTTPException, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
 from openai import OpenAI
@@ -31,6 +36,20 @@ HUME_API_BASE = "https://api.hume.ai/v0"
 HUME_JOB_TIMEOUT_SECONDS = 60
 HUME_POLL_INTERVAL_SECONDS = 1
 
+# Streaming upload (/analyze/stream): PCM format the game's recorder sends, and how
+# long an unfinished stream may sit idle before it is dropped.
+STREAM_SAMPLE_RATE = 16000
+STREAM_SAMPLE_WIDTH = 2
+STREAM_CHANNELS = 1
+STREAM_IDLE_TIMEOUT_SECONDS = 120
+
+# Same low-level boost record_to_wav.py applies to whole-file uploads.
+# (Hume sometimes returns empty transcript when audio is too quiet.)
+GAIN_PEAK_THRESHOLD = 8000
+GAIN_TARGET_PEAK = 20000
+GAIN_MAX = 8.0
+SILENCE_PEAK_THRESHOLD = 100
+
 # Story reason for Stage 1 answer evaluation
 CORRECT_REASON = "She had a dream where her boyfriend cheated on her."
 OPENAI_MODEL = "gpt-4o-mini"
@@ -353,6 +372,164 @@ def analyze(file: UploadFile = File(...)) -> Dict[str, Any]:
     wav_size_bytes = file_path.stat().st_size
     print(f"[analyze]   saved WAV  file_id={file_id}  size={wav_size_bytes} bytes", flush=True)
 
+    return _analyze_saved_wav(hume_api_key, file_id, file_path, wav_size_bytes)
+
+
+class _AudioStream:
+    """One in-progress /analyze/stream upload, appended to a WAV file chunk by chunk."""
+
+    def __init__(self, file_id: str, file_path: Path) -> None:
+        self.file_id = file_id
+        self.file_path = file_path
+        self.lock = threading.Lock()
+        self.peak = 0
+        self.bytes_received = 0
+        self.chunks = 0
+        self.last_seen = time.time()
+        self._writer = wave.open(str(file_path), "wb")
+        self._writer.setnchannels(STREAM_CHANNELS)
+        self._writer.setsampwidth(STREAM_SAMPLE_WIDTH)
+        self._writer.setframerate(STREAM_SAMPLE_RATE)
+
+    def append(self, pcm: bytes) -> None:
+        if len(pcm) % STREAM_SAMPLE_WIDTH:
+            raise HTTPException(status_code=400, detail="chunk is not whole 16-bit samples")
+        with self.lock:
+            if self._writer is None:
+                raise HTTPException(status_code=409, detail="stream already finished")
+            if pcm:
+                self.peak = max(self.peak, _pcm16_peak(pcm))
+                self._writer.writeframesraw(pcm)
+                self.bytes_received += len(pcm)
+                self.chunks += 1
+            self.last_seen = time.time()
+
+    def close(self) -> None:
+        with self.lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+
+_streams: Dict[str, _AudioStream] = {}
+_streams_lock = threading.Lock()
+
+
+def _pcm16_peak(pcm: bytes) -> int:
+    samples = array("h", pcm)
+    if sys.byteorder == "big":
+        samples.byteswap()
+    if not samples:
+        return 0
+    return max(max(samples), -min(samples))
+
+
+def _drop_stale_streams() -> None:
+    cutoff = time.time() - STREAM_IDLE_TIMEOUT_SECONDS
+    with _streams_lock:
+        stale = [sid for sid, st in _streams.items() if st.last_seen < cutoff]
+        dropped = [_streams.pop(sid) for sid in stale]
+    for st in dropped:
+        st.close()
+        _safe_delete_file(st.file_path)
+        print(f"[analyze/stream]   dropped idle stream {st.file_id}", flush=True)
+
+
+def _get_stream(stream_id: str) -> _AudioStream:
+    with _streams_lock:
+        st = _streams.get(stream_id)
+    if st is None:
+        raise HTTPException(status_code=404, detail="stream not found")
+    return st
+
+
+@app.post("/analyze/stream")
+def analyze_stream_start() -> Dict[str, Any]:
+    """Open a streaming upload. The client then POSTs raw 16 kHz mono 16-bit PCM chunks."""
+    _drop_stale_streams()
+    file_id = uuid.uuid4().hex
+    st = _AudioStream(file_id, UPLOAD_DIR / f"{file_id}.wav")
+    with _streams_lock:
+        _streams[file_id] = st
+    print(f"[analyze/stream] ▶ START  stream_id={file_id}", flush=True)
+    return {
+        "stream_id": file_id,
+        "sample_rate": STREAM_SAMPLE_RATE,
+        "sample_width": STREAM_SAMPLE_WIDTH,
+        "channels": STREAM_CHANNELS,
+    }
+
+
+@app.post("/analyze/stream/{stream_id}/chunk")
+async def analyze_stream_chunk(stream_id: str, request: Request) -> Dict[str, Any]:
+    pcm = await request.body()
+    # The WAV writes (and closing idle streams) block, so keep them off the event loop.
+    st = await run_in_threadpool(_append_chunk, stream_id, pcm)
+    return {"stream_id": stream_id, "bytes_received": st.bytes_received}
+
+
+def _append_chunk(stream_id: str, pcm: bytes) -> _AudioStream:
+    # Drop abandoned streams on every chunk too, not only when a new stream starts.
+    _drop_stale_streams()
+    st = _get_stream(stream_id)
+    st.append(pcm)
+    return st
+
+
+@app.post("/analyze/stream/{stream_id}/finish")
+async def analyze_stream_finish(stream_id: str, request: Request) -> Dict[str, Any]:
+    """Append the (optional) final chunk, close the WAV and run the same analysis as /analyze."""
+    pcm = await request.body()
+    st = await run_in_threadpool(_close_stream, stream_id, pcm)
+    print(
+        f"[analyze/stream] ■ FINISH  stream_id={stream_id}  chunks={st.chunks}  bytes={st.bytes_received}  peak={st.peak}",
+        flush=True,
+    )
+
+    hume_api_key = _get_setting("HUME_API_KEY")
+    if not hume_api_key:
+        _safe_delete_file(st.file_path)
+        print("[analyze/stream] ✗ HUME_API_KEY not set", flush=True)
+        raise HTTPException(status_code=500, detail="HUME_API_KEY is required")
+    if st.peak < SILENCE_PEAK_THRESHOLD:
+        _safe_delete_file(st.file_path)
+        raise HTTPException(status_code=400, detail=f"Recorded audio is silence (peak={st.peak})")
+
+    return await run_in_threadpool(_finish_stream, hume_api_key, st)
+
+
+def _close_stream(stream_id: str, pcm: bytes) -> _AudioStream:
+    st = _get_stream(stream_id)
+    st.append(pcm)
+    with _streams_lock:
+        _streams.pop(stream_id, None)
+    st.close()
+    return st
+
+
+def _finish_stream(hume_api_key: str, st: _AudioStream) -> Dict[str, Any]:
+    if 0 < st.peak < GAIN_PEAK_THRESHOLD:
+        _apply_gain_in_place(st.file_path, min(GAIN_MAX, GAIN_TARGET_PEAK / float(st.peak)))
+    wav_size_bytes = st.file_path.stat().st_size
+    return _analyze_saved_wav(hume_api_key, st.file_id, st.file_path, wav_size_bytes)
+
+
+def _apply_gain_in_place(file_path: Path, gain: float) -> None:
+    with wave.open(str(file_path), "rb") as wf:
+        params = wf.getparams()
+        samples = array("h", wf.readframes(wf.getnframes()))
+    if sys.byteorder == "big":
+        samples.byteswap()
+    scaled = array("h", (max(-32768, min(32767, int(s * gain))) for s in samples))
+    if sys.byteorder == "big":
+        scaled.byteswap()
+    with wave.open(str(file_path), "wb") as wf:
+        wf.setparams(params)
+        wf.writeframes(scaled.tobytes())
+
+
+def _analyze_saved_wav(hume_api_key: str, file_id: str, file_path: Path, wav_size_bytes: int) -> Dict[str, Any]:
+    """Run the Hume job for a WAV already on disk and build the /analyze response."""
     predictions: Any
     try:
         print(f"[analyze] → submitting job to Hume...", flush=True)
@@ -1,4 +1,5 @@
 import argparse
+import importlib.util
 import json
 import math
 import os
@@ -15,6 +16,17 @@ import mediapipe as mp
 from mediapipe.tasks.python import BaseOptions  # type: ignore
 from mediapipe.tasks.python import vision  # type: ignore
 
+# EMA / hysteresis / event counting are shared with the game (renpy/Applogize/game/smoothing.py),
+# which computes per-stage statistics from the --stream-file samples with the same code.
+# The file is loaded by path, as putting the game directory on sys.path would let its
+# bundled modules shadow the standard library and site-packages.
+_SMOOTHING_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "renpy", "Applogize", "game", "smoothing.py")
+_smoothing_spec = importlib.util.spec_from_file_location("smoothing", _SMOOTHING_PATH)
+smoothing = importlib.util.module_from_spec(_smoothing_spec)
+sys.modules["smoothing"] = smoothing
+_smoothing_spec.loader.exec_module(smoothing)
+from smoothing import SMILE_EVENT_RESET, SMILE_EVENT_THRESHOLD, Ema, EventCounter, Hysteresis, clamp01, ema_alpha  # noqa: E402
+
 
 # ---------------------------------------------------------------------
 # Landmark indices / connections (no mp.solutions dependency)
@@ -229,16 +241,6 @@ def heart_params_from_sensitivity(sensitivity: float) -> HeartParams:
     )
 
 
-def clamp01(x: float) -> float:
-    return max(0.0, min(1.0, float(x)))
-
-
-def ema_alpha(dt_ms: float, tau_ms: float) -> float:
-    dt = max(0.0, float(dt_ms))
-    tau = max(1.0, float(tau_ms))
-    return 1.0 - math.exp(-dt / tau)
-
-
 def blendshapes_to_map(categories: Sequence[Any]) -> Dict[str, float]:
     out: Dict[str, float] = {}
     for c in categories or []:
@@ -745,19 +747,6 @@ def compute_look_away_combined(
     return {**scores, "eyeRaw": eye_raw, "headRaw": head_raw}
 
 
-def update_looking_away_bool(prev: bool, look_away_score: float) -> bool:
-    if prev:
-        return look_away_score > LOOK_OFF
-    return look_away_score > LOOK_ON
-
-
-def update_heart_bool(prev: bool, heart_score: float, params: Optional[HeartParams] = None) -> bool:
-    p = params or HeartParams()
-    if prev:
-        return float(heart_score) > float(p.off_t)
-    return float(heart_score) > float(p.on_t)
-
-
 def pick_dialog_line(face_present: bool, looking_away: bool, smile: float) -> str:
     if not face_present:
         return "I can't see your face…"
@@ -1053,6 +1042,11 @@ def run(args: argparse.Namespace) -> int:
         cap.set(cv2.CAP_PROP_FRAME_HEIGHT, int(args.height))
 
     smoothed = SmoothedSignals()
+    smile_ema = Ema(SCORE_TAU_MS, low=0.0, high=1.0)
+    sadness_ema = Ema(SCORE_TAU_MS, low=0.0, high=1.0)
+    look_away_ema = Ema(SCORE_TAU_MS, low=0.0, high=1.0)
+    heart_ema = Ema(SCORE_TAU_MS, low=0.0, high=1.0)
+    looking_away_gate = Hysteresis(LOOK_ON, LOOK_OFF)
     calib = CalibrationState()
     dialog = DialogState(current="Apologize properly.", since_ms=time.perf_counter() * 1000.0)
     prev_ms = time.perf_counter() * 1000.0
@@ -1066,6 +1060,13 @@ def run(args: argparse.Namespace) -> int:
     json_interval_ms = 1000.0 / max(1.0, float(args.json_rate_hz))
 
     output_file = getattr(args, "output_file", None)
+    stream = None
+    stream_file = getattr(args, "stream_file", None)
+    if stream_file:
+        stream_path = os.path.abspath(os.path.expanduser(stream_file))
+        if os.path.dirname(stream_path):
+            os.makedirs(os.path.dirname(stream_path), exist_ok=True)
+        stream = open(stream_path, "w", encoding="utf-8")  # one session per file
     screenshot_dir = getattr(args, "screenshot_dir", None)
     screenshot_count = 0
     if screenshot_dir:
@@ -1077,17 +1078,15 @@ def run(args: argparse.Namespace) -> int:
                     screenshot_count = max(screenshot_count, int(m.group(1)))
     last_screenshot_ms = 0.0
     SCREENSHOT_COOLDOWN_MS = 3000.0
-    smile_count = 0
+    smile_events = EventCounter(SMILE_EVENT_THRESHOLD, SMILE_EVENT_RESET)
     heart_detected_once = False
     gesture = "—"  # fallback if loop exits before assignment
-    smile_was_above = False
-    SMILE_EVENT_THRESHOLD = 0.50
-    SMILE_EVENT_RESET = 0.35
     last_output_write_ms = 0.0
     OUTPUT_WRITE_INTERVAL_MS = 500.0  # write smile_count to file every 0.5s
 
     debug = bool(args.debug)
     heart_params = heart_params_from_sensitivity(float(getattr(args, "heart_sensitivity", 1.0)))
+    heart_gate = Hysteresis(heart_params.on_t, heart_params.off_t)
 
     window_name = args.window_title
     cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
@@ -1206,23 +1205,18 @@ def run(args: argparse.Namespace) -> int:
 
             # Smooth + hysteresis
             a = ema_alpha(dt_ms, SCORE_TAU_MS)
-            smoothed.smile = clamp01(smoothed.smile + a * (raw_smile - smoothed.smile))
-            smoothed.sadness = clamp01(smoothed.sadness + a * (raw_sadness - smoothed.sadness))
+            smoothed.smile = smile_ema.step(raw_smile, a)
+            smoothed.sadness = sadness_ema.step(raw_sadness, a)
 
             # Smile event counting (for output_file / Ren'Py integration)
-            if output_file:
-                if smile_was_above and smoothed.smile < SMILE_EVENT_RESET:
-                    smile_was_above = False
-                elif not smile_was_above and smoothed.smile >= SMILE_EVENT_THRESHOLD:
-                    smile_count += 1
-                    smile_was_above = True
-            smoothed.look_away_score = clamp01(smoothed.look_away_score + a * (raw_look_away - smoothed.look_away_score))
-            smoothed.looking_away = update_looking_away_bool(smoothed.looking_away, smoothed.look_away_score)
+            smile_events.update(smoothed.smile)
+            smoothed.look_away_score = look_away_ema.step(raw_look_away, a)
+            smoothed.looking_away = looking_away_gate.update(smoothed.look_away_score)
             smoothed.hand_present = bool(hand_present)
             smoothed.open_palm = bool(hand_present and raw_open_palm)
             smoothed.thumbs_up = bool(hand_present and raw_thumbs_up)
-            smoothed.heart_score = clamp01(smoothed.heart_score + a * (float(raw_heart_score) - smoothed.heart_score))
-            smoothed.heart = bool(hand_present and update_heart_bool(smoothed.heart, smoothed.heart_score, params=heart_params))
+            smoothed.heart_score = heart_ema.step(raw_heart_score, a)
+            smoothed.heart = heart_gate.update(smoothed.heart_score) if hand_present else heart_gate.reset()
             if smoothed.heart:
                 heart_detected_once = True
 
@@ -1285,7 +1279,7 @@ def run(args: argparse.Namespace) -> int:
                         print(f"[tracker] Screenshot failed: {e}", file=sys.stderr)
 
             hud_lines = [
-                f"Smile: {smoothed.smile:.2f}" + (f"  Events: {smile_count}" if output_file else ""),
+                f"Smile: {smoothed.smile:.2f}" + (f"  Events: {smile_events.count}" if output_file else ""),
                 f"Sad: {smoothed.sadness:.2f}",
                 f"LookAway: {smoothed.look_away_score:.2f}  LookingAway: {'YES' if smoothed.looking_away else 'NO'}",
                 f"Hand: {'YES' if smoothed.hand_present else 'NO'}  Gesture: {gesture}  Heart: {smoothed.heart_score:.2f}",
@@ -1313,7 +1307,7 @@ def run(args: argparse.Namespace) -> int:
                         os.makedirs(out_dir, exist_ok=True)
                     with open(out_path, "w", encoding="utf-8") as f:
                         json.dump({
-                            "smile_count": smile_count,
+                            "smile_count": smile_events.count,
                             "heart_detected": heart_detected_once,
                             "gesture": gesture,
                             "smile": round(smoothed.smile, 4),
@@ -1323,8 +1317,8 @@ def run(args: argparse.Namespace) -> int:
                 except Exception:  # noqa: BLE001
                     pass
 
-            # Optional JSON Lines (for Ren'Py later)
-            if json_enabled and (now_ms - last_json_ms) >= json_interval_ms:
+            # Optional JSON Lines: stdout (--json) and/or the sample stream Ren'Py summarizes per stage
+            if (json_enabled or stream is not None) and (now_ms - last_json_ms) >= json_interval_ms:
                 last_json_ms = now_ms
                 payload = {
                     "ts": round(now_ms / 1000.0, 6),
@@ -1338,8 +1332,13 @@ def run(args: argparse.Namespace) -> int:
                     "heart": bool(smoothed.heart),
                     "dialog": dialog_line,
                 }
-                sys.stdout.write(json.dumps(payload, ensure_ascii=False) + "\n")
-                sys.stdout.flush()
+                line = json.dumps(payload, ensure_ascii=False) + "\n"
+                if json_enabled:
+                    sys.stdout.write(line)
+                    sys.stdout.flush()
+                if stream is not None:
+                    stream.write(line)
+                    stream.flush()  # the game stops the tracker with pkill
 
             # Display at 25% size (both apology "Talk to her" and grab_one_last_chance use this)
             display_frame = cv2.resize(frame_bgr, None, fx=0.4, fy=0.4, interpolation=cv2.INTER_LINEAR)
@@ -1374,7 +1373,7 @@ def run(args: argparse.Namespace) -> int:
                     os.makedirs(out_dir, exist_ok=True)
                 with open(out_path, "w", encoding="utf-8") as f:
                     json.dump({
-                        "smile_count": smile_count,
+                        "smile_count": smile_events.count,
                         "heart_detected": heart_detected_once,
                         "gesture": gesture,
                         "smile": round(smoothed.smile, 4),
@@ -1383,6 +1382,8 @@ def run(args: argparse.Namespace) -> int:
                     }, f, ensure_ascii=False)
             except Exception as e:  # noqa: BLE001
                 print(f"[tracker] Failed to write output file: {e}", file=sys.stderr)
+        if stream is not None:
+            stream.close()
         cap.release()
         cv2.destroyAllWindows()
         try:
@@ -1435,6 +1436,13 @@ def build_parser() -> argparse.ArgumentParser:
         metavar="PATH",
         help="Write smile_count JSON to file on exit (for Ren'Py)",
     )
+    p.add_argument(
+        "--stream-file",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Write the JSON Lines samples to file at --json-rate-hz (Ren'Py per-stage stats)",
+    )
     p.add_argument(
         "--screenshot-dir",
         type=str,
@@ -1,5 +1,5 @@
 # Stub for Python 3.13+ where aifc was removed from the standard library.
-# speech_recognition imports aifc at load time; we only use Microphone + Google,
+# speech_recognition.AudioFile imports aifc when it opens a file; we only use Microphone + Google,
 # so AIFF file I/O is never used. This stub allows the import to succeed.
 
 class Error(Exception):
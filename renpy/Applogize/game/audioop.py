@@ -1,117 +1,269 @@
-# Pure Python fallback for audioop (removed in Python 3.13).
+# Fallback for audioop (removed in Python 3.13).
 # Implements only the subset used by speech_recognition: rms, add, bias, ratecv, lin2lin, tomono, byteswap, error.
+# Samples are converted in bulk: with NumPy when it is importable, otherwise with the array module.
+# NumPy is imported on the first conversion, not with this module, so importing audioop stays cheap.
+# Results match CPython's audioop (signed 8-bit samples, clipping in add/tomono, wrapping in bias).
 
-import struct
+import math
+import sys
+from array import array
+
+_np = None
+_np_checked = False
+
+def _numpy():
+    """Returns the numpy module (importing it on first use), or None if it is not installed."""
+    global _np, _np_checked
+    if not _np_checked:
+        try:
+            import numpy as _np
+        except ImportError:
+            _np = None
+        _np_checked = True
+    return _np
+
+def __getattr__(name):
+    if name == "BACKEND":
+        return "numpy" if _numpy() is not None else "array"
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
 
 class error(Exception):
     pass
 
+_MINVAL = {1: -0x80, 2: -0x8000, 3: -0x800000, 4: -0x80000000}
+_MAXVAL = {1: 0x7F, 2: 0x7FFF, 3: 0x7FFFFF, 4: 0x7FFFFFFF}
+
+def _check_size(width):
+    if width not in (1, 2, 3, 4):
+        raise error("Size should be 1, 2, 3 or 4")
+
+def _check_parameters(buffer, width):
+    _check_size(width)
+    if len(buffer) % width != 0:
+        raise error("not a whole number of frames")
+
+def _fbound(val, minval, maxval):
+    if val > maxval:
+        val = maxval
+    elif val < minval + 1.0:
+        val = minval
+    return int(math.floor(val))
+
+# ---- array backend -----------------------------------------------------------
+
+_ARRAY_CODES = {1: "b", 2: "h"}
+for _code in ("i", "l"):
+    if array(_code).itemsize == 4:
+        _ARRAY_CODES[4] = _code
+        break
+
 def _unpack(width, data):
-    """Yield signed samples from bytes; width 1,2,3,4."""
-    n = len(data) // width
-    if width == 1:
-        for i in range(n):
-            b = data[i]
-            yield b - 128 if b & 128 else b
-    elif width == 2:
-        for i in range(n):
-            yield struct.unpack_from("<h", data, i * 2)[0]
-    elif width == 3:
-        for i in range(n):
-            b = data[i * 3 : i * 3 + 3] + b"\x00"
-            yield struct.unpack_from("<i", b)[0] >> 8
-    else:  # 4
-        for i in range(n):
-            yield struct.unpack_from("<i", data, i * 4)[0]
+    """Return signed samples of a little-endian buffer as a sequence of ints."""
+    if width == 3:
+        data = bytes(data)
+        return [int.from_bytes(data[i:i + 3], "little", signed=True) for i in range(0, len(data), 3)]
+    samples = array(_ARRAY_CODES[width])
+    samples.frombytes(data)
+    if width > 1 and sys.byteorder == "big":
+        samples.byteswap()
+    return samples
 
 def _pack(width, samples):
-    """Pack signed samples to bytes."""
-    if width == 1:
-        return bytes((s + 128) & 0xFF for s in samples)
-    elif width == 2:
-        return struct.pack("<" + "h" * len(samples), *samples)
-    elif width == 3:
-        out = []
-        for s in samples:
-            s = max(-0x800000, min(0x7FFFFF, s))
-            out.append(struct.pack("<i", s << 8)[:3])
-        return b"".join(out)
-    else:
-        return struct.pack("<" + "i" * len(samples), *samples)
+    """Pack signed samples (already in range) into little-endian bytes."""
+    if width == 3:
+        return b"".join(s.to_bytes(3, "little", signed=True) for s in samples)
+    out = array(_ARRAY_CODES[width], samples)
+    if width > 1 and sys.byteorder == "big":
+        out.byteswap()
+    return out.tobytes()
+
+def _wrap(width, samples):
+    bits = 8 * width
+    mask = (1 << bits) - 1
+    sign = 1 << (bits - 1)
+    return [((s & mask) ^ sign) - sign for s in samples]
+
+# ---- numpy backend -----------------------------------------------------------
+
+_NP_DTYPES = {1: "i1", 2: "<i2", 4: "<i4"}
+
+def _np_unpack(width, data):
+    """Return samples as an int64 NumPy array."""
+    if width == 3:
+        raw = _np.frombuffer(data, dtype=_np.uint8).reshape(-1, 3).astype(_np.int32)
+        packed = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        return ((packed << 8) >> 8).astype(_np.int64)
+    return _np.frombuffer(data, dtype=_NP_DTYPES[width]).astype(_np.int64)
+
+def _np_pack(width, samples):
+    """Pack in-range int64 samples into little-endian bytes."""
+    if width == 3:
+        v = samples.astype("<i4").view(_np.uint8).reshape(-1, 4)
+        return v[:, :3].tobytes()
+    return samples.astype(_NP_DTYPES[width]).tobytes()
+
+def _np_wrap(width, samples):
+    bits = 8 * width
+    sign = 1 << (bits - 1)
+    return ((samples & ((1 << bits) - 1)) ^ sign) - sign
+
+def _np_fbound(values, minval, maxval):
+    out = _np.floor(values)
+    out[values > maxval] = maxval
+    out[values < minval + 1.0] = minval
+    return out.astype(_np.int64)
+
+# ---- public API --------------------------------------------------------------
 
 def rms(buffer, width):
-    if width not in (1, 2, 3, 4) or len(buffer) % width != 0:
-        raise error("rms: bad args")
+    _check_parameters(buffer, width)
     if len(buffer) == 0:
         return 0
-    samples = list(_unpack(width, buffer))
-    s = sum(s * s for s in samples)
-    return int((s / len(samples)) ** 0.5)
+    if _numpy() is not None:
+        samples = _np_unpack(width, buffer).astype(_np.float64)
+        return int(math.sqrt(float(_np.dot(samples, samples)) / len(samples)))
+    samples = _unpack(width, buffer)
+    return int(math.sqrt(sum(s * s for s in samples) / len(samples)))
 
 def add(buffer1, buffer2, width):
-    if width not in (1, 2, 3, 4) or len(buffer1) != len(buffer2) or len(buffer1) % width != 0:
-        raise error("add: bad args")
-    s1 = list(_unpack(width, buffer1))
-    s2 = list(_unpack(width, buffer2))
-    out = []
-    for a, b in zip(s1, s2):
-        out.append(max(-0x80000000, min(0x7FFFFFFF, a + b)))
-    return _pack(width, out)
+    _check_parameters(buffer1, width)
+    if len(buffer1) != len(buffer2):
+        raise error("Lengths should be the same")
+    lo, hi = _MINVAL[width], _MAXVAL[width]
+    if _numpy() is not None:
+        out = _np.clip(_np_unpack(width, buffer1) + _np_unpack(width, buffer2), lo, hi)
+        return _np_pack(width, out)
+    s2 = _unpack(width, buffer2)
+    return _pack(width, [min(hi, max(lo, a + b)) for a, b in zip(_unpack(width, buffer1), s2)])
 
 def bias(buffer, width, bias_val):
-    if width not in (1, 2, 3, 4) or len(buffer) % width != 0:
-        raise error("bias: bad args")
-    samples = [s + bias_val for s in _unpack(width, buffer)]
-    return _pack(width, samples)
-
-def ratecv(buffer, width, nchannels, inrate, outrate, state):
-    if width not in (1, 2, 3, 4) or nchannels < 1 or inrate <= 0 or outrate <= 0:
-        raise error("ratecv: bad args")
+    _check_parameters(buffer, width)
+    if _numpy() is not None:
+        return _np_pack(width, _np_wrap(width, _np_unpack(width, buffer) + int(bias_val)))
+    return _pack(width, _wrap(width, [s + bias_val for s in _unpack(width, buffer)]))
+
+def ratecv(buffer, width, nchannels, inrate, outrate, state, weightA=1, weightB=0):
+    _check_size(width)
+    if nchannels < 1:
+        raise error("# of channels should be >= 1")
+    bytes_per_frame = width * nchannels
+    if weightA < 1 or weightB < 0:
+        raise error("weightA should be >= 1, weightB should be >= 0")
+    if len(buffer) % bytes_per_frame != 0:
+        raise error("not a whole number of frames")
+    if inrate <= 0 or outrate <= 0:
+        raise error("sampling rate not > 0")
+    d = math.gcd(inrate, outrate)
+    inrate //= d
+    outrate //= d
+    d = math.gcd(weightA, weightB)
+    weightA //= d
+    weightB //= d
+
     if state is None:
-        state = (0, 0)
-    # Simple linear interpolation resample: consume inrate, produce outrate
-    d = len(buffer) // (width * nchannels)
-    if d == 0:
-        return buffer, state
-    # Approximate: out_samples = d * outrate / inrate
-    out_d = int(d * outrate / inrate)
-    if out_d == 0:
-        return b"", state
-    samples = list(_unpack(width, buffer))
-    frame_len = nchannels
-    in_frames = [samples[i:i + frame_len] for i in range(0, len(samples), frame_len)]
-    out_frames = []
-    for i in range(out_d):
-        src_i = i * inrate / outrate
-        i0 = int(src_i) % len(in_frames)
-        i1 = (i0 + 1) % len(in_frames)
-        t = src_i - int(src_i)
-        f = [int(in_frames[i0][c] * (1 - t) + in_frames[i1][c] * t) for c in range(frame_len)]
-        out_frames.extend(f)
-    return _pack(width, out_frames), state
+        d = -outrate
+        prev_i = [0] * nchannels
+        cur_i = [0] * nchannels
+    else:
+        try:
+            d, samps = state
+        except (TypeError, ValueError):
+            raise TypeError("state must be a tuple or None")
+        if len(samps) != nchannels:
+            raise error("illegal state argument")
+        prev_i = [int(p) for p, _ in samps]
+        cur_i = [int(c) for _, c in samps]
+
+    nframes = len(buffer) // bytes_per_frame
+    shift = 32 - 8 * width
+    if _numpy() is not None and weightB == 0:
+        return _np_ratecv(buffer, width, nchannels, inrate, outrate, d, prev_i, cur_i, nframes, shift)
+
+    samples = [s << shift for s in _unpack(width, buffer)]
+    out = []
+    pos = 0
+    total = float(weightA + weightB)
+    while True:
+        while d < 0:
+            if nframes == 0:
+                samps = tuple((prev_i[c], cur_i[c]) for c in range(nchannels))
+                return _pack(width, [s >> shift for s in out]), (d, samps)
+            for chan in range(nchannels):
+                prev_i[chan] = cur_i[chan]
+                cur_i[chan] = int((float(weightA) * samples[pos] + float(weightB) * prev_i[chan]) / total)
+                pos += 1
+            nframes -= 1
+            d += outrate
+        while d >= 0:
+            for chan in range(nchannels):
+                out.append(int((float(prev_i[chan]) * d + float(cur_i[chan]) * (outrate - d)) / outrate))
+            d -= inrate
+
+def _np_ratecv(buffer, width, nchannels, inrate, outrate, d0, prev_i, cur_i, nframes, shift):
+    """Closed form of ratecv's inner loops for the default filter weights (weightB == 0).
+
+    Output m is produced after k_m = max(0, ceil((m * inrate - d0) / outrate)) input
+    frames were consumed, with d_m = d0 + k_m * outrate - m * inrate."""
+    frames = (_np_unpack(width, buffer) << shift).reshape(nframes, nchannels)
+    history = _np.empty((nframes + 2, nchannels), dtype=_np.int64)
+    history[0] = prev_i
+    history[1] = cur_i
+    history[2:] = frames
+    end = d0 + nframes * outrate
+    count = end // inrate + 1 if end >= 0 else 0
+    m = _np.arange(count, dtype=_np.int64)
+    k = _np.maximum(0, -((d0 - m * inrate) // outrate))
+    dm = (d0 + k * outrate - m * inrate).astype(_np.float64)[:, None]
+    prev = history[k].astype(_np.float64)
+    cur = history[k + 1].astype(_np.float64)
+    out = _np.trunc((prev * dm + cur * (outrate - dm)) / outrate).astype(_np.int64) >> shift
+    d = int(end - count * inrate)
+    samps = tuple((int(history[nframes, c]), int(history[nframes + 1, c])) for c in range(nchannels))
+    return _np_pack(width, out.reshape(-1)), (d, samps)
 
 def lin2lin(buffer, width, newwidth):
-    if width not in (1, 2, 3, 4) or newwidth not in (1, 2, 3, 4) or len(buffer) % width != 0:
-        raise error("lin2lin: bad args")
-    samples = list(_unpack(width, buffer))
-    return _pack(newwidth, samples)
+    _check_parameters(buffer, width)
+    _check_size(newwidth)
+    if width == newwidth:
+        return bytes(buffer)
+    if _numpy() is not None:
+        samples = _np_unpack(width, buffer)
+        if newwidth > width:
+            return _np_pack(newwidth, samples << (8 * (newwidth - width)))
+        return _np_pack(newwidth, samples >> (8 * (width - newwidth)))
+    if newwidth > width:
+        up = 8 * (newwidth - width)
+        return _pack(newwidth, [s << up for s in _unpack(width, buffer)])
+    down = 8 * (width - newwidth)
+    return _pack(newwidth, [s >> down for s in _unpack(width, buffer)])
 
 def tomono(buffer, width, fac1, fac2):
-    if width not in (1, 2, 3, 4) or len(buffer) % (2 * width) != 0:
-        raise error("tomono: bad args")
-    samples = list(_unpack(width, buffer))
-    mono = []
-    for i in range(0, len(samples), 2):
-        m = int(samples[i] * fac1 + samples[i + 1] * fac2)
-        mono.append(max(-0x80000000, min(0x7FFFFFFF, m)))
-    return _pack(width, mono)
+    _check_parameters(buffer, width)
+    lo, hi = _MINVAL[width], _MAXVAL[width]
+    if _numpy() is not None:
+        samples = _np_unpack(width, buffer).astype(_np.float64)
+        n = len(samples) // 2 * 2
+        mixed = samples[0:n:2] * fac1 + samples[1:n:2] * fac2
+        return _np_pack(width, _np_fbound(mixed, lo, hi))
+    samples = _unpack(width, buffer)
+    left = samples[0::2]
+    right = samples[1::2]
+    return _pack(width, [_fbound(a * fac1 + b * fac2, lo, hi) for a, b in zip(left, right)])
 
 def byteswap(buffer, width):
-    if width not in (1, 2, 3, 4) or len(buffer) % width != 0:
-        raise error("byteswap: bad args")
+    _check_parameters(buffer, width)
     if width == 1:
-        return buffer
-    out = []
-    for i in range(0, len(buffer), width):
-        out.append(buffer[i : i + width][::-1])
-    return b"".join(out)
+        return bytes(buffer)
+    if width in _ARRAY_CODES:
+        # array.byteswap is already a C loop and beats a NumPy strided copy.
+        samples = array(_ARRAY_CODES[width])
+        samples.frombytes(buffer)
+        samples.byteswap()
+        return samples.tobytes()
+    if _numpy() is not None:
+        return _np.frombuffer(buffer, dtype=_np.uint8).reshape(-1, width)[:, ::-1].tobytes()
+    data = bytes(buffer)
+    out = bytearray(len(data))
+    for i in range(width):
+        out[i::width] = data[width - 1 - i::width]
+    return bytes(out)
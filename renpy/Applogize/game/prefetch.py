@@ -0,0 +1,260 @@
+"""Story-aware prefetching of the game's movies and images.
+
+Ren'Py opens a Movie's file only when the movie is shown, so the intro and phone-call scenes
+hitch on first display while the video is read from disk. StoryPrefetcher runs as a statement
+callback: it looks LOOKAHEAD statements ahead of the one being executed (following jumps and
+calls), and has a background thread read the files of upcoming `show`/`scene` images and
+Movie(play=...) videos through renpy.loader, so they are in the OS cache when shown. Upcoming
+images are also handed to Ren'Py's image prediction. stats() reports how many shown files were
+already warm.
+"""
+import collections
+import queue
+import re
+import threading
+
+# Statements to look ahead of the current one.
+LOOKAHEAD = 12
+# Read size while warming; the data is thrown away, only the OS cache is kept.
+BLOCK_SIZE = 1 << 20
+
+# Video files named anywhere in a statement, e.g. show expression Movie(play="video/intro_video.mkv").
+MOVIE_RE = re.compile(r"""["']([^"']+\.(?:webm|mkv|mp4|ogv|avi|mpe?g|m4v))["']""", re.IGNORECASE)
+
+Target = collections.namedtuple("Target", "kind name")
+Target.__doc__ = """Something a statement shows: kind "movie" (name = file) or "image" (name = image name tuple)."""
+
+
+def statement_targets(node):
+    """Movies and images the statement `node` shows, without evaluating anything."""
+    kind = type(node).__name__
+    texts = []
+    targets = []
+    if kind in ("Show", "Scene") and getattr(node, "imspec", None):
+        name, expression = node.imspec[0], node.imspec[1]
+        if expression:
+            texts.append(expression)
+        elif name:
+            targets.append(Target("image", tuple(name)))
+    elif kind == "Python":
+        texts.append(node.code.source)
+    elif kind == "UserStatement":
+        texts.append(node.line)
+    for text in texts:
+        targets.extend(Target("movie", name) for name in MOVIE_RE.findall(text))
+    return targets
+
+
+def upcoming_statements(node, lookup, count):
+    """The `count` statements executed after `node` along the straight-line path (jumps and calls to
+    fixed labels are followed; branches of menus and ifs are not)."""
+    statements = []
+    seen = set()
+    while node is not None and len(statements) < count:
+        kind = type(node).__name__
+        if kind == "Jump" and not node.expression:
+            following = lookup(node.target)
+        elif kind == "Call" and not node.expression:
+            following = lookup(node.label)
+        else:
+            following = node.next
+        if following is None or id(following) in seen:
+            break
+        seen.add(id(following))
+        statements.append(following)
+        node = following
+    return statements
+
+
+class PrefetchStats(object):
+    """Counts of shown files that were already warm (hits) or not yet (misses)."""
+
+    def __init__(self):
+        self.requested = 0
+        self.warmed = 0
+        self.bytes_read = 0
+        self.errors = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self):
+        shown = self.hits + self.misses
+        return self.hits / float(shown) if shown else 0.0
+
+    def as_dict(self):
+        return dict(vars(self), hit_rate=self.hit_rate)
+
+
+class FileWarmer:
+    """Reads files on a background thread so that the OS keeps them cached.
+
+    open_file(name, directory) returns a readable file object (renpy.loader.load in the game).
+    """
+
+    def __init__(self, open_file):
+        self.open_file = open_file
+        self.stats = PrefetchStats()
+        self._lock = threading.Lock()
+        self._warm = set()
+        self._pending = set()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="prefetch", daemon=True)
+        self._thread.start()
+
+    def want(self, name, directory=None):
+        """Queue (name, directory) for warming unless it is warm or queued already."""
+        key = (name, directory)
+        with self._lock:
+            if key in self._warm or key in self._pending:
+                return
+            self._pending.add(key)
+            self.stats.requested += 1
+        self._queue.put(key)
+
+    def is_warm(self, name, directory=None):
+        with self._lock:
+            return (name, directory) in self._warm
+
+    def record_use(self, name, directory=None):
+        """Count a file being shown as a hit if it was warmed in time."""
+        with self._lock:
+            if (name, directory) in self._warm:
+                self.stats.hits += 1
+            else:
+                self.stats.misses += 1
+
+    def wait_idle(self, timeout=None):
+        """Block until everything queued so far has been read (for tests and benchmarks)."""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        self._queue.put(None)
+
+    def _run(self):
+        while True:
+            key = self._queue.get()
+            if key is None:
+                return
+            if isinstance(key, threading.Event):
+                key.set()
+                continue
+            read = 0
+            try:
+                with self.open_file(*key) as f:
+                    while True:
+                        block = f.read(BLOCK_SIZE)
+                        if not block:
+                            break
+                        read += len(block)
+            except Exception:
+                with self._lock:
+                    self._pending.discard(key)
+                    self.stats.errors += 1
+                continue
+            with self._lock:
+                self._pending.discard(key)
+                self._warm.add(key)
+                self.stats.warmed += 1
+                self.stats.bytes_read += read
+
+
+class StoryPrefetcher:
+    """Warms what the next LOOKAHEAD statements will show; call on_statement(node) as each one runs.
+
+    lookup(label) returns the node for a label; image_files(name) returns [(file, directory)]
+    for an image name tuple. predict_image(name, start), if given, starts Ren'Py's prediction of
+    an upcoming image and stops it once the image has been shown.
+    """
+
+    def __init__(self, warmer, lookup, image_files, predict_image=None, lookahead=LOOKAHEAD):
+        self.warmer = warmer
+        self.lookup = lookup
+        self.image_files = image_files
+        self.predict_image = predict_image
+        self.lookahead = lookahead
+        self._predicted = set()
+
+    def _files(self, target):
+        if target.kind == "movie":
+            return [(target.name, "audio")]  # Movie looks files up like audio files
+        return self.image_files(target.name)
+
+    def on_statement(self, node):
+        for target in statement_targets(node):
+            for name, directory in self._files(target):
+                self.warmer.record_use(name, directory)
+            if target.kind == "image" and target.name in self._predicted:
+                self._predicted.discard(target.name)
+                self.predict_image(target.name, False)
+        for following in upcoming_statements(node, self.lookup, self.lookahead):
+            for target in statement_targets(following):
+                for name, directory in self._files(target):
+                    self.warmer.want(name, directory)
+                if target.kind == "image" and self.predict_image is not None and target.name not in self._predicted:
+                    self._predicted.add(target.name)
+                    self.predict_image(target.name, True)
+
+
+def renpy_image_files(name):
+    """Files behind the image `name` (a tuple like ("gf", "angry1")), looking through Transforms."""
+    import renpy
+
+    d = renpy.display.image.images.get(name)
+    for _ in range(8):
+        if d is None or hasattr(d, "predict_files"):
+            break
+        d = getattr(d, "child", None)
+    if d is None or not hasattr(d, "predict_files"):
+        return []
+    try:
+        return [(f, "images") for f in d.predict_files()]
+    except Exception:
+        return []
+
+
+_prefetcher = None
+
+
+def install():
+    """Start prefetching in the running game. Safe to call repeatedly."""
+    global _prefetcher
+    import renpy
+
+    if _prefetcher is not None:
+        return _prefetcher
+
+    def open_file(name, directory):
+        return renpy.loader.load(name, directory=directory)
+
+    def predict_image(name, start):
+        if start:
+            renpy.exports.start_predict(" ".join(name))
+        else:
+            renpy.exports.stop_predict(" ".join(name))
+
+    _prefetcher = StoryPrefetcher(FileWarmer(open_file), renpy.game.script.lookup_or_none, renpy_image_files, predict_image)
+
+    def statement_callback(statement_name):
+        node = renpy.game.script.lookup_or_none(renpy.game.context().current)
+        if node is None:
+            return
+        try:
+            _prefetcher.on_statement(node)
+        except Exception:
+            pass  # prefetching is only an optimization
+
+    renpy.config.statement_callbacks.append(statement_callback)
+    return _prefetcher
+
+
+def stats():
+    """Prefetch counters and hit rate, e.g. for the developer console: prefetch.stats()."""
+    return _prefetcher.warmer.stats.as_dict() if _prefetcher is not None else PrefetchStats().as_dict()
+
+
+def shutdown():
+    if _prefetcher is not None:
+        _prefetcher.warmer.close()
@@ -3,6 +3,16 @@
 Run with system Python that has: pip install SpeechRecognition pyaudio
 Output: one line of transcribed text, or "ERROR: <message>" on failure."""
 import sys
+import threading
+
+def preconnect():
+    """Open the connection to the recognition service while the mic is still recording."""
+    try:
+        from speech_recognition.recognizers import google
+        from speech_recognition.transport import default_transport
+        default_transport().preconnect(google.ENDPOINT, timeout=5)
+    except Exception:
+        pass  # recognize_google connects on its own
 
 def main():
     try:
@@ -13,6 +23,7 @@ def main():
         sys.exit(1)
     try:
         r = sr.Recognizer()
+        threading.Thread(target=preconnect, daemon=True).start()
         with sr.Microphone() as source:
             r.adjust_for_ambient_noise(source, duration=0.5)
             audio = r.record(source, duration=6)
@@ -1,7 +1,16 @@
 #!/usr/bin/env python3
-"""Record up to 15 seconds from mic (or until SIGTERM), save to record_temp.wav."""
+"""Record up to 15 seconds from mic (or until SIGTERM, or until the player stops talking),
+save to record_temp.wav.
+
+With --stream <url> (e.g. http://localhost:19000/analyze/stream) audio is sent to the
+server in chunks while recording instead, and the /analyze JSON result is printed as
+one "RESULT {...}" line.
+
+A "LATENCY first_sample=<epoch seconds>" line is printed first so the game can log
+the time from the Record click to the first captured sample."""
 import signal
 import sys
+import time
 
 _stop_recording = False
 
@@ -12,66 +21,89 @@ def _handle_stop(sig, frame):
 signal.signal(signal.SIGTERM, _handle_stop)
 signal.signal(signal.SIGINT, _handle_stop)
 
+import voice_dsp
+from voice_capture import CHANNELS, CHUNK, RATE, SECONDS, STREAM_BATCH, ChunkUploader, make_endpointer
+
+# Optional rumble/DC removal before the level checks; None disables it.
+HIGHPASS_HZ = None
+
+
+def _stream_url_from_argv(argv):
+    if "--stream" in argv:
+        i = argv.index("--stream")
+        if i + 1 < len(argv):
+            return argv[i + 1]
+    return None
+
+
 def main():
     try:
         import pyaudio
         import wave
-        import struct
     except ImportError as e:
         print("ERROR: " + str(e)[:200])
         sys.exit(1)
     try:
-        RATE = 16000
-        CHUNK = 1024
-        SECONDS = 15
         FORMAT = pyaudio.paInt16
-        CHANNELS = 1
         out_path = "record_temp.wav"
+        stream_url = _stream_url_from_argv(sys.argv[1:])
+        uploader = ChunkUploader(stream_url) if stream_url else None
         p = pyaudio.PyAudio()
         stream = p.open(format=FORMAT, channels=CHANNELS, rate=RATE, input=True, frames_per_buffer=CHUNK)
+        endpointer = make_endpointer()
         frames = []
+        sent = 0
+        read = 0
         for _ in range(0, int(RATE / CHUNK * SECONDS)):
             if _stop_recording:
                 break
             data = stream.read(CHUNK, exception_on_overflow=False)
-            frames.append(data)
+            if not read:
+                print("LATENCY first_sample=%.6f" % time.time(), flush=True)
+            read += 1
+            if endpointer is None:
+                frames.append(data)
+            else:
+                frames.extend(endpointer.push(data))
+            if uploader is not None and len(frames) >= STREAM_BATCH:
+                # Only the unsent tail is kept in streaming mode.
+                uploader.send(b"".join(frames))
+                sent += len(frames)
+                frames = []
+            if endpointer is not None and endpointer.ended:
+                print("ENDPOINT at=%.2fs" % endpointer.end_time(), flush=True)
+                break
         stream.stop_stream()
         stream.close()
         p.terminate()
-        if not frames:
+        if endpointer is not None:
+            frames.extend(endpointer.finish())
+        if not read:
             print("ERROR: No audio captured before stop.")
             sys.exit(1)
-        raw = b"".join(frames)
+        if not frames and not sent:
+            print("ERROR: No speech detected. Check the microphone and speak a little louder.")
+            sys.exit(1)
+
+        if uploader is not None:
+            import json
+            result = uploader.finish(b"".join(frames))
+            print("RESULT " + json.dumps(result))
+            return
 
-        # If input level is low, apply a safe digital gain to help STT.
-        # (Hume sometimes returns empty transcript when audio is too quiet.)
-        if raw:
-            samples = struct.unpack("<%dh" % (len(raw) // 2), raw)
-            peak = max(abs(s) for s in samples) if samples else 0
-            if 0 < peak < 8000:
-                target = 20000
-                gain = min(8.0, target / float(peak))
-                scaled = []
-                for s in samples:
-                    v = int(s * gain)
-                    if v > 32767:
-                        v = 32767
-                    elif v < -32768:
-                        v = -32768
-                    scaled.append(v)
-                raw = struct.pack("<%dh" % len(scaled), *scaled)
+        # Trim leading/trailing silence and, if input level is low, apply a safe digital
+        # gain to help STT. (Hume sometimes returns empty transcript when audio is too quiet.)
+        result = voice_dsp.process(b"".join(frames), RATE, highpass_hz=HIGHPASS_HZ)
 
         with wave.open(out_path, "wb") as wf:
             wf.setnchannels(CHANNELS)
             wf.setsampwidth(2)  # 16-bit
             wf.setframerate(RATE)
-            wf.writeframes(raw)
-        samples = struct.unpack("<%dh" % (len(raw) // 2), raw)
-        peak = max(abs(s) for s in samples) if samples else 0
-        if peak < 100:
-            print("ERROR: Recorded audio is silence (peak=%d). Check macOS mic permission for this app." % peak)
+            wf.writeframes(result.data)
+        if result.peak < 100:
+            print("ERROR: Recorded audio is silence (peak=%d). Check macOS mic permission for this app." % result.peak)
             sys.exit(1)
-        print("OK peak=%d" % peak)
+        print("OK peak=%d" % result.peak)
     except Exception as e:
         print("ERROR: " + str(e)[:200])
         sys.exit(1)
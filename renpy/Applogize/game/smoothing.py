@@ -0,0 +1,280 @@
+"""Incremental smoothing of the face tracker's signals: EMA, hysteresis, event counting, window stats.
+
+backend/tracker/tracker.py smooths every camera frame with these, and the game folds the
+tracker's sample stream (--stream-file, one JSON object per line) through StageStats to get
+per-stage statistics instead of reading only the last snapshot in smile_session.json.
+Plain Python: state lives in __slots__ objects and windows in preallocated ring buffers, so
+an update allocates nothing and neither NumPy nor the tracker's dependencies are needed.
+"""
+import json
+import math
+
+# Tracker samples kept for the "recent" window of each signal (about 2 s at 12.5 Hz).
+RECENT_SAMPLES = 25
+# Gaps between samples longer than this (tracker stalled or paused) count as this long.
+MAX_SAMPLE_GAP_S = 1.0
+# Numeric signals in the tracker's JSON samples.
+STREAM_SIGNALS = ("smile", "sadness", "lookAway", "heartScore")
+# Same thresholds tracker.py counts smile events with.
+SMILE_EVENT_THRESHOLD = 0.50
+SMILE_EVENT_RESET = 0.35
+
+
+def clamp01(x):
+    return max(0.0, min(1.0, float(x)))
+
+
+def ema_alpha(dt_ms, tau_ms):
+    """Weight of a new sample dt_ms after the last one, for an EMA with time constant tau_ms."""
+    dt = max(0.0, float(dt_ms))
+    tau = max(1.0, float(tau_ms))
+    return 1.0 - math.exp(-dt / tau)
+
+
+class Ema:
+    """Exponential moving average with a time constant, kept within [low, high]."""
+
+    __slots__ = ("tau_ms", "value", "low", "high")
+
+    def __init__(self, tau_ms, value=0.0, low=-math.inf, high=math.inf):
+        self.tau_ms = float(tau_ms)
+        self.value = float(value)
+        self.low = low
+        self.high = high
+
+    def step(self, x, alpha):
+        """Move toward x by alpha (from ema_alpha, when several EMAs share one frame time)."""
+        self.value = max(self.low, min(self.high, self.value + alpha * (float(x) - self.value)))
+        return self.value
+
+    def update(self, x, dt_ms):
+        return self.step(x, ema_alpha(dt_ms, self.tau_ms))
+
+
+class Hysteresis:
+    """A flag that turns on above `on` and only turns off again at or below `off`."""
+
+    __slots__ = ("on", "off", "state")
+
+    def __init__(self, on, off, state=False):
+        self.on = float(on)
+        self.off = float(off)
+        self.state = bool(state)
+
+    def update(self, x):
+        self.state = float(x) > (self.off if self.state else self.on)
+        return self.state
+
+    def reset(self, state=False):
+        self.state = bool(state)
+        return self.state
+
+
+class EventCounter:
+    """Counts rising edges: x reaching `threshold`, re-armed once x drops below `reset_below`."""
+
+    __slots__ = ("threshold", "reset_below", "above", "count")
+
+    def __init__(self, threshold, reset_below):
+        self.threshold = float(threshold)
+        self.reset_below = float(reset_below)
+        self.above = False
+        self.count = 0
+
+    def update(self, x):
+        """Feed one sample; True if it started a new event."""
+        if self.above:
+            if x < self.reset_below:
+                self.above = False
+            return False
+        if x >= self.threshold:
+            self.above = True
+            self.count += 1
+            return True
+        return False
+
+
+class RingWindow:
+    """min/max/mean of the last `size` values, in a buffer allocated once."""
+
+    __slots__ = ("_values", "_next", "count", "_total")
+
+    def __init__(self, size):
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        self._values = [0.0] * size
+        self._next = 0
+        self.count = 0
+        self._total = 0.0
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def size(self):
+        return len(self._values)
+
+    def push(self, x):
+        x = float(x)
+        values = self._values
+        i = self._next
+        if self.count == len(values):
+            self._total -= values[i]
+        else:
+            self.count += 1
+        values[i] = x
+        self._total += x
+        self._next = i + 1 if i + 1 < len(values) else 0
+        if self._next == 0:
+            self._total = math.fsum(values)  # the buffer is full here; drop the rounding error once per lap
+
+    def clear(self):
+        self._next = 0
+        self.count = 0
+        self._total = 0.0
+
+    @property
+    def last(self):
+        return self._values[self._next - 1] if self.count else 0.0
+
+    @property
+    def mean(self):
+        return self._total / self.count if self.count else 0.0
+
+    @property
+    def min(self):
+        if not self.count:
+            return 0.0
+        values = self._values
+        low = values[0]
+        for i in range(1, self.count):
+            if values[i] < low:
+                low = values[i]
+        return low
+
+    @property
+    def max(self):
+        if not self.count:
+            return 0.0
+        values = self._values
+        high = values[0]
+        for i in range(1, self.count):
+            if values[i] > high:
+                high = values[i]
+        return high
+
+
+class RunningStats:
+    """min/max/mean of every value pushed so far."""
+
+    __slots__ = ("count", "total", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = 0.0
+        self.max = 0.0
+
+    def push(self, x):
+        x = float(x)
+        if self.count:
+            if x < self.min:
+                self.min = x
+            elif x > self.max:
+                self.max = x
+        else:
+            self.min = self.max = x
+        self.count += 1
+        self.total += x
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+class StageStats:
+    """Statistics of one stage's tracker samples (the dicts tracker.py writes), fed one at a time.
+
+    For each of STREAM_SIGNALS: min/max/mean over the stage and mean/max over the last
+    RECENT_SAMPLES; plus smile events, seconds spent looking away and showing the heart, and how
+    often each gesture was seen.
+    """
+
+    __slots__ = ("samples", "duration", "looking_away_s", "heart_s", "gestures", "_smiles", "_signals", "_recent", "_last_ts")
+
+    def __init__(self, recent=RECENT_SAMPLES):
+        self.samples = 0
+        self.duration = 0.0
+        self.looking_away_s = 0.0
+        self.heart_s = 0.0
+        self.gestures = {}
+        self._smiles = EventCounter(SMILE_EVENT_THRESHOLD, SMILE_EVENT_RESET)
+        self._signals = tuple(RunningStats() for _ in STREAM_SIGNALS)
+        self._recent = tuple(RingWindow(recent) for _ in STREAM_SIGNALS)
+        self._last_ts = None
+
+    @property
+    def smile_events(self):
+        return self._smiles.count
+
+    def add(self, sample):
+        ts = float(sample.get("ts", 0.0))
+        dt = 0.0
+        if self._last_ts is not None:
+            dt = min(MAX_SAMPLE_GAP_S, max(0.0, ts - self._last_ts))
+        self._last_ts = ts
+        self.samples += 1
+        self.duration += dt
+        for name, total, recent in zip(STREAM_SIGNALS, self._signals, self._recent):
+            x = float(sample.get(name, 0.0))
+            total.push(x)
+            recent.push(x)
+        self._smiles.update(float(sample.get("smile", 0.0)))
+        if sample.get("lookingAway"):
+            self.looking_away_s += dt
+        if sample.get("heart"):
+            self.heart_s += dt
+        gesture = sample.get("gesture")
+        if gesture and gesture != "—":
+            self.gestures[gesture] = self.gestures.get(gesture, 0) + 1
+
+    def as_dict(self):
+        d = {
+            "samples": self.samples,
+            "duration": round(self.duration, 3),
+            "smile_events": self.smile_events,
+            "looking_away_s": round(self.looking_away_s, 3),
+            "looking_away_ratio": round(self.looking_away_s / self.duration, 4) if self.duration else 0.0,
+            "heart_s": round(self.heart_s, 3),
+            "gestures": dict(self.gestures),
+        }
+        for name, total, recent in zip(STREAM_SIGNALS, self._signals, self._recent):
+            d[name] = {
+                "min": round(total.min, 4),
+                "max": round(total.max, 4),
+                "mean": round(total.mean, 4),
+                "recent_mean": round(recent.mean, 4),
+                "recent_max": round(recent.max, 4),
+            }
+        return d
+
+
+def summarize_lines(lines, recent=RECENT_SAMPLES):
+    """StageStats.as_dict() of JSON-lines samples; lines that do not parse are skipped."""
+    stats = StageStats(recent)
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            sample = json.loads(line)
+        except ValueError:
+            continue  # e.g. the last line, cut off when the tracker was killed
+        if isinstance(sample, dict):
+            stats.add(sample)
+    return stats.as_dict()
+
+
+def summarize_file(path, recent=RECENT_SAMPLES):
+    with open(path, "r", encoding="utf-8") as f:
+        return summarize_lines(f, recent)
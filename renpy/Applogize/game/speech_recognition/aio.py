@@ -0,0 +1,440 @@
+"""asyncio interface: async audio sources, ``AsyncRecognizer`` and a pooled HTTP client.
+
+Lets an event loop (a FastAPI app, an asyncio-based game client) capture and transcribe many
+utterances concurrently without a thread per request::
+
+    async with AsyncRecognizer() as r:
+        async with AsyncMicrophone() as source:
+            audio = await r.listen(source)
+        text = await r.recognize_google(audio)
+
+* ``AsyncMicrophone`` runs PyAudio in callback mode and hands buffers to the event loop, so
+  nothing blocks while waiting for audio; ``AsyncAudioFile`` reads files chunk by chunk.
+* ``AsyncRecognizer.recognize_google`` sends requests over ``AsyncHTTPClient``, which keeps
+  connections alive and reuses them across requests; ``recognize_openai`` and ``recognize_groq``
+  use the SDKs' async clients, created once per ``AsyncRecognizer``.
+* Other ``recognize_*`` methods (local engines are CPU-bound) run on the loop's default executor.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import audioop
+import collections
+import json
+import math
+import ssl
+from typing import AsyncIterator, NamedTuple
+from urllib.parse import urlsplit
+
+from . import AudioFile, Microphone, Recognizer
+from .audio import AudioData
+from .exceptions import RequestError, SetupError, WaitTimeoutError
+
+
+class AsyncResponse(NamedTuple):
+    status: int
+    reason: str
+    headers: dict  # lower-cased header names
+    body: bytes
+
+    def text(self, encoding: str = "utf-8") -> str:
+        return self.body.decode(encoding)
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.idle_since = 0.0
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class AsyncHTTPClient:
+    """Minimal HTTP/1.1 client on asyncio streams with a keep-alive connection pool per host.
+
+    At most ``max_connections_per_host`` requests to one host run at once; idle connections are
+    reused for ``idle_timeout`` seconds. A request that fails on a reused connection before any
+    response arrives (the server closed it while idle) is retried once on a new connection."""
+
+    def __init__(self, max_connections_per_host: int = 8, idle_timeout: float = 30.0) -> None:
+        self.max_connections_per_host = max_connections_per_host
+        self.idle_timeout = idle_timeout
+        self.connections_opened = 0
+        self._idle: dict[tuple, list[_Connection]] = collections.defaultdict(list)
+        self._limits: dict[tuple, asyncio.Semaphore] = {}
+        self._ssl_context = None
+
+    async def request(self, method: str, url: str, data: bytes | None = None, headers: dict | None = None, timeout: float | None = None) -> AsyncResponse:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError("unsupported URL scheme: {}".format(parts.scheme))
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        key = (parts.scheme, parts.hostname, port)
+        target = (parts.path or "/") + ("?" + parts.query if parts.query else "")
+        host = parts.hostname if parts.port is None else "{}:{}".format(parts.hostname, parts.port)
+        lines = ["{} {} HTTP/1.1".format(method, target), "Host: {}".format(host), "Connection: keep-alive"]
+        for name, value in (headers or {}).items():
+            lines.append("{}: {}".format(name, value))
+        if data is not None or method in ("POST", "PUT"):
+            lines.append("Content-Length: {}".format(len(data or b"")))
+        head = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+        limit = self._limits.get(key)
+        if limit is None:
+            limit = self._limits[key] = asyncio.Semaphore(self.max_connections_per_host)
+        async with limit:
+            return await asyncio.wait_for(self._send(key, method, head, data or b""), timeout)
+
+    async def _send(self, key: tuple, method: str, head: bytes, body: bytes) -> AsyncResponse:
+        while True:
+            connection, reused = await self._acquire(key)
+            try:
+                connection.writer.write(head + body if len(body) < 65536 else head)
+                if len(body) >= 65536:
+                    connection.writer.write(body)
+                await connection.writer.drain()
+                status_line = await connection.reader.readline()
+                if not status_line:
+                    raise ConnectionResetError("connection closed before the response")
+            except (ConnectionError, asyncio.IncompleteReadError):
+                connection.close()
+                if reused:
+                    continue  # stale keep-alive connection; nothing was answered, so resend
+                raise
+            except BaseException:
+                connection.close()
+                raise
+            try:
+                response, keep_alive = await self._read_response(connection.reader, method, status_line)
+            except BaseException:
+                connection.close()
+                raise
+            if keep_alive:
+                connection.idle_since = asyncio.get_running_loop().time()
+                self._idle[key].append(connection)
+            else:
+                connection.close()
+            return response
+
+    async def _acquire(self, key: tuple) -> tuple[_Connection, bool]:
+        now = asyncio.get_running_loop().time()
+        idle = self._idle[key]
+        while idle:
+            connection = idle.pop()
+            if connection.reader.at_eof() or now - connection.idle_since > self.idle_timeout:
+                connection.close()
+                continue
+            return connection, True
+        scheme, host, port = key
+        context = None
+        if scheme == "https":
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            context = self._ssl_context
+        reader, writer = await asyncio.open_connection(host, port, ssl=context)
+        self.connections_opened += 1
+        return _Connection(reader, writer), False
+
+    @staticmethod
+    async def _read_response(reader: asyncio.StreamReader, method: str, status_line: bytes) -> tuple[AsyncResponse, bool]:
+        version, status, reason = (status_line.decode("latin-1").rstrip("\r\n").split(" ", 2) + [""])[:3]
+        status = int(status)
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            body = b""
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            parts = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):  # skip trailers
+                        pass
+                    break
+                parts.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            body = b"".join(parts)
+        elif "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await reader.read()  # delimited by the server closing the connection
+            keep_alive = False
+        return AsyncResponse(status, reason, headers, body), keep_alive
+
+    async def close(self) -> None:
+        connections = [c for idle in self._idle.values() for c in idle]
+        self._idle.clear()
+        for connection in connections:
+            connection.close()
+        for connection in connections:
+            try:
+                await connection.writer.wait_closed()
+            except (ConnectionError, ssl.SSLError):
+                pass
+
+    async def __aenter__(self) -> AsyncHTTPClient:
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+
+
+class AsyncMicrophone(Microphone):
+    """``Microphone`` for ``async with``: PyAudio delivers buffers from its callback thread straight into
+    an ``asyncio.Queue``, so ``read_chunk()`` awaits audio instead of blocking on ``stream.read``."""
+
+    async def __aenter__(self) -> AsyncMicrophone:
+        assert self.stream is None, "This audio source is already inside a context manager"
+        loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue[bytes] = asyncio.Queue()
+        paContinue = self.pyaudio_module.paContinue
+
+        def callback(in_data, frame_count, time_info, status):
+            loop.call_soon_threadsafe(self._queue.put_nowait, in_data)
+            return (None, paContinue)
+
+        def open_stream():
+            audio = self.pyaudio_module.PyAudio()
+            try:
+                return audio, audio.open(
+                    input_device_index=self.device_index, channels=1, format=self.format,
+                    rate=self.SAMPLE_RATE, frames_per_buffer=self.CHUNK, input=True,
+                    stream_callback=callback,
+                )
+            except Exception:
+                audio.terminate()
+                raise
+
+        # opening a PortAudio stream can take a while, so keep it off the event loop
+        self.audio, pyaudio_stream = await loop.run_in_executor(None, open_stream)
+        self.stream = Microphone.MicrophoneStream(pyaudio_stream)
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        stream, audio = self.stream, self.audio
+        self.stream = None
+
+        def close():
+            try:
+                stream.close()
+            finally:
+                audio.terminate()
+
+        await asyncio.get_running_loop().run_in_executor(None, close)
+
+    async def read_chunk(self) -> bytes:
+        return await self._queue.get()
+
+
+class AsyncAudioFile(AudioFile):
+    """``AudioFile`` for ``async with``; ``read_chunk()`` returns ``b""`` at the end of the file."""
+
+    async def __aenter__(self) -> AsyncAudioFile:
+        # parsing may decode FLAC through a subprocess, so keep it off the event loop
+        await asyncio.get_running_loop().run_in_executor(None, self.__enter__)
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        self.__exit__(exc_type, exc_value, traceback)
+
+    async def read_chunk(self) -> bytes:
+        buffer = self.stream.read(self.CHUNK)
+        await asyncio.sleep(0)  # let other tasks run between chunks
+        return buffer
+
+
+async def iter_chunks(source) -> AsyncIterator[bytes]:
+    """Yields raw audio buffers from an async source (``AsyncMicrophone``, ``AsyncAudioFile``) until it ends."""
+    while True:
+        buffer = await source.read_chunk()
+        if not buffer:
+            return
+        yield buffer
+
+
+async def get_flac_data(audio_data: AudioData, convert_rate=None, convert_width=None) -> bytes:
+    """``audio_data.get_flac_data`` on the default executor, so the encode (and the first import of ``soundfile``) does not block the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(None, audio_data.get_flac_data, convert_rate, convert_width)
+
+
+class AsyncRecognizer:
+    """asyncio counterpart of ``Recognizer``; settings (``energy_threshold``, ``pause_threshold``,
+    ``operation_timeout``...) are read from and written to the wrapped ``recognizer``."""
+
+    def __init__(self, recognizer: Recognizer | None = None, http_client: AsyncHTTPClient | None = None) -> None:
+        self.recognizer = recognizer if recognizer is not None else Recognizer()
+        self.http_client = http_client if http_client is not None else AsyncHTTPClient()
+        self._sdk_clients: dict[str, object] = {}
+
+    async def __aenter__(self) -> AsyncRecognizer:
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        await self.http_client.close()
+        for client in self._sdk_clients.values():
+            await client.close()
+        self._sdk_clients.clear()
+
+    def _adjust_energy_threshold(self, energy: float, seconds_per_buffer: float) -> None:
+        # dynamically adjust the energy threshold using asymmetric weighted average (same as ``Recognizer._listen``)
+        r = self.recognizer
+        damping = r.dynamic_energy_adjustment_damping ** seconds_per_buffer
+        target_energy = energy * r.dynamic_energy_ratio
+        r.energy_threshold = r.energy_threshold * damping + target_energy * (1 - damping)
+
+    async def adjust_for_ambient_noise(self, source, duration: float = 1) -> None:
+        """Async ``Recognizer.adjust_for_ambient_noise``."""
+        seconds_per_buffer = float(source.CHUNK) / source.SAMPLE_RATE
+        elapsed_time = 0.0
+        while True:
+            elapsed_time += seconds_per_buffer
+            if elapsed_time > duration:
+                break
+            buffer = await source.read_chunk()
+            if not buffer:
+                break
+            self._adjust_energy_threshold(audioop.rms(buffer, source.SAMPLE_WIDTH), seconds_per_buffer)
+
+    async def listen(self, source, timeout: float | None = None, phrase_time_limit: float | None = None) -> AudioData:
+        """Async ``Recognizer.listen``: records a single phrase from an async source, with the same phrase
+        detection, ``timeout`` and ``phrase_time_limit`` semantics (snowboy is not supported)."""
+        r = self.recognizer
+        assert source.stream is not None, "Audio source must be entered before listening; are you using ``source`` outside of an ``async with`` statement?"
+        assert r.pause_threshold >= r.non_speaking_duration >= 0
+        seconds_per_buffer = float(source.CHUNK) / source.SAMPLE_RATE
+        pause_buffer_count = int(math.ceil(r.pause_threshold / seconds_per_buffer))
+        phrase_buffer_count = int(math.ceil(r.phrase_threshold / seconds_per_buffer))
+        non_speaking_buffer_count = int(math.ceil(r.non_speaking_duration / seconds_per_buffer))
+
+        elapsed_time = 0.0
+        buffer = b""
+        while True:
+            frames = collections.deque()
+
+            # store audio input until the phrase starts
+            while True:
+                elapsed_time += seconds_per_buffer
+                if timeout and elapsed_time > timeout:
+                    raise WaitTimeoutError("listening timed out while waiting for phrase to start")
+                buffer = await source.read_chunk()
+                if not buffer:
+                    break
+                frames.append(buffer)
+                if len(frames) > non_speaking_buffer_count:
+                    frames.popleft()
+                energy = audioop.rms(buffer, source.SAMPLE_WIDTH)
+                if energy > r.energy_threshold:
+                    break
+                if r.dynamic_energy_threshold:
+                    self._adjust_energy_threshold(energy, seconds_per_buffer)
+
+            # read audio input until the phrase ends
+            pause_count, phrase_count = 0, 0
+            phrase_start_time = elapsed_time
+            while buffer:
+                elapsed_time += seconds_per_buffer
+                if phrase_time_limit and elapsed_time - phrase_start_time > phrase_time_limit:
+                    break
+                buffer = await source.read_chunk()
+                if not buffer:
+                    break
+                frames.append(buffer)
+                phrase_count += 1
+                energy = audioop.rms(buffer, source.SAMPLE_WIDTH)
+                if energy > r.energy_threshold:
+                    pause_count = 0
+                else:
+                    pause_count += 1
+                if pause_count > pause_buffer_count:
+                    break
+                if r.dynamic_energy_threshold:
+                    self._adjust_energy_threshold(energy, seconds_per_buffer)
+
+            # retry listening if the phrase is too short (a click or pop), unless the stream has ended
+            phrase_count -= pause_count
+            if phrase_count >= phrase_buffer_count or not buffer:
+                break
+
+        for _ in range(pause_count - non_speaking_buffer_count):
+            frames.pop()  # remove extra non-speaking frames at the end
+        return AudioData(b"".join(frames), source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+
+    async def recognize_google(self, audio_data: AudioData, key: str | None = None, language: str = "en-US", pfilter=0, show_all: bool = False, with_confidence: bool = False, *, endpoint: str | None = None):
+        """Async ``Recognizer.recognize_google`` over the pooled HTTP client; same arguments, results and exceptions."""
+        from .recognizers import google
+
+        request_builder = google.create_request_builder(
+            endpoint=endpoint or google.ENDPOINT, key=key, language=language, filter_level=pfilter
+        )
+        if not isinstance(audio_data, AudioData):
+            raise ValueError("``audio_data`` must be audio data")
+        flac_data = await get_flac_data(
+            audio_data, convert_rate=request_builder.to_convert_rate(audio_data.sample_rate), convert_width=2
+        )
+        try:
+            response = await self.http_client.request(
+                "POST", request_builder.build_url(), flac_data,
+                request_builder.build_headers(audio_data), timeout=self.recognizer.operation_timeout,
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            raise RequestError("recognition connection failed: {}".format(e or type(e).__name__))
+        if response.status >= 400:
+            raise RequestError("recognition request failed: {}".format(response.reason))
+        return google.OutputParser(show_all=show_all, with_confidence=with_confidence).parse(response.text())
+
+    async def _recognize_openai_compatible(self, name: str, sdk_client, audio_data: AudioData, model: str, **kwargs) -> str:
+        if not isinstance(audio_data, AudioData):
+            raise ValueError("``audio_data`` must be an ``AudioData`` instance")
+        client = self._sdk_clients.get(name)
+        if client is None:
+            client = self._sdk_clients[name] = sdk_client()
+        transcript = await client.audio.transcriptions.create(
+            file=("SpeechRecognition_audio.wav", audio_data.get_wav_data()), model=model, **kwargs
+        )
+        return transcript.text
+
+    async def recognize_openai(self, audio_data: AudioData, *, model: str = "whisper-1", **kwargs) -> str:
+        """Async ``Recognizer.recognize_openai`` using one ``openai.AsyncOpenAI`` client (and its connection pool)."""
+        try:
+            import openai
+        except ImportError:
+            raise SetupError("missing openai module: ensure that openai is set up correctly.")
+        return await self._recognize_openai_compatible("openai", openai.AsyncOpenAI, audio_data, model, **kwargs)
+
+    async def recognize_groq(self, audio_data: AudioData, *, model: str = "whisper-large-v3-turbo", **kwargs) -> str:
+        """Async ``Recognizer.recognize_groq`` using one ``groq.AsyncGroq`` client (and its connection pool)."""
+        try:
+            import groq
+        except ImportError:
+            raise SetupError("missing groq module: ensure that groq is set up correctly.")
+        return await self._recognize_openai_compatible("groq", groq.AsyncGroq, audio_data, model, **kwargs)
+
+    def __getattr__(self, name: str):
+        # any other ``recognize_*`` runs the blocking implementation on the default executor
+        if not name.startswith("recognize_"):
+            raise AttributeError(name)
+        method = getattr(self.recognizer, name)
+
+        async def run_in_executor(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, lambda: method(*args, **kwargs))
+
+        run_in_executor.__name__ = name
+        run_in_executor.__doc__ = "Runs ``Recognizer.{}`` on the event loop's default executor.".format(name)
+        return run_in_executor
@@ -1,26 +1,30 @@
 from __future__ import annotations
 
-import aifc
 import audioop
 import io
+import math
 import os
-import platform
 import stat
-import subprocess
+import struct
 import sys
-import wave
+
+# FLAC compression level used by ``AudioData.get_flac_data`` (0-8, like the ``flac`` tool's ``-0`` ... ``-8``).
+# Level 5 is libFLAC's default; ``--best`` (8) costs several times the encoding time for ~1% smaller files.
+FLAC_COMPRESSION_LEVEL = 5
 
 
 class AudioData(object):
     """
     Creates a new ``AudioData`` instance, which represents mono audio data.
 
-    The raw audio data is specified by ``frame_data``, which is a sequence of bytes representing audio samples. This is the frame data structure used by the PCM WAV format.
+    The raw audio data is specified by ``frame_data``, which is a sequence of bytes representing audio samples. This is the frame data structure used by the PCM WAV format. Any object supporting the buffer protocol (``bytes``, ``bytearray``, ``memoryview``, ``array.array``, ...) is accepted and used without copying.
 
     The width of each sample, in bytes, is specified by ``sample_width``. Each group of ``sample_width`` bytes represents a single audio sample.
 
     The audio data is assumed to have a sample rate of ``sample_rate`` samples per second (Hertz).
 
+    Converted representations (``get_raw_data``/``get_wav_data``/``get_aiff_data``/``get_flac_data`` with a given rate and width) are computed on first use and cached on the instance, so sending the same audio to several recognizers converts it once.
+
     Usually, instances of this class are obtained from ``recognizer_instance.record`` or ``recognizer_instance.listen``, or in the callback for ``recognizer_instance.listen_in_background``, rather than instantiating them directly.
     """
 
@@ -32,6 +36,8 @@ class AudioData(object):
         self.frame_data = frame_data
         self.sample_rate = sample_rate
         self.sample_width = int(sample_width)
+        self._cache = {}
+        self._cache_source = frame_data
 
     @classmethod
     def from_file(cls, file_path: str) -> AudioData:
@@ -47,6 +53,8 @@ class AudioData(object):
         Returns a new ``AudioData`` instance, trimmed to a given time interval. In other words, an ``AudioData`` instance with the same audio data except starting at ``start_ms`` milliseconds in and ending ``end_ms`` milliseconds in.
 
         If not specified, ``start_ms`` defaults to the beginning of the audio, and ``end_ms`` defaults to the end.
+
+        The new instance shares this instance's buffer through a ``memoryview`` slice instead of copying it.
         """
         assert (
             start_ms is None or start_ms >= 0
@@ -54,42 +62,57 @@ class AudioData(object):
         assert end_ms is None or end_ms >= (
             0 if start_ms is None else start_ms
         ), "``end_ms`` must be a non-negative number greater or equal to ``start_ms``"
+        frames = self.frame_view()
+        # cut on whole samples, so that multi-byte samples are never split
         if start_ms is None:
             start_byte = 0
         else:
-            start_byte = int(
-                (start_ms * self.sample_rate * self.sample_width) // 1000
-            )
+            start_byte = int(start_ms * self.sample_rate // 1000) * self.sample_width
         if end_ms is None:
-            end_byte = len(self.frame_data)
+            end_byte = len(frames)
         else:
-            end_byte = int(
-                (end_ms * self.sample_rate * self.sample_width) // 1000
-            )
+            end_byte = int(end_ms * self.sample_rate // 1000) * self.sample_width
         return AudioData(
-            self.frame_data[start_byte:end_byte],
+            frames[start_byte:end_byte],
             self.sample_rate,
             self.sample_width,
         )
 
-    def get_raw_data(self, convert_rate=None, convert_width=None):
-        """
-        Returns a byte string representing the raw frame data for the audio represented by the ``AudioData`` instance.
-
-        If ``convert_rate`` is specified and the audio sample rate is not ``convert_rate`` Hz, the resulting audio is resampled to match.
-
-        If ``convert_width`` is specified and the audio samples are not ``convert_width`` bytes each, the resulting audio is converted to match.
-
-        Writing these bytes directly to a file results in a valid `RAW/PCM audio file <https://en.wikipedia.org/wiki/Raw_audio_format>`__.
-        """
-        assert (
-            convert_rate is None or convert_rate > 0
-        ), "Sample rate to convert to must be a positive integer"
-        assert convert_width is None or (
-            convert_width % 1 == 0 and 1 <= convert_width <= 4
-        ), "Sample width to convert to must be between 1 and 4 inclusive"
-
-        raw_data = self.frame_data
+    def frame_view(self):
+        """Returns the frame data as a flat, read-only ``memoryview`` of bytes, without copying it."""
+        view = memoryview(self.frame_data)
+        if view.ndim != 1 or view.format != "B":
+            view = view.cast("B")
+        return view.toreadonly()
+
+    def _cached(self, key, compute):
+        """Returns ``compute()``, memoized per conversion target ``key``."""
+        if self._cache_source is not self.frame_data:  # ``frame_data`` was replaced, so every cached conversion is stale
+            self._cache = {}
+            self._cache_source = self.frame_data
+        try:
+            return self._cache[key]
+        except KeyError:
+            value = self._cache[key] = compute()
+            return value
+
+    def _target(self, convert_rate, convert_width):
+        """Normalizes conversion arguments so that equivalent requests share a cache entry."""
+        if convert_rate == self.sample_rate:
+            convert_rate = None
+        # for 8-bit audio, an explicit ``convert_width=1`` differs from ``None``: only the former returns unsigned samples
+        if convert_width == self.sample_width and self.sample_width != 1:
+            convert_width = None
+        return convert_rate, convert_width
+
+    def _converted_frames(self, convert_rate, convert_width):
+        """Like ``get_raw_data``, but returns the original buffer rather than a ``bytes`` copy when nothing needs converting."""
+        if convert_rate is None and convert_width is None and self.sample_width != 1:
+            return self.frame_data if isinstance(self.frame_data, bytes) else self.frame_view()
+        return self._cached(("raw", convert_rate, convert_width), lambda: self._convert(convert_rate, convert_width))
+
+    def _convert(self, convert_rate, convert_width):
+        raw_data = self.frame_view()
 
         # make sure unsigned 8-bit audio (which uses unsigned samples) is handled like higher sample width audio (which uses signed samples)
         if self.sample_width == 1:
@@ -98,7 +121,7 @@ class AudioData(object):
             )  # subtract 128 from every sample to make them act like signed samples
 
         # resample audio at the desired rate if specified
-        if convert_rate is not None and self.sample_rate != convert_rate:
+        if convert_rate is not None:
             raw_data, _ = audioop.ratecv(
                 raw_data,
                 self.sample_width,
@@ -108,33 +131,11 @@ class AudioData(object):
                 None,
             )
 
-        # convert samples to desired sample width if specified
+        # convert samples to desired sample width if specified (``audioop`` supports 24-bit samples since Python 3.4)
         if convert_width is not None and self.sample_width != convert_width:
-            if (
-                convert_width == 3
-            ):  # we're converting the audio into 24-bit (workaround for https://bugs.python.org/issue12866)
-                raw_data = audioop.lin2lin(
-                    raw_data, self.sample_width, 4
-                )  # convert audio into 32-bit first, which is always supported
-                try:
-                    audioop.bias(
-                        b"", 3, 0
-                    )  # test whether 24-bit audio is supported (for example, ``audioop`` in Python 3.3 and below don't support sample width 3, while Python 3.4+ do)
-                except (
-                    audioop.error
-                ):  # this version of audioop doesn't support 24-bit audio (probably Python 3.3 or less)
-                    raw_data = b"".join(
-                        raw_data[i + 1: i + 4]
-                        for i in range(0, len(raw_data), 4)
-                    )  # since we're in little endian, we discard the first byte from each 32-bit sample to get a 24-bit sample
-                else:  # 24-bit audio fully supported, we don't need to shim anything
-                    raw_data = audioop.lin2lin(
-                        raw_data, self.sample_width, convert_width
-                    )
-            else:
-                raw_data = audioop.lin2lin(
-                    raw_data, self.sample_width, convert_width
-                )
+            raw_data = audioop.lin2lin(
+                raw_data, self.sample_width, convert_width
+            )
 
         # if the output is 8-bit audio with unsigned samples, convert the samples we've been treating as signed to unsigned again
         if convert_width == 1:
@@ -142,6 +143,28 @@ class AudioData(object):
                 raw_data, 1, 128
             )  # add 128 to every sample to make them act like unsigned samples again
 
+        return bytes(raw_data)
+
+    def get_raw_data(self, convert_rate=None, convert_width=None):
+        """
+        Returns a byte string representing the raw frame data for the audio represented by the ``AudioData`` instance.
+
+        If ``convert_rate`` is specified and the audio sample rate is not ``convert_rate`` Hz, the resulting audio is resampled to match.
+
+        If ``convert_width`` is specified and the audio samples are not ``convert_width`` bytes each, the resulting audio is converted to match.
+
+        Writing these bytes directly to a file results in a valid `RAW/PCM audio file <https://en.wikipedia.org/wiki/Raw_audio_format>`__.
+        """
+        assert (
+            convert_rate is None or convert_rate > 0
+        ), "Sample rate to convert to must be a positive integer"
+        assert convert_width is None or (
+            convert_width % 1 == 0 and 1 <= convert_width <= 4
+        ), "Sample width to convert to must be between 1 and 4 inclusive"
+
+        raw_data = self._converted_frames(*self._target(convert_rate, convert_width))
+        if not isinstance(raw_data, bytes):  # ``frame_data`` is some other buffer, such as a segment's memoryview
+            raw_data = self._cached(("raw", None, None), lambda: bytes(self.frame_view()))
         return raw_data
 
     def get_wav_data(self, convert_rate=None, convert_width=None):
@@ -154,7 +177,11 @@ class AudioData(object):
 
         Writing these bytes directly to a file results in a valid `WAV file <https://en.wikipedia.org/wiki/WAV>`__.
         """
-        raw_data = self.get_raw_data(convert_rate, convert_width)
+        convert_rate, convert_width = self._target(convert_rate, convert_width)
+        return self._cached(("wav", convert_rate, convert_width), lambda: self._build_wav(convert_rate, convert_width))
+
+    def _build_wav(self, convert_rate, convert_width):
+        raw_data = self._converted_frames(convert_rate, convert_width)
         sample_rate = (
             self.sample_rate if convert_rate is None else convert_rate
         )
@@ -162,18 +189,16 @@ class AudioData(object):
             self.sample_width if convert_width is None else convert_width
         )
 
-        # generate the WAV file contents
-        with io.BytesIO() as wav_file:
-            wav_writer = wave.open(wav_file, "wb")
-            try:  # note that we can't use context manager, since that was only added in Python 3.4
-                wav_writer.setframerate(sample_rate)
-                wav_writer.setsampwidth(sample_width)
-                wav_writer.setnchannels(1)
-                wav_writer.writeframes(raw_data)
-                wav_data = wav_file.getvalue()
-            finally:  # make sure resources are cleaned up
-                wav_writer.close()
-        return wav_data
+        # generate the WAV file contents: the same canonical 44-byte PCM header ``wave`` writes, followed by the samples (copied once)
+        data_size = memoryview(raw_data).nbytes
+        header = struct.pack(
+            "<4sI4s4sIHHIIHH4sI",
+            b"RIFF", 36 + data_size, b"WAVE",
+            b"fmt ", 16, 1, 1,  # PCM, mono
+            sample_rate, sample_rate * sample_width, sample_width, sample_width * 8,
+            b"data", data_size,
+        )
+        return b"".join((header, raw_data))
 
     def get_aiff_data(self, convert_rate=None, convert_width=None):
         """
@@ -185,7 +210,11 @@ class AudioData(object):
 
         Writing these bytes directly to a file results in a valid `AIFF-C file <https://en.wikipedia.org/wiki/Audio_Interchange_File_Format>`__.
         """
-        raw_data = self.get_raw_data(convert_rate, convert_width)
+        convert_rate, convert_width = self._target(convert_rate, convert_width)
+        return self._cached(("aiff", convert_rate, convert_width), lambda: self._build_aiff(convert_rate, convert_width))
+
+    def _build_aiff(self, convert_rate, convert_width):
+        raw_data = self._converted_frames(convert_rate, convert_width)
         sample_rate = (
             self.sample_rate if convert_rate is None else convert_rate
         )
@@ -194,30 +223,22 @@ class AudioData(object):
         )
 
         # the AIFF format is big-endian, so we need to convert the little-endian raw data to big-endian
-        if hasattr(
-            audioop, "byteswap"
-        ):  # ``audioop.byteswap`` was only added in Python 3.4
-            raw_data = audioop.byteswap(raw_data, sample_width)
-        else:  # manually reverse the bytes of each sample, which is slower but works well enough as a fallback
-            raw_data = raw_data[sample_width - 1:: -1] + b"".join(
-                raw_data[i + sample_width: i: -1]
-                for i in range(sample_width - 1, len(raw_data), sample_width)
-            )
+        raw_data = audioop.byteswap(raw_data, sample_width)
+
+        # generate the AIFF-C file contents, laid out the way ``aifc`` writes them (uncompressed, no markers)
+        data_size = len(raw_data)
+        padding = b"\x00" if data_size & 1 else b""
+        header = struct.pack(
+            ">4sI4s" "4sII" "4sIhIh10s4s16s" "4sIII",
+            b"FORM", 4 + 12 + 8 + 38 + 16 + data_size + len(padding), b"AIFC",
+            b"FVER", 4, 0xA2805140,  # AIFC version 1
+            b"COMM", 38, 1, data_size // sample_width, sample_width * 8, _extended_float(sample_rate),
+            b"NONE", b"\x0enot compressed\x00",
+            b"SSND", data_size + len(padding) + 8, 0, 0,
+        )
+        return b"".join((header, raw_data, padding))
 
-        # generate the AIFF-C file contents
-        with io.BytesIO() as aiff_file:
-            aiff_writer = aifc.open(aiff_file, "wb")
-            try:  # note that we can't use context manager, since that was only added in Python 3.4
-                aiff_writer.setframerate(sample_rate)
-                aiff_writer.setsampwidth(sample_width)
-                aiff_writer.setnchannels(1)
-                aiff_writer.writeframes(raw_data)
-                aiff_data = aiff_file.getvalue()
-            finally:  # make sure resources are cleaned up
-                aiff_writer.close()
-        return aiff_data
-
-    def get_flac_data(self, convert_rate=None, convert_width=None):
+    def get_flac_data(self, convert_rate=None, convert_width=None, compression_level=None):
         """
         Returns a byte string representing the contents of a FLAC file containing the audio represented by the ``AudioData`` instance.
 
@@ -227,50 +248,130 @@ class AudioData(object):
 
         If ``convert_width`` is specified and the audio samples are not ``convert_width`` bytes each, the resulting audio is converted to match.
 
+        ``compression_level`` (0-8, defaults to ``FLAC_COMPRESSION_LEVEL``) trades encoding time for file size.
+
+        The audio is encoded in-process with ``soundfile`` (libFLAC) when it is installed, otherwise by piping a WAV through the FLAC command line tool. The result is cached on the instance, so asking for the same FLAC again (for example when retrying a request) does not encode it again.
+
         Writing these bytes directly to a file results in a valid `FLAC file <https://en.wikipedia.org/wiki/FLAC>`__.
         """
         assert convert_width is None or (
             convert_width % 1 == 0 and 1 <= convert_width <= 3
         ), "Sample width to convert to must be between 1 and 3 inclusive"
+        if compression_level is None:
+            compression_level = FLAC_COMPRESSION_LEVEL
+        assert (
+            compression_level % 1 == 0 and 0 <= compression_level <= 8
+        ), "Compression level must be between 0 and 8 inclusive"
 
         if (
             self.sample_width > 3 and convert_width is None
         ):  # resulting WAV data would be 32-bit, which is not convertable to FLAC using our encoder
             convert_width = 3  # the largest supported sample width is 24-bit, so we'll limit the sample width to that
 
-        # run the FLAC converter with the WAV data to get the FLAC data
-        wav_data = self.get_wav_data(convert_rate, convert_width)
-        flac_converter = get_flac_converter()
-        if (
-            os.name == "nt"
-        ):  # on Windows, specify that the process is to be started without showing a console window
-            startup_info = subprocess.STARTUPINFO()
-            startup_info.dwFlags |= (
-                subprocess.STARTF_USESHOWWINDOW
-            )  # specify that the wShowWindow field of `startup_info` contains a value
-            startup_info.wShowWindow = (
-                subprocess.SW_HIDE
-            )  # specify that the console window should be hidden
-        else:
-            startup_info = None  # default startupinfo
-        process = subprocess.Popen(
-            [
-                flac_converter,
-                "--stdout",
-                "--totally-silent",  # put the resulting FLAC file in stdout, and make sure it's not mixed with any program output
-                "--best",  # highest level of compression available
-                "-",  # the input FLAC file contents will be given in stdin
-            ],
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            startupinfo=startup_info,
+        convert_rate, convert_width = self._target(convert_rate, convert_width)
+        return self._cached(
+            ("flac", convert_rate, convert_width, int(compression_level)),
+            lambda: self._encode_flac(convert_rate, convert_width, int(compression_level)),
         )
-        flac_data, stderr = process.communicate(wav_data)
+
+    def _encode_flac(self, convert_rate, convert_width, compression_level):
+        flac_data = encode_flac_in_process(self, convert_rate, convert_width, compression_level)
+        if flac_data is None:  # soundfile or its FLAC support is not available
+            flac_data = encode_flac_subprocess(self.get_wav_data(convert_rate, convert_width), compression_level)
         return flac_data
 
 
+def in_process_flac_available():
+    """Returns ``True`` if ``soundfile`` is installed and can write FLAC, so encoding does not start a subprocess."""
+    try:
+        import soundfile
+    except (ImportError, OSError):  # OSError: the libsndfile shared library is missing
+        return False
+    return "FLAC" in soundfile.available_formats()
+
+
+def encode_flac_in_process(audio_data, convert_rate, convert_width, compression_level):
+    """Returns FLAC file contents encoded with ``soundfile``, or ``None`` if ``soundfile`` cannot write FLAC here."""
+    if not in_process_flac_available():
+        return None
+    import soundfile
+
+    raw_data = audio_data._converted_frames(*audio_data._target(convert_rate, convert_width))
+    sample_rate = audio_data.sample_rate if convert_rate is None else convert_rate
+    sample_width = audio_data.sample_width if convert_width is None else convert_width
+
+    # libsndfile takes native-endian int16/int32 buffers and scales them to the FLAC bit depth
+    if sample_width == 1:
+        raw_data = audioop.lin2lin(audioop.bias(raw_data, 1, -128), 1, 2)  # unsigned 8-bit samples to signed 16-bit
+        dtype, subtype, item_width = "int16", "PCM_S8", 2
+    elif sample_width == 2:
+        dtype, subtype, item_width = "int16", "PCM_16", 2
+    else:
+        raw_data = audioop.lin2lin(raw_data, 3, 4)
+        dtype, subtype, item_width = "int32", "PCM_24", 4
+    if sys.byteorder == "big":
+        raw_data = audioop.byteswap(raw_data, item_width)
+
+    options = {"compression_level": compression_level / 8.0}
+    while True:
+        with io.BytesIO() as flac_file:
+            try:
+                with soundfile.SoundFile(flac_file, "w", sample_rate, 1, subtype, format="FLAC", **options) as f:
+                    f.buffer_write(raw_data, dtype)
+            except TypeError:  # soundfile < 0.12 has no ``compression_level``; libsndfile's default is level 5
+                if not options:
+                    raise
+                options = {}
+                continue
+            except RuntimeError:  # libsndfile refused the format or the sample rate
+                return None
+            return flac_file.getvalue()
+
+
+def encode_flac_subprocess(wav_data, compression_level):
+    """Returns FLAC file contents produced by running the FLAC command line tool on ``wav_data``."""
+    import subprocess
+
+    flac_converter = get_flac_converter()
+    if (
+        os.name == "nt"
+    ):  # on Windows, specify that the process is to be started without showing a console window
+        startup_info = subprocess.STARTUPINFO()
+        startup_info.dwFlags |= (
+            subprocess.STARTF_USESHOWWINDOW
+        )  # specify that the wShowWindow field of `startup_info` contains a value
+        startup_info.wShowWindow = (
+            subprocess.SW_HIDE
+        )  # specify that the console window should be hidden
+    else:
+        startup_info = None  # default startupinfo
+    process = subprocess.Popen(
+        [
+            flac_converter,
+            "--stdout",
+            "--totally-silent",  # put the resulting FLAC file in stdout, and make sure it's not mixed with any program output
+            "-{}".format(compression_level),  # compression level, from -0 (fastest) to -8 (--best)
+            "-",  # the input FLAC file contents will be given in stdin
+        ],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        startupinfo=startup_info,
+    )
+    flac_data, stderr = process.communicate(wav_data)
+    return flac_data
+
+
+def _extended_float(value):
+    """Encodes a positive number as the 80-bit IEEE 754 extended float AIFF uses for sample rates."""
+    mantissa, exponent = math.frexp(value)
+    mantissa = int(math.ldexp(mantissa, 64))
+    return struct.pack(">HQ", exponent + 16382, mantissa)
+
+
 def get_flac_converter():
     """Returns the absolute path of a FLAC converter executable, or raises an OSError if none can be found."""
+    import platform
+
     flac_converter = shutil_which("flac")  # check for installed version first
     if flac_converter is None:  # flac utility is not installed
         base_path = os.path.dirname(
@@ -0,0 +1,89 @@
+"""Splitting long recordings at pauses, for ``Recognizer.recognize_long``.
+
+Recognition services and local engines take a whole clip per call, so a ten minute recording is one long
+request. ``split_at_pauses`` cuts it into chunks of bounded length at quiet stretches (so no word is cut in
+half), which can then be transcribed concurrently and put back in order by their start times.
+"""
+
+from __future__ import annotations
+
+import audioop
+from typing import NamedTuple
+
+from .audio import AudioData
+from .exceptions import UnknownValueError
+
+
+class TranscribedChunk(NamedTuple):
+    text: str  # what the recognizer returned for the chunk
+    start: float  # seconds into the recording
+    end: float
+
+
+def frame_energies(audio_data: AudioData, frame_seconds: float) -> list[int]:
+    """RMS energy of each ``frame_seconds`` frame of ``audio_data`` (the last frame may be shorter)."""
+    width = audio_data.sample_width
+    frame_bytes = max(1, int(audio_data.sample_rate * frame_seconds)) * width
+    frames = audio_data.frame_view()
+    energies = []
+    for offset in range(0, len(frames) - len(frames) % width, frame_bytes):
+        frame = frames[offset:offset + frame_bytes]
+        if width == 1:  # 8-bit WAV samples are unsigned
+            frame = audioop.bias(frame, 1, -128)
+        energies.append(audioop.rms(frame, width))
+    return energies
+
+
+def split_at_pauses(audio_data: AudioData, energy_threshold: float, max_chunk_seconds: float = 30.0, pause_seconds: float = 0.3, frame_seconds: float = 0.03) -> list[tuple[float, float]]:
+    """
+    Returns ``(start, end)`` times in seconds of chunks covering the speech in ``audio_data``.
+
+    Frames with an energy above ``energy_threshold`` are speech. Each chunk is cut in the middle of the last pause (at least ``pause_seconds`` of non-speech) that keeps it within ``max_chunk_seconds``, or at ``max_chunk_seconds`` when there is no such pause. Chunks without any speech are left out.
+    """
+    assert max_chunk_seconds > 0 and pause_seconds >= 0
+    energies = frame_energies(audio_data, frame_seconds)
+    frame_count = len(energies)
+    frame_seconds = max(1, int(audio_data.sample_rate * frame_seconds)) / float(audio_data.sample_rate)
+    duration = len(audio_data.frame_view()) // audio_data.sample_width / float(audio_data.sample_rate)
+    max_frames = max(1, int(max_chunk_seconds / frame_seconds))
+    pause_frames = max(1, int(round(pause_seconds / frame_seconds)))
+
+    # candidate cut points: the middle frame of every pause that is long enough
+    cuts = []
+    silence_start = None
+    for index, energy in enumerate(energies + [float("inf")]):  # the sentinel ends a trailing pause
+        if energy <= energy_threshold:
+            if silence_start is None:
+                silence_start = index
+        elif silence_start is not None:
+            if index - silence_start >= pause_frames:
+                cuts.append((silence_start + index) // 2)
+            silence_start = None
+
+    spans = []
+    start, cut_index = 0, 0
+    while start < frame_count:
+        end = min(start + max_frames, frame_count)
+        if end < frame_count:
+            while cut_index < len(cuts) and cuts[cut_index] <= start:
+                cut_index += 1
+            best = None
+            while cut_index < len(cuts) and cuts[cut_index] <= end:
+                best = cuts[cut_index]
+                cut_index += 1
+            if best is not None:
+                end = best
+        if any(energy > energy_threshold for energy in energies[start:end]):
+            spans.append((start * frame_seconds, min(end * frame_seconds, duration)))
+        start = end
+    return spans
+
+
+def recognize_chunk(recognizer_instance, recognize, audio_data: AudioData, kwargs: dict):
+    """Runs one chunk through ``recognize`` (a ``recognize_*`` method name or a callable); ``None`` if it was unintelligible."""
+    if isinstance(recognize, str):
+        recognize = getattr(recognizer_instance, recognize)
+    try:
+        return recognize(audio_data, **kwargs)
+    except UnknownValueError:
+        return None
@@ -0,0 +1,141 @@
+"""Process-wide cache of loaded local recognizer models.
+
+Loading Whisper / faster-whisper weights or a Vosk model takes seconds and hundreds of
+megabytes, so the local recognizers keep loaded models here, keyed by backend, model name and
+load options, instead of reloading them for every utterance.
+
+* Thread-safe: concurrent requests for the same key load the model once; different keys load
+  in parallel.
+* LRU eviction once the estimated size of the cached models exceeds ``max_bytes`` (the most
+  recently used model is always kept, even when it alone is over the cap).
+* ``warm_up`` functions in each recognizer module load a model ahead of the first utterance.
+
+The cap defaults to ``$SPEECH_RECOGNITION_MODEL_CACHE_MB`` megabytes (2048 when unset).
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+DEFAULT_MAX_BYTES = int(os.environ.get("SPEECH_RECOGNITION_MODEL_CACHE_MB", "2048")) * 1024 * 1024
+
+
+class CachedModel:
+    """A loaded model plus its estimated size and a lock for backends that are not re-entrant."""
+
+    __slots__ = ("key", "model", "size", "lock")
+
+    def __init__(self, key: Hashable, model: Any, size: int) -> None:
+        self.key = key
+        self.model = model
+        self.size = size
+        self.lock = threading.Lock()
+
+
+class ModelCache:
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, CachedModel] = OrderedDict()
+        self._loading: dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        key: Hashable,
+        load: Callable[[], Any],
+        size_of: Callable[[Any], int] | None = None,
+    ) -> CachedModel:
+        """Return the cached model for ``key``, calling ``load()`` on a miss.
+
+        ``size_of(model)`` estimates the model's memory footprint in bytes for the cap."""
+        with self._lock:
+            entry = self._touch(key)
+            if entry is not None:
+                self.hits += 1
+                return entry
+            load_lock = self._loading.setdefault(key, threading.Lock())
+
+        with load_lock:
+            # Another thread may have finished loading the same key while we waited.
+            with self._lock:
+                entry = self._touch(key)
+                if entry is not None:
+                    self.hits += 1
+                    return entry
+            try:
+                model = load()
+                size = size_of(model) if size_of is not None else 0
+            except BaseException:
+                with self._lock:
+                    self._loading.pop(key, None)
+                raise
+            entry = CachedModel(key, model, size)
+            with self._lock:
+                self._loading.pop(key, None)
+                self.misses += 1
+                self._entries[key] = entry
+                self._evict()
+            return entry
+
+    def _touch(self, key: Hashable) -> CachedModel | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def _evict(self) -> None:
+        while len(self._entries) > 1 and self.total_bytes() > self.max_bytes:
+            self._entries.popitem(last=False)
+
+    def total_bytes(self) -> int:
+        return sum(entry.size for entry in self._entries.values())
+
+    def set_max_bytes(self, max_bytes: int) -> None:
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def keys(self) -> list[Hashable]:
+        """Cached keys, least recently used first."""
+        with self._lock:
+            return list(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+def make_key(backend: str, model: str, options: dict[str, Any] | None) -> tuple:
+    """Hashable cache key; option values are compared by ``repr`` (e.g. ``torch.device``)."""
+    return (backend, str(model), tuple(sorted((k, repr(v)) for k, v in (options or {}).items())))
+
+
+def directory_size(path: str) -> int:
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+models = ModelCache()
@@ -0,0 +1,88 @@
+"""Incremental (streaming) recognition sessions.
+
+A session is fed raw PCM chunks as they are captured and returns hypotheses as soon as the
+engine has them, instead of recognizing a complete ``AudioData`` phrase in one shot:
+
+    session = open_session("vosk", sample_rate=16000, sample_width=2)
+    for chunk in chunks:
+        for hypothesis in session.feed(chunk):
+            print(hypothesis.text, hypothesis.is_final)
+    print(session.finish().text)
+
+``Recognizer.recognize_stream`` drives a session from an ``AudioSource`` such as ``Microphone``.
+"""
+
+from __future__ import annotations
+
+import audioop
+from typing import Callable, NamedTuple
+
+
+class Hypothesis(NamedTuple):
+    text: str
+    is_final: bool
+    start: float  # seconds into the stream
+    end: float
+
+
+class StreamingSession:
+    """Base class: converts chunks to 16-bit PCM at the engine's rate and keeps stream time."""
+
+    engine_rate = 16000
+
+    def __init__(self, sample_rate: int, sample_width: int) -> None:
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.samples_fed = 0  # at engine_rate
+        self._ratecv_state = None
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds of audio fed so far."""
+        return self.samples_fed / float(self.engine_rate)
+
+    def _convert(self, data: bytes) -> bytes:
+        if self.sample_width == 1:
+            data = audioop.bias(data, 1, -128)
+        if self.sample_width != 2:
+            data = audioop.lin2lin(data, self.sample_width, 2)
+        if self.sample_rate != self.engine_rate:
+            # ratecv state is carried across chunks so the boundaries do not click.
+            data, self._ratecv_state = audioop.ratecv(
+                data, 2, 1, self.sample_rate, self.engine_rate, self._ratecv_state
+            )
+        self.samples_fed += len(data) // 2
+        return data
+
+    def feed(self, data: bytes) -> list[Hypothesis]:
+        """Add a chunk of raw PCM; returns hypotheses that became available (possibly none)."""
+        return self._accept(self._convert(data))
+
+    def finish(self) -> Hypothesis:
+        """Flush the engine and return the final hypothesis for the audio since the last final one."""
+        raise NotImplementedError
+
+    def _accept(self, pcm16: bytes) -> list[Hypothesis]:
+        raise NotImplementedError
+
+
+_ENGINES: dict[str, Callable[..., StreamingSession]] = {}
+
+
+def register_engine(name: str, factory: Callable[..., StreamingSession]) -> None:
+    _ENGINES[name] = factory
+
+
+def open_session(engine: str, sample_rate: int, sample_width: int, **options) -> StreamingSession:
+    """Create a session for ``engine`` ("vosk" or "faster_whisper"); ``options`` go to the engine."""
+    if engine not in _ENGINES:
+        # Engines register themselves when their recognizer module is imported.
+        if engine == "vosk":
+            from speech_recognition.recognizers import vosk  # noqa: F401
+        elif engine == "faster_whisper":
+            from speech_recognition.recognizers.whisper_local import faster_whisper  # noqa: F401
+    try:
+        factory = _ENGINES[engine]
+    except KeyError:
+        raise ValueError(f"No streaming support for {engine!r}; available: {sorted(_ENGINES)}")
+    return factory(sample_rate, sample_width, **options)
@@ -5,15 +5,53 @@ from pathlib import Path
 from typing import TYPE_CHECKING, Literal, TypedDict, Union, cast, overload
 
 from speech_recognition.exceptions import SetupError
+from speech_recognition.recognizers import model_cache, streaming
+from speech_recognition.recognizers.streaming import Hypothesis
 
 if TYPE_CHECKING:
+    from vosk import Model
+
     from speech_recognition.audio import AudioData
 
+SAMPLE_RATE = 16_000
+
 
 class VoskResponse(TypedDict):
     text: str
 
 
+def default_model_path() -> Path:
+    return Path(__file__).parent.parent / "models" / "vosk"
+
+
+def load_model(model_path: Union[str, Path, None] = None) -> model_cache.CachedModel:
+    """Return the cache entry for the Vosk ``Model`` at ``model_path``, loading it on first use.
+
+    Vosk models can be shared between threads; each utterance gets its own ``KaldiRecognizer``."""
+    path = Path(model_path) if model_path is not None else default_model_path()
+    if not path.exists():
+        raise SetupError(
+            f"Vosk model not found at {path}. "
+            "Please download the model using `sprc download vosk` command."
+        )
+
+    def load() -> Model:
+        from vosk import Model
+
+        return Model(str(path))
+
+    return model_cache.models.get(
+        model_cache.make_key("vosk", str(path.resolve()), None),
+        load,
+        lambda _: model_cache.directory_size(str(path)),
+    )
+
+
+def warm_up(model_path: Union[str, Path, None] = None) -> None:
+    """Load the Vosk model ahead of the first utterance."""
+    load_model(model_path)
+
+
 @overload
 def recognize(  # noqa: E704
     _recognizer, audio_data: AudioData, *, verbose: Literal[False]
@@ -33,22 +71,16 @@ def recognize(
     Perform speech recognition on ``audio_data`` using Vosk.
 
     Requires the Vosk model to be downloaded and unpacked in a folder named 'model' (``$PWD/model``).
+    The model is loaded once and kept in the process-wide model cache (see ``model_cache``); only
+    the lightweight ``KaldiRecognizer`` is created per utterance.
 
     If ``verbose`` is ``False`` (default), only the recognized text is returned.
     If ``verbose`` is ``True``, the parsed result dictionary from Vosk is returned.
     """
 
-    from vosk import KaldiRecognizer, Model
+    from vosk import KaldiRecognizer
 
-    vosk_model_path = Path(__file__).parent.parent / "models" / "vosk"
-    if not vosk_model_path.exists():
-        raise SetupError(
-            f"Vosk model not found at {vosk_model_path}. "
-            "Please download the model using `sprc download vosk` command."
-        )
-
-    SAMPLE_RATE = 16_000
-    rec = KaldiRecognizer(Model(str(vosk_model_path)), SAMPLE_RATE)
+    rec = KaldiRecognizer(load_model().model, SAMPLE_RATE)
 
     rec.AcceptWaveform(
         audio_data.get_raw_data(convert_rate=SAMPLE_RATE, convert_width=2)
@@ -60,3 +92,41 @@ def recognize(
         return result
 
     return result["text"]
+
+
+class VoskStreamingSession(streaming.StreamingSession):
+    """Incremental Vosk decoding: ``AcceptWaveform`` per chunk, ``PartialResult`` in between.
+
+    Vosk detects utterance boundaries itself, so one session can yield several final hypotheses."""
+
+    engine_rate = SAMPLE_RATE
+
+    def __init__(self, sample_rate: int, sample_width: int, model_path: Union[str, Path, None] = None) -> None:
+        from vosk import KaldiRecognizer
+
+        super().__init__(sample_rate, sample_width)
+        self._rec = KaldiRecognizer(load_model(model_path).model, SAMPLE_RATE)
+        self._segment_start = 0.0
+        self._last_partial = ""
+
+    def _accept(self, pcm16: bytes) -> list[Hypothesis]:
+        if self._rec.AcceptWaveform(pcm16):
+            final = self._final(self._rec.Result())
+            return [final] if final.text else []
+        partial = json.loads(self._rec.PartialResult()).get("partial", "")
+        if not partial or partial == self._last_partial:
+            return []
+        self._last_partial = partial
+        return [Hypothesis(partial, False, self._segment_start, self.elapsed)]
+
+    def _final(self, result_json: str) -> Hypothesis:
+        hypothesis = Hypothesis(json.loads(result_json).get("text", ""), True, self._segment_start, self.elapsed)
+        self._segment_start = self.elapsed
+        self._last_partial = ""
+        return hypothesis
+
+    def finish(self) -> Hypothesis:
+        return self._final(self._rec.FinalResult())
+
+
+streaming.register_engine("vosk", VoskStreamingSession)
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import os
 from typing import TYPE_CHECKING, Literal, TypedDict
 
 from speech_recognition.audio import AudioData
+from speech_recognition.recognizers import model_cache, streaming
+from speech_recognition.recognizers.streaming import Hypothesis
 from speech_recognition.recognizers.whisper_local.base import (
     TranscribeOutputBase, WhisperCompatibleRecognizer,
 )
@@ -46,6 +49,48 @@ class TranscribeOptionalParameters(TypedDict, total=False):
     # TODO Add others
 
 
+# Approximate float16 weight sizes in MB, used for the model cache's memory cap.
+_MODEL_MB = {"tiny": 75, "base": 145, "small": 485, "medium": 1530, "large": 3090, "turbo": 1620}
+
+
+def _estimated_size(model_name: str, init_options: InitOptionalParameters) -> int:
+    if os.path.isdir(model_name):
+        return model_cache.directory_size(model_name)
+    base_name = model_name.rsplit("/", 1)[-1].replace("faster-whisper-", "").replace("distil-", "")
+    mb = next((size for prefix, size in _MODEL_MB.items() if base_name.startswith(prefix)), _MODEL_MB["large"])
+    if "int8" in init_options.get("compute_type", ""):
+        mb //= 2
+    return mb * 1024 * 1024
+
+
+def load_model(
+    model: str = "base", init_options: InitOptionalParameters | None = None
+) -> model_cache.CachedModel:
+    """Return the cache entry for ``WhisperModel(model, **init_options)``, loading it on first use."""
+    options = init_options or {}
+
+    def load() -> WhisperModel:
+        from faster_whisper import WhisperModel
+
+        return WhisperModel(model, **options)
+
+    return model_cache.models.get(
+        model_cache.make_key("faster_whisper", model, options),
+        load,
+        lambda _: _estimated_size(model, options),
+    )
+
+
+def warm_up(model: str = "base", init_options: InitOptionalParameters | None = None) -> None:
+    """Load ``model`` and run one second of silence through it so the first utterance is fast."""
+    import numpy as np
+
+    # CTranslate2 models are thread-safe, so the entry's lock is not needed here.
+    TranscribableAdapter(load_model(model, init_options).model).transcribe(
+        np.zeros(16000, dtype=np.float32)
+    )
+
+
 def recognize(
     recognizer,
     audio_data: AudioData,
@@ -56,7 +101,7 @@ def recognize(
 ) -> str | TranscribeOutputBase[Segment]:
     """Performs speech recognition on ``audio_data`` (an ``AudioData`` instance), using Whisper.
 
-    Pick ``model`` size (Same as Whisper).
+    Pick ``model`` size (Same as Whisper). Loaded models are kept in the process-wide model cache (see ``model_cache``), so only the first call per ``model``/``init_options`` pays the loading cost.
 
     If ``show_dict`` is true, returns the detailed response from Whisper, including the detected language. Otherwise returns only the transcription.
 
@@ -72,17 +117,85 @@ def recognize(
 
     Other values are passed directly to whisper. See https://github.com/SYSTRAN/faster-whisper/blob/master/faster_whisper/transcribe.py for all options.
     """
-    from faster_whisper import WhisperModel
-
-    model = WhisperModel(model, **init_options or {})
     whisper_recognizer = WhisperCompatibleRecognizer(
-        TranscribableAdapter(model)
+        TranscribableAdapter(load_model(model, init_options).model)
     )
     return whisper_recognizer.recognize(
         audio_data, show_dict=show_dict, **transcribe_options
     )
 
 
+class FasterWhisperStreamingSession(streaming.StreamingSession):
+    """Chunked faster-whisper: re-transcribes the not yet committed audio every ``step`` seconds.
+
+    Each pass yields a partial hypothesis. Once the uncommitted audio is longer than ``window``
+    seconds, every segment but the last is committed as a final hypothesis and its audio dropped,
+    so a pass never decodes more than about ``window`` seconds."""
+
+    def __init__(
+        self,
+        sample_rate: int,
+        sample_width: int,
+        model: str = "base",
+        init_options: InitOptionalParameters | None = None,
+        step: float = 1.0,
+        window: float = 15.0,
+        **transcribe_options: Unpack[TranscribeOptionalParameters],
+    ) -> None:
+        super().__init__(sample_rate, sample_width)
+        self.model = load_model(model, init_options).model
+        self.step = step
+        self.window = window
+        self.transcribe_options = transcribe_options
+        self._buffer = bytearray()  # uncommitted 16 kHz PCM
+        self._offset = 0.0  # stream time of the first uncommitted sample
+        self._unprocessed = 0  # samples added since the last pass
+
+    def _transcribe(self) -> list[Segment]:
+        import numpy as np
+
+        audio_array = np.frombuffer(bytes(self._buffer), dtype="<i2").astype(np.float32) / 32768.0
+        segments, _info = self.model.transcribe(audio_array, **self.transcribe_options)
+        return list(segments)
+
+    def _hypothesis(self, segments: list[Segment], is_final: bool, offset: float) -> Hypothesis:
+        """``offset`` is the stream time of the audio the segments were transcribed from."""
+        text = "".join(segment.text for segment in segments).strip()
+        if not segments:
+            return Hypothesis(text, is_final, offset, self.elapsed)
+        return Hypothesis(text, is_final, offset + segments[0].start, offset + segments[-1].end)
+
+    def _accept(self, pcm16: bytes) -> list[Hypothesis]:
+        self._buffer += pcm16
+        self._unprocessed += len(pcm16) // 2
+        if self._unprocessed < self.step * self.engine_rate:
+            return []
+        self._unprocessed = 0
+        offset = self._offset
+        segments = self._transcribe()
+        hypotheses = []
+        if len(self._buffer) // 2 > self.window * self.engine_rate and len(segments) > 1:
+            committed, segments = segments[:-1], segments[-1:]
+            hypotheses.append(self._hypothesis(committed, True, offset))
+            cut = int(committed[-1].end * self.engine_rate)
+            del self._buffer[:2 * cut]
+            self._offset += cut / float(self.engine_rate)
+        if segments:
+            hypotheses.append(self._hypothesis(segments, False, offset))
+        return hypotheses
+
+    def finish(self) -> Hypothesis:
+        segments = self._transcribe() if self._buffer else []
+        hypothesis = self._hypothesis(segments, True, self._offset)
+        self._buffer.clear()
+        self._offset = self.elapsed
+        self._unprocessed = 0
+        return hypothesis
+
+
+streaming.register_engine("faster_whisper", FasterWhisperStreamingSession)
+
+
 if __name__ == "__main__":
     import argparse
 
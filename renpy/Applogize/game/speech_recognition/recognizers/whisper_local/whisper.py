@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import threading
 from typing import TYPE_CHECKING, Literal, TypedDict
 
 from speech_recognition.audio import AudioData
+from speech_recognition.recognizers import model_cache
 from speech_recognition.recognizers.whisper_local.base import (
     TranscribeOutputBase, WhisperCompatibleRecognizer,
 )
@@ -49,8 +51,9 @@ class Segment(TypedDict):
 
 
 class TranscribableAdapter:
-    def __init__(self, model: Whisper) -> None:
+    def __init__(self, model: Whisper, lock: threading.Lock | None = None) -> None:
         self.model = model
+        self.lock = lock
 
     def transcribe(
         self, audio_array: np.ndarray, **kwargs
@@ -60,7 +63,43 @@ class TranscribableAdapter:
 
             kwargs["fp16"] = torch.cuda.is_available()
 
-        return self.model.transcribe(audio_array, **kwargs)
+        if self.lock is None:
+            return self.model.transcribe(audio_array, **kwargs)
+        # Decoding installs key/value-cache hooks on the shared model, so one utterance at a time.
+        with self.lock:
+            return self.model.transcribe(audio_array, **kwargs)
+
+
+def _parameter_bytes(model: Whisper) -> int:
+    return sum(p.numel() * p.element_size() for p in model.parameters())
+
+
+def load_model(
+    model: str = "base", load_options: LoadModelOptionalParameters | None = None
+) -> model_cache.CachedModel:
+    """Return the cache entry for ``whisper.load_model(model, **load_options)``, loading it on first use."""
+    options = load_options or {}
+
+    def load() -> Whisper:
+        import whisper
+
+        return whisper.load_model(model, **options)
+
+    return model_cache.models.get(
+        model_cache.make_key("whisper", model, options), load, _parameter_bytes
+    )
+
+
+def warm_up(
+    model: str = "base", load_options: LoadModelOptionalParameters | None = None
+) -> None:
+    """Load ``model`` and run one second of silence through it so the first utterance is fast."""
+    import numpy as np
+
+    entry = load_model(model, load_options)
+    TranscribableAdapter(entry.model, entry.lock).transcribe(
+        np.zeros(16000, dtype=np.float32)
+    )
 
 
 def recognize(
@@ -75,6 +114,7 @@ def recognize(
 
     Pick ``model`` from output of :command:`python -c 'import whisper; print(whisper.available_models())'`.
     See also https://github.com/openai/whisper?tab=readme-ov-file#available-models-and-languages.
+    Loaded models are kept in the process-wide model cache (see ``model_cache``), so only the first call per ``model``/``load_options`` pays the loading cost.
 
     If ``show_dict`` is true, returns the full dict response from Whisper, including the detected language. Otherwise returns only the transcription.
 
@@ -91,11 +131,9 @@ def recognize(
     Other values are passed directly to whisper. See https://github.com/openai/whisper/blob/main/whisper/transcribe.py for all options.
     """
 
-    import whisper
-
-    whisper_model = whisper.load_model(model, **load_options or {})
+    entry = load_model(model, load_options)
     whisper_recognizer = WhisperCompatibleRecognizer(
-        TranscribableAdapter(whisper_model)
+        TranscribableAdapter(entry.model, entry.lock)
     )
     return whisper_recognizer.recognize(
         audio_data, show_dict=show_dict, **transcribe_options
@@ -0,0 +1,354 @@
+"""Shared HTTP transport for the cloud recognizers.
+
+``urllib.request.urlopen`` opens (and TLS-handshakes) a new connection for every request. ``HTTPTransport``
+keeps connections alive per host and reuses them, so back-to-back recognitions skip connection setup::
+
+    transport = default_transport()
+    transport.preconnect("https://www.google.com/")  # e.g. while the player is still talking
+    response = transport.urlopen(request, timeout=10)  # a urllib.request.Request
+
+``urlopen`` raises ``urllib.error.HTTPError``/``URLError`` like ``urllib.request.urlopen``, so recognizers keep
+their error handling, and follows redirects the way it does. When a proxy is configured for the URL (``HTTP_PROXY``,
+``HTTPS_PROXY``, ``NO_PROXY``, or the system settings), requests go through ``urllib.request`` instead of the pool.
+
+Requests that fail on a stale keep-alive connection are resent on a new one. Otherwise, only errors opening the
+connection are retried, as a request body that may have reached the server must not be sent twice; throttling and
+unavailable responses (429, 502, 503, 504) are retried too, a bounded number of times.
+
+``TokenCache`` keeps short-lived access tokens (Azure's ``issueToken``) until shortly before they expire.
+"""
+
+from __future__ import annotations
+
+import collections
+import http.client
+import io
+import threading
+import time
+import urllib.request
+from urllib.error import HTTPError, URLError
+from urllib.parse import urljoin, urlsplit
+
+from .exceptions import SetupError
+
+# errors that mean a reused keep-alive connection had been closed by the server in the meantime
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, ConnectionAbortedError, BrokenPipeError)
+
+REDIRECT_STATUSES = frozenset([301, 302, 303, 307, 308])
+
+# headers describing the request body, dropped when a redirect turns a POST into a GET (as ``urllib.request`` does)
+CONTENT_HEADERS = frozenset(["content-length", "content-type", "transfer-encoding"])
+
+
+class NotSentError(Exception):
+    """Raised by ``HTTPTransport._send`` when the connection couldn't be opened, so nothing reached the server."""
+    def __init__(self, error):
+        super().__init__(error)
+        self.error = error
+
+
+class Response(object):
+    """Fully read HTTP response, with the parts of ``http.client.HTTPResponse`` the recognizers use."""
+    def __init__(self, url, status, reason, headers, body):
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers  # ``http.client.HTTPMessage`` (case-insensitive ``get``)
+        self.body = body
+        self._file = io.BytesIO(body)
+
+    def read(self, size=-1):
+        return self._file.read(size)
+
+    def getcode(self):
+        return self.status
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+class HTTPTransport(object):
+    """
+    Thread-safe HTTP client with a keep-alive connection pool per (scheme, host, port).
+
+    Up to ``max_idle_per_host`` idle connections are kept per host for ``idle_timeout`` seconds. Connection errors and responses with a status in ``retry_statuses`` are retried up to ``retries`` times, waiting ``backoff`` seconds and doubling each time (or the server's ``Retry-After``, up to ``max_backoff``).
+
+    With ``http2=True`` requests go through ``httpx`` (which must be installed with its ``http2`` extra) and share HTTP/2 connections.
+    """
+    retry_statuses = frozenset([429, 502, 503, 504])
+    max_redirections = 10  # as ``urllib.request.HTTPRedirectHandler``
+
+    def __init__(self, max_idle_per_host=4, idle_timeout=60.0, retries=2, backoff=0.25, max_backoff=4.0, http2=False):
+        self.max_idle_per_host = max_idle_per_host
+        self.idle_timeout = idle_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.connections_opened = 0
+        self._idle = collections.defaultdict(list)  # (scheme, host, port) -> [(connection, idle since)]
+        self._lock = threading.Lock()
+        self._http2_client = None
+        if http2:
+            try:
+                import httpx
+            except ImportError:
+                raise SetupError("missing httpx module: install httpx[http2] to use HTTP/2.")
+            self._http2_client = httpx.Client(http2=True, limits=httpx.Limits(max_keepalive_connections=max_idle_per_host, keepalive_expiry=idle_timeout))
+
+    def urlopen(self, request, timeout=None):
+        """Sends a ``urllib.request.Request``; returns a ``Response`` or raises ``HTTPError``/``URLError``."""
+        data = request.data
+        headers = dict(request.header_items())
+        if data is not None and not any(name.lower() == "content-type" for name in headers):
+            headers["Content-Type"] = "application/x-www-form-urlencoded"  # urllib's default for request bodies
+        return self.request(request.get_method(), request.full_url, data, headers, timeout)
+
+    def request(self, method, url, data=None, headers=None, timeout=None):
+        """Sends a request; returns a ``Response`` or raises ``HTTPError`` (for 4xx/5xx statuses) or ``URLError``."""
+        key = _pool_key(url)
+        headers = dict(headers or {})
+        if hasattr(data, "read"):
+            data = data.read()  # read file bodies once, so they can be resent when retrying
+        attempt = 0
+        redirections = 0
+        while True:
+            try:
+                if self._http2_client is None and _uses_proxy(url):
+                    response = self._send_urllib(method, url, data, headers, timeout)
+                else:
+                    response = self._send(key, method, url, data, headers, timeout)
+            except NotSentError as e:
+                if attempt >= self.retries or isinstance(e.error, TimeoutError):
+                    raise URLError(e.error)
+                delay = None
+            except OSError as e:
+                raise URLError(e)  # the request may have reached the server, so it isn't sent again
+            else:
+                if response.status in REDIRECT_STATUSES and response.headers.get("Location"):
+                    method, url, data, headers = _redirect(method, url, data, headers, response)
+                    redirections += 1
+                    if redirections > self.max_redirections:
+                        raise HTTPError(url, response.status, "redirect loop", response.headers, io.BytesIO(response.body))
+                    key = _pool_key(url)
+                    continue
+                if response.status < 300:
+                    return response
+                if attempt >= self.retries or response.status not in self.retry_statuses:
+                    raise HTTPError(url, response.status, response.reason, response.headers, io.BytesIO(response.body))
+                delay = _retry_after(response.headers.get("Retry-After"))
+            if delay is None:
+                delay = self.backoff * 2 ** attempt
+            time.sleep(min(delay, self.max_backoff))
+            attempt += 1
+
+    def preconnect(self, url, timeout=None):
+        """Opens a connection to the host of ``url`` (including the TLS handshake) and keeps it in the pool, so the next request to that host can start right away."""
+        if self._http2_client is not None:
+            return  # httpx connects on the first request
+        key = _pool_key(url)
+        connection = self._new_connection(key, timeout)
+        try:
+            connection.connect()
+        except OSError as e:
+            connection.close()
+            raise URLError(e)
+        self._release(key, connection)
+
+    def close(self):
+        """Closes all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, collections.defaultdict(list)
+        for connections in idle.values():
+            for connection, _ in connections:
+                connection.close()
+        if self._http2_client is not None:
+            self._http2_client.close()
+
+    def _send(self, key, method, url, data, headers, timeout):
+        if self._http2_client is not None:
+            return self._send_http2(method, url, data, headers, timeout)
+        parts = urlsplit(url)
+        target = (parts.path or "/") + ("?" + parts.query if parts.query else "")
+        encode_chunked = any(name.lower() == "transfer-encoding" and value.lower() == "chunked" for name, value in headers.items())
+        while True:
+            connection, reused = self._acquire(key, timeout)
+            if connection.sock is None:
+                try:
+                    connection.connect()
+                except OSError as e:
+                    connection.close()
+                    raise NotSentError(e)
+            try:
+                # ``http.client`` sends the chunked framing itself when given an iterable body
+                connection.request(method, target, body=[data] if encode_chunked else data, headers=headers, encode_chunked=encode_chunked)
+                http_response = connection.getresponse()
+                body = http_response.read()
+            except STALE_CONNECTION_ERRORS:
+                connection.close()
+                if reused:
+                    continue  # the server closed the idle connection; send again on a new one
+                raise
+            except BaseException:
+                connection.close()
+                raise
+            if http_response.will_close:
+                connection.close()
+            else:
+                self._release(key, connection)
+            return Response(url, http_response.status, http_response.reason, http_response.headers, body)
+
+    def _send_urllib(self, method, url, data, headers, timeout):
+        # ``urllib.request`` applies the proxy settings; redirects are left to ``request``, as for the pool
+        opener = urllib.request.build_opener(_NoRedirectHandler)
+        request = urllib.request.Request(url, data, headers, method=method)
+        try:
+            with opener.open(request, timeout=timeout) as response:
+                return Response(url, response.status, response.reason, response.headers, response.read())
+        except HTTPError as e:
+            return Response(url, e.code, e.reason, e.headers, e.read())
+        except URLError as e:
+            if isinstance(e.reason, OSError):
+                raise e.reason
+            raise
+
+    def _send_http2(self, method, url, data, headers, timeout):
+        import httpx
+
+        try:
+            response = self._http2_client.request(method, url, content=data, headers=headers, timeout=timeout)
+        except httpx.ConnectTimeout as e:
+            raise NotSentError(TimeoutError(str(e)))
+        except httpx.TimeoutException as e:
+            raise TimeoutError(str(e))
+        except httpx.ConnectError as e:
+            raise NotSentError(ConnectionError(str(e)))
+        except httpx.TransportError as e:
+            raise ConnectionError(str(e))
+        message = http.client.HTTPMessage()
+        for name, value in response.headers.multi_items():
+            message[name] = value
+        return Response(url, response.status_code, response.reason_phrase, message, response.content)
+
+    def _acquire(self, key, timeout):
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle[key]
+            while idle:
+                connection, idle_since = idle.pop()
+                if now - idle_since <= self.idle_timeout:
+                    connection.timeout = timeout
+                    if connection.sock is not None:
+                        connection.sock.settimeout(timeout)
+                    return connection, True
+                connection.close()
+        return self._new_connection(key, timeout), False
+
+    def _new_connection(self, key, timeout):
+        scheme, host, port = key
+        connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        with self._lock:
+            self.connections_opened += 1
+        return connection_class(host, port, timeout=timeout)
+
+    def _release(self, key, connection):
+        with self._lock:
+            idle = self._idle[key]
+            if len(idle) < self.max_idle_per_host:
+                idle.append((connection, time.monotonic()))
+                return
+        connection.close()
+
+
+def _pool_key(url):
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        raise URLError("unsupported URL scheme: {}".format(parts.scheme))
+    return parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80)
+
+
+def _uses_proxy(url):
+    parts = urlsplit(url)
+    return parts.scheme in urllib.request.getproxies() and not urllib.request.proxy_bypass(parts.netloc)
+
+
+def _redirect(method, url, data, headers, response):
+    """Returns the ``(method, url, data, headers)`` to send after the redirect ``response``, following the rules of ``urllib.request.HTTPRedirectHandler``."""
+    new_url = urljoin(url, response.headers["Location"])
+    if urlsplit(new_url).scheme not in ("http", "https"):
+        raise HTTPError(url, response.status, "redirection to a non-HTTP URL", response.headers, io.BytesIO(response.body))
+    if method in ("GET", "HEAD"):
+        return method, new_url, data, headers
+    if method == "POST" and response.status in (301, 302, 303):
+        return "GET", new_url, None, {name: value for name, value in headers.items() if name.lower() not in CONTENT_HEADERS}
+    raise HTTPError(url, response.status, response.reason, response.headers, io.BytesIO(response.body))
+
+
+class _NoRedirectHandler(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None  # ``HTTPTransport.request`` follows redirects itself
+
+
+def _retry_after(value):
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):  # missing, or an HTTP date (not worth parsing for a capped wait)
+        return None
+
+
+class TokenCache(object):
+    """
+    Caches access tokens until ``margin`` seconds before they expire.
+
+    ``get(key, fetch)`` returns the cached token for ``key``, or calls ``fetch()``, which returns ``(token, lifetime in seconds)``. Concurrent callers for the same key wait for a single fetch.
+    """
+    def __init__(self, margin=30.0):
+        self.margin = margin
+        self._tokens = {}  # key -> (token, monotonic expiry)
+        self._lock = threading.Lock()
+        self._fetch_locks = {}
+
+    def get(self, key, fetch):
+        with self._lock:
+            fetch_lock = self._fetch_locks.setdefault(key, threading.Lock())
+        with fetch_lock:
+            with self._lock:
+                entry = self._tokens.get(key)
+            if entry is not None and time.monotonic() < entry[1]:
+                return entry[0]
+            start = time.monotonic()  # the lifetime counts from when the token was requested
+            token, lifetime = fetch()
+            with self._lock:
+                self._tokens[key] = (token, start + lifetime - self.margin)
+            return token
+
+    def invalidate(self, key):
+        """Forgets the token for ``key``, for example after the service rejected it."""
+        with self._lock:
+            self._tokens.pop(key, None)
+
+
+_default_transport = None
+_default_transport_lock = threading.Lock()
+
+tokens = TokenCache()
+
+
+def default_transport():
+    """Returns the ``HTTPTransport`` shared by recognizers whose ``Recognizer.transport`` is ``None``."""
+    global _default_transport
+    with _default_transport_lock:
+        if _default_transport is None:
+            _default_transport = HTTPTransport()
+        return _default_transport
+
+
+def get_transport(recognizer):
+    """Returns ``recognizer.transport`` if set, otherwise the shared default transport."""
+    transport = getattr(recognizer, "transport", None)
+    return transport if transport is not None else default_transport()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Time and peak memory of AudioData segmenting/conversion on a long recording.
+
+Run from the game directory: python3 tests/bench_audiodata.py [minutes] [git_revision]
+With a git revision, the same workload also runs against that revision's
+speech_recognition/audio.py for comparison (e.g. HEAD~1).
+"""
+
+import importlib.util
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+GAME_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, GAME_DIR)
+
+from speech_recognition import audio as current  # noqa: E402
+
+RATE = 44100
+
+
+def load_revision(revision):
+    source = subprocess.run(
+        ["git", "show", "%s:./speech_recognition/audio.py" % revision],
+        cwd=GAME_DIR, stdout=subprocess.PIPE, check=True,
+    ).stdout
+    with tempfile.NamedTemporaryFile("wb", suffix=".py", delete=False) as f:
+        f.write(source)
+    spec = importlib.util.spec_from_file_location("audio_" + revision.replace("~", "_"), f.name)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    os.unlink(f.name)
+    return module
+
+
+def segment_pieces(audio, minutes):
+    # What a long-audio pipeline does: cut into one-minute pieces, then send each piece
+    # to a recognizer (16 kHz WAV) and retry once.
+    for minute in range(minutes):
+        segment = audio.get_segment(minute * 60000, (minute + 1) * 60000)
+        segment.get_wav_data(convert_rate=16000)
+        segment.get_wav_data(convert_rate=16000)
+
+
+def whole_wav(audio, minutes):
+    audio.get_wav_data()
+    audio.get_wav_data()
+
+
+def whole_aiff(audio, minutes):
+    audio.get_aiff_data()
+
+
+def measure(phase, audio, minutes):
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        phase(audio, minutes)
+    except NotImplementedError:  # the game's aifc stub
+        return None, None
+    finally:
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    minutes = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    revision = sys.argv[2] if len(sys.argv) > 2 else None
+    frame_data = random.Random(0).randbytes(2 * RATE * 60 * minutes)
+    print("%d min of 44.1 kHz 16-bit mono (%.0f MB)" % (minutes, len(frame_data) / 1048576.0))
+    rows = [("current", current)]
+    if revision:
+        rows.append((revision, load_revision(revision)))
+    print("%-10s %-16s %10s %14s" % ("audio.py", "workload", "time", "peak alloc"))
+    for name, module in rows:
+        for phase in (segment_pieces, whole_wav, whole_aiff):
+            elapsed, peak = measure(phase, module.AudioData(frame_data, RATE, 2), minutes)
+            if elapsed is None:
+                print("%-10s %-16s %10s" % (name, phase.__name__, "n/a"))
+                continue
+            print("%-10s %-16s %8.3f s %11.1f MB" % (name, phase.__name__, elapsed, peak / 1048576.0))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Per-function timings for the game's audioop.py backends (and CPython's audioop when present).
+
+Run from the game directory: python3 tests/bench_audioop.py [seconds_of_audio]
+"""
+
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+import audioop as shim  # noqa: E402
+from tests.test_audioop import cpython_audioop  # noqa: E402
+
+RATE = 16000
+CHUNK = 1024
+
+
+def cases(seconds):
+    rng = random.Random(0)
+    whole = bytes(rng.getrandbits(8) for _ in range(2 * RATE * seconds))
+    chunk = whole[:2 * CHUNK]
+    stereo = whole[:len(whole) // 4 * 4]
+    return [
+        # name, call, label: speech_recognition calls rms/add per 1024-frame chunk and
+        # ratecv/lin2lin/bias/byteswap/tomono on whole recordings.
+        ("rms", lambda m: m.rms(chunk, 2), "1024 frames"),
+        ("add", lambda m: m.add(chunk, chunk, 2), "1024 frames"),
+        ("bias", lambda m: m.bias(whole, 2, 100), "%d s" % seconds),
+        ("ratecv", lambda m: m.ratecv(whole, 2, 1, RATE, 44100, None), "%d s" % seconds),
+        ("lin2lin", lambda m: m.lin2lin(whole, 2, 4), "%d s" % seconds),
+        ("tomono", lambda m: m.tomono(stereo, 2, 1, 1), "%d s" % seconds),
+        ("byteswap", lambda m: m.byteswap(whole, 2), "%d s" % seconds),
+    ]
+
+
+def best_of(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number
+
+
+def main():
+    seconds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    backends = []
+    if shim._np is not None:
+        backends.append("numpy")
+    backends.append("array")
+    columns = backends + (["cpython"] if cpython_audioop is not None else [])
+    print("%-10s %-12s" % ("function", "input") + "".join("%14s" % c for c in columns))
+    saved_np = shim._np
+    try:
+        for name, call, label in cases(seconds):
+            number = 200 if label.endswith("frames") else 3
+            row = []
+            for column in columns:
+                if column == "cpython":
+                    row.append(best_of(lambda: call(cpython_audioop), number))
+                    continue
+                shim._np = saved_np if column == "numpy" else None
+                row.append(best_of(lambda: call(shim), number))
+            print("%-10s %-12s" % (name, label) + "".join("%12.3fms" % (t * 1000) for t in row))
+    finally:
+        shim._np = saved_np
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""FLAC encode time per second of audio: in-process (soundfile) vs the flac executable.
+
+Run from the game directory: python3 tests/bench_flac.py [seconds_of_audio]
+Encodes 16 kHz 16-bit mono (what the Google recognizers send) at a few compression levels.
+"""
+
+import math
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from speech_recognition import audio as sr_audio  # noqa: E402
+
+RATE = 16000
+LEVELS = (0, 5, 8)
+
+
+def speechlike(seconds):
+    rng = random.Random(0)
+    samples = [int(6000 * math.sin(i * 0.07) * math.sin(i * 0.0007) + rng.gauss(0, 300)) for i in range(RATE * seconds)]
+    return b"".join(max(-32768, min(32767, s)).to_bytes(2, "little", signed=True) for s in samples)
+
+
+def main():
+    seconds = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    audio = sr_audio.AudioData(speechlike(seconds), RATE, 2)
+    wav_data = audio.get_wav_data()
+    encoders = [("subprocess", lambda level: sr_audio.encode_flac_subprocess(wav_data, level))]
+    if sr_audio.encode_flac_in_process(audio, None, None, 5) is not None:
+        encoders.insert(0, ("soundfile", lambda level: sr_audio.encode_flac_in_process(audio, None, None, level)))
+    else:
+        print("soundfile not available; timing the subprocess encoder only")
+
+    print("%-12s %6s %16s %10s" % ("encoder", "level", "ms / s of audio", "ratio"))
+    for name, encode in encoders:
+        for level in LEVELS:
+            size = len(encode(level))
+            best = min(timeit.repeat(lambda: encode(level), number=1, repeat=5))
+            print("%-12s %6d %16.2f %9.1f%%" % (name, level, best * 1000 / seconds, 100.0 * size / len(audio.frame_data)))
+
+    audio.get_flac_data()
+    cached = min(timeit.repeat(audio.get_flac_data, number=1, repeat=5))
+    print("cached get_flac_data(): %.3f ms" % (cached * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""First versus subsequent call latency of the local recognizers (model cache cold vs warm).
+
+Run from the game directory: python3 tests/bench_model_cache.py [audio_file] [calls]
+Backends whose package (or Vosk model) is not installed are skipped.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+import speech_recognition as sr  # noqa: E402
+from speech_recognition.exceptions import SetupError  # noqa: E402
+from speech_recognition.recognizers import model_cache  # noqa: E402
+
+BACKENDS = [
+    # name, module to import, recognize call
+    ("faster_whisper", "faster_whisper", lambda r, audio: r.recognize_faster_whisper(audio, model="base")),
+    ("whisper", "whisper", lambda r, audio: r.recognize_whisper(audio, model="base")),
+    ("vosk", "vosk", lambda r, audio: r.recognize_vosk(audio)),
+]
+
+
+def load_audio(path):
+    if path:
+        return sr.AudioData.from_file(path)
+    default = os.path.join(os.path.dirname(os.path.realpath(__file__)), "english.wav")
+    if os.path.exists(default):
+        return sr.AudioData.from_file(default)
+    return sr.AudioData(b"\x00\x00" * 16000 * 2, 16000, 2)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else None
+    calls = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    audio = load_audio(path)
+    r = sr.Recognizer()
+    print("%-16s %12s %12s %12s" % ("backend", "first", "next (avg)", "speedup"))
+    for name, module, call in BACKENDS:
+        try:
+            __import__(module)
+        except ImportError:
+            print("%-16s %s" % (name, "skipped (not installed)"))
+            continue
+        model_cache.models.clear()
+        try:
+            first = timed(lambda: call(r, audio))
+        except SetupError as e:
+            print("%-16s skipped (%s)" % (name, e))
+            continue
+        later = [timed(lambda: call(r, audio)) for _ in range(calls)]
+        average = sum(later) / len(later)
+        print("%-16s %10.0fms %10.0fms %11.1fx" % (name, first * 1000, average * 1000, first / average))
+    print("cached models: %d, %.0f MB" % (len(model_cache.models), model_cache.models.total_bytes() / 1048576.0))
+
+
+if __name__ == "__main__":
+    main()
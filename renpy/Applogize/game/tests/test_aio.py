@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+
+import asyncio
+import io
+import json
+import math
+import struct
+import unittest
+import wave
+
+import speech_recognition as sr
+from speech_recognition import aio
+
+
+def wav_file(rate, seconds_silence, seconds_tone):
+    samples = [0] * int(rate * seconds_silence)
+    samples += [int(8000 * math.sin(i * 0.1)) for i in range(int(rate * seconds_tone))]
+    samples += [0] * int(rate * 2)
+    data = io.BytesIO()
+    with wave.open(data, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(struct.pack("<%dh" % len(samples), *samples))
+    data.seek(0)
+    return data
+
+
+class StubServer:
+    """HTTP/1.1 keep-alive server that records requests and answers each with ``respond(path, body)``."""
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.requests = []
+        self.connections = 0
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        self.url = "http://127.0.0.1:%d" % self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b""):
+                        break
+                    name, _, value = line.decode().partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                path = request_line.split()[1].decode()
+                self.requests.append((path, headers, body))
+                writer.write(self.respond(path, body))
+                await writer.drain()
+        finally:
+            writer.close()
+
+
+def content_length_response(body):
+    return b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body)
+
+
+def chunked_response(body):
+    chunks = b"".join(b"%x\r\n%s\r\n" % (len(piece), piece) for piece in (body[:3], body[3:]) if piece)
+    return b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n" + chunks + b"0\r\n\r\n"
+
+
+class TestAsyncHTTPClient(unittest.TestCase):
+    def test_reuses_connections(self):
+        async def run():
+            server = StubServer(lambda path, body: content_length_response(path.encode()))
+            await server.start()
+            try:
+                async with aio.AsyncHTTPClient() as client:
+                    for i in range(5):
+                        response = await client.request("GET", "%s/%d" % (server.url, i))
+                        self.assertEqual(response.body, b"/%d" % i)
+                    return client.connections_opened, server.connections
+            finally:
+                await server.stop()
+
+        self.assertEqual(asyncio.run(run()), (1, 1))
+
+    def test_chunked_response_and_body(self):
+        async def run():
+            server = StubServer(lambda path, body: chunked_response(body[::-1]))
+            await server.start()
+            try:
+                async with aio.AsyncHTTPClient() as client:
+                    return await client.request("POST", server.url + "/echo", b"abcdefgh")
+            finally:
+                await server.stop()
+
+        response = asyncio.run(run())
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.body, b"hgfedcba")
+
+    def test_concurrent_requests_are_limited_per_host(self):
+        async def run():
+            server = StubServer(lambda path, body: content_length_response(b"ok"))
+            await server.start()
+            try:
+                async with aio.AsyncHTTPClient(max_connections_per_host=2) as client:
+                    responses = await asyncio.gather(*(client.request("GET", server.url) for _ in range(8)))
+                    return [r.body for r in responses], client.connections_opened
+            finally:
+                await server.stop()
+
+        bodies, opened = asyncio.run(run())
+        self.assertEqual(bodies, [b"ok"] * 8)
+        self.assertLessEqual(opened, 2)
+
+
+class TestAsyncRecognizer(unittest.TestCase):
+    def test_listen_and_chunks_from_file(self):
+        async def run():
+            r = aio.AsyncRecognizer()
+            r.recognizer.dynamic_energy_threshold = False
+            async with aio.AsyncAudioFile(wav_file(16000, 1.0, 2.0)) as source:
+                audio = await r.listen(source)
+                remaining = [chunk async for chunk in aio.iter_chunks(source)]
+            await r.close()
+            return audio, remaining
+
+        audio, remaining = asyncio.run(run())
+        seconds = len(audio.frame_data) / float(audio.sample_rate * audio.sample_width)
+        self.assertGreater(seconds, 2.0)
+        self.assertLess(seconds, 4.0)
+        self.assertTrue(remaining)
+
+    def test_listen_matches_blocking_listen(self):
+        r = sr.Recognizer()
+        r.dynamic_energy_threshold = False
+        with sr.AudioFile(wav_file(16000, 1.0, 2.0)) as source:
+            expected = r.listen(source).frame_data
+
+        async def run():
+            async with aio.AsyncAudioFile(wav_file(16000, 1.0, 2.0)) as source:
+                return (await aio.AsyncRecognizer(r).listen(source)).frame_data
+
+        self.assertEqual(asyncio.run(run()), expected)
+
+    def test_recognize_google_over_pooled_client(self):
+        result = {"result": [{"alternative": [{"transcript": "hello there", "confidence": 0.9}], "final": True}], "result_index": 0}
+        responses = b'{"result":[]}\n' + json.dumps(result).encode()
+        audio = sr.AudioData(b"\x00\x10" * 16000, 16000, 2)
+
+        async def run():
+            server = StubServer(lambda path, body: content_length_response(responses))
+            await server.start()
+            try:
+                async with aio.AsyncRecognizer() as r:
+                    texts = await asyncio.gather(*(
+                        r.recognize_google(audio, endpoint=server.url + "/recognize") for _ in range(3)
+                    ))
+                    return texts, r.http_client.connections_opened, server.requests
+            finally:
+                await server.stop()
+
+        try:
+            texts, opened, requests = asyncio.run(run())
+        except OSError as e:  # no in-process FLAC encoder and no usable flac executable
+            self.skipTest(str(e))
+        self.assertEqual(texts, ["hello there"] * 3)
+        self.assertLessEqual(opened, 3)
+        path, headers, body = requests[0]
+        self.assertTrue(path.startswith("/recognize?"))
+        self.assertTrue(headers["content-type"].startswith("audio/x-flac"))
+        self.assertEqual(body[:4], b"fLaC")
+
+    def test_other_recognizers_run_in_executor(self):
+        r = sr.Recognizer()
+        r.recognize_echo = lambda audio_data: audio_data.sample_rate
+
+        async def run():
+            return await aio.AsyncRecognizer(r).recognize_echo(sr.AudioData(b"", 8000, 2))
+
+        self.assertEqual(asyncio.run(run()), 8000)
+        self.assertRaises(AttributeError, getattr, aio.AsyncRecognizer(r), "listen_in_background")
+
+
+if __name__ == "__main__":
+    unittest.main()
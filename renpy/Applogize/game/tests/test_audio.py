@@ -1,9 +1,24 @@
 #!/usr/bin/env python3
 
+import importlib.machinery
+import importlib.util
+import io
+import random
+import subprocess
+import sys
 import unittest
+import warnings
+import wave
+from array import array
 from os import path
 
 import speech_recognition as sr
+from speech_recognition import audio as sr_audio
+
+try:
+    import soundfile
+except (ImportError, OSError):
+    soundfile = None
 
 
 class TestAudioFile(unittest.TestCase):
@@ -126,5 +141,120 @@ class TestAudioFile(unittest.TestCase):
             self.assertSimilar(audio.get_raw_data()[:32], b"\x00\x00\x00\x00\x00\x00\xfe\xff\x00\x00\x02\x00\x00\x00\xfe\xff\x00\x00\x00\x00\x00\xff\x01\x00\x00\x02\xfc\xff\x00\xfe\x01\x00")
 
 
+def load_stdlib_aifc():
+    """The interpreter's own aifc (the game directory shadows it with a stub), or None on Python 3.13+."""
+    game_dir = path.dirname(path.dirname(path.realpath(__file__)))
+    spec = importlib.machinery.PathFinder.find_spec("aifc", [p for p in sys.path if path.realpath(p or ".") != game_dir])
+    if spec is None:
+        return None
+    module = importlib.util.module_from_spec(spec)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        spec.loader.exec_module(module)
+    return module
+
+
+class TestAudioDataBuffers(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(3)
+        self.frame_data = bytes(rng.getrandbits(8) for _ in range(2 * 4410))
+        self.audio = sr.AudioData(self.frame_data, 44100, 2)
+
+    def test_segment_shares_buffer(self):
+        segment = self.audio.get_segment(10, 50)
+        self.assertIsInstance(segment.frame_data, memoryview)
+        self.assertIs(segment.frame_data.obj, self.frame_data)
+        self.assertEqual(segment.get_raw_data(), self.frame_data[2 * 441:2 * 2205])
+        self.assertEqual(segment.get_segment(10).get_raw_data(), self.frame_data[2 * 882:2 * 2205])
+
+    def test_segment_cuts_on_whole_samples(self):
+        audio = sr.AudioData(self.frame_data[:3 * 1000], 16000, 3)
+        self.assertEqual(len(audio.get_segment(0.1, 7.5).get_raw_data()) % 3, 0)
+
+    def test_accepts_buffer_objects(self):
+        samples = array("h", [0, 1000, -1000, 32767])
+        if sys.byteorder == "big":
+            samples.byteswap()
+        audio = sr.AudioData(samples, 16000, 2)
+        self.assertEqual(audio.get_raw_data(), samples.tobytes())
+        self.assertEqual(audio.get_raw_data(convert_width=1), b"\x80\x83\x7c\xff")
+
+    def test_wav_matches_wave_module(self):
+        for convert_rate, convert_width in ((None, None), (16000, 2), (22050, 1), (None, 3), (8000, 4)):
+            expected = io.BytesIO()
+            with wave.open(expected, "wb") as wav_writer:
+                wav_writer.setframerate(convert_rate or 44100)
+                wav_writer.setsampwidth(convert_width or 2)
+                wav_writer.setnchannels(1)
+                wav_writer.writeframes(self.audio.get_raw_data(convert_rate, convert_width))
+            self.assertEqual(self.audio.get_wav_data(convert_rate, convert_width), expected.getvalue())
+
+    def test_aiff_matches_aifc_module(self):
+        aifc = load_stdlib_aifc()
+        if aifc is None:
+            self.skipTest("aifc is not available (Python 3.13+)")
+        for convert_rate, convert_width in ((None, None), (16000, 2), (22050, 3), (8000, 4)):
+            expected = io.BytesIO()
+            aiff_writer = aifc.open(expected, "wb")
+            aiff_writer.setframerate(convert_rate or 44100)
+            aiff_writer.setsampwidth(convert_width or 2)
+            aiff_writer.setnchannels(1)
+            width = convert_width or 2
+            raw_data = self.audio.get_raw_data(convert_rate, convert_width)
+            aiff_writer.writeframes(b"".join(raw_data[i:i + width][::-1] for i in range(0, len(raw_data), width)))
+            aiff_data = expected.getvalue()  # closing the writer closes the BytesIO too
+            aiff_writer.close()
+            self.assertEqual(self.audio.get_aiff_data(convert_rate, convert_width), aiff_data)
+
+    def test_24_bit_conversion(self):
+        audio = sr.AudioData(b"\x01\x02\xff\xff", 16000, 2)
+        self.assertEqual(audio.get_raw_data(convert_width=3), b"\x00\x01\x02\x00\xff\xff")
+
+    def test_conversions_are_cached(self):
+        wav_data = self.audio.get_wav_data(convert_rate=16000)
+        self.assertIs(self.audio.get_wav_data(convert_rate=16000), wav_data)
+        self.assertIs(self.audio.get_raw_data(convert_rate=16000), self.audio.get_raw_data(16000, 2))
+        self.assertIs(self.audio.get_raw_data(), self.frame_data)
+        self.audio.frame_data = self.frame_data[:2000]
+        self.assertEqual(len(self.audio.get_wav_data()), 44 + 2000)
+
+
+class TestFlacEncoding(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(5)
+        self.samples = {width: bytes(rng.getrandbits(8) for _ in range(width * 4410)) for width in (1, 2, 3)}
+
+    def assertRoundTrips(self, flac_data, audio):
+        wav_data = subprocess.run(
+            [sr_audio.get_flac_converter(), "--decode", "--stdout", "--totally-silent", "-"],
+            input=flac_data, stdout=subprocess.PIPE, check=True,
+        ).stdout
+        with wave.open(io.BytesIO(wav_data), "rb") as wav_reader:
+            self.assertEqual(wav_reader.getframerate(), audio.sample_rate)
+            self.assertEqual(wav_reader.getsampwidth(), audio.sample_width)
+            self.assertEqual(wav_reader.readframes(wav_reader.getnframes()), audio.get_raw_data())
+
+    @unittest.skipIf(soundfile is None, "soundfile is not installed")
+    def test_in_process_encoder_is_lossless(self):
+        for width, frame_data in self.samples.items():
+            audio = sr.AudioData(frame_data, 44100, width)
+            flac_data = sr_audio.encode_flac_in_process(audio, None, None, 5)
+            self.assertTrue(flac_data.startswith(b"fLaC"))
+            self.assertRoundTrips(flac_data, audio)
+
+    def test_subprocess_encoder_is_lossless(self):
+        audio = sr.AudioData(self.samples[2], 16000, 2)
+        for level in (0, 8):
+            self.assertRoundTrips(sr_audio.encode_flac_subprocess(audio.get_wav_data(), level), audio)
+
+    def test_encoded_flac_is_cached(self):
+        audio = sr.AudioData(self.samples[2], 44100, 2)
+        first = audio.get_flac_data(convert_rate=16000)
+        self.assertIs(audio.get_flac_data(convert_rate=16000), first)
+        self.assertIsNot(audio.get_flac_data(convert_rate=16000, compression_level=0), first)
+        audio.frame_data = self.samples[2][:2000]
+        self.assertNotEqual(audio.get_flac_data(convert_rate=16000), first)
+
+
 if __name__ == "__main__":
     unittest.main()
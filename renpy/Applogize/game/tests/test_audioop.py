@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+
+import importlib.machinery
+import importlib.util
+import os
+import random
+import sys
+import unittest
+import warnings
+
+GAME_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+if GAME_DIR not in sys.path:
+    sys.path.insert(0, GAME_DIR)
+
+import audioop as shim  # noqa: E402  # the game's audioop.py (shadows the stdlib module)
+
+
+def load_cpython_audioop():
+    """Load the interpreter's own audioop, skipping the game directory that shadows it."""
+    search = [p for p in sys.path if os.path.realpath(p or os.curdir) != GAME_DIR]
+    spec = importlib.machinery.PathFinder.find_spec("audioop", search)
+    if spec is None or os.path.dirname(os.path.realpath(spec.origin)) == GAME_DIR:
+        return None
+    module = importlib.util.module_from_spec(spec)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        spec.loader.exec_module(module)
+    return module
+
+
+cpython_audioop = load_cpython_audioop()
+
+
+def random_fragment(rng, width, nframes, nchannels=1):
+    return bytes(rng.getrandbits(8) for _ in range(width * nframes * nchannels))
+
+
+@unittest.skipIf(cpython_audioop is None, "CPython audioop is not available (Python 3.13+)")
+class AudioopConformanceMixin:
+    def setUp(self):
+        self.rng = random.Random(1234)
+        self.saved_np = shim._np
+        if self.numpy_backend:
+            if shim._np is None:
+                self.skipTest("NumPy is not installed")
+        else:
+            shim._np = None
+
+    def tearDown(self):
+        shim._np = self.saved_np
+
+    def fragments(self, width, nchannels=1):
+        yield b""
+        yield b"\x00" * width * nchannels
+        extremes = (shim._MINVAL[width], shim._MAXVAL[width], -1, 0, 1)
+        yield b"".join(v.to_bytes(width, "little", signed=True) for v in extremes for _ in range(nchannels))
+        for nframes in (1, 7, 1024):
+            yield random_fragment(self.rng, width, nframes, nchannels)
+
+    def test_rms(self):
+        for width in (1, 2, 3, 4):
+            for frag in self.fragments(width):
+                self.assertEqual(shim.rms(frag, width), cpython_audioop.rms(frag, width))
+
+    def test_add(self):
+        for width in (1, 2, 3, 4):
+            for frag in self.fragments(width):
+                other = random_fragment(self.rng, width, len(frag) // width)
+                self.assertEqual(shim.add(frag, other, width), cpython_audioop.add(frag, other, width))
+
+    def test_bias(self):
+        for width in (1, 2, 3, 4):
+            for frag in self.fragments(width):
+                for bias in (-128, 1, 0x7FFF, -0x800000):
+                    self.assertEqual(shim.bias(frag, width, bias), cpython_audioop.bias(frag, width, bias))
+
+    def test_lin2lin(self):
+        for width in (1, 2, 3, 4):
+            for newwidth in (1, 2, 3, 4):
+                for frag in self.fragments(width):
+                    self.assertEqual(shim.lin2lin(frag, width, newwidth), cpython_audioop.lin2lin(frag, width, newwidth))
+
+    def test_tomono(self):
+        for width in (1, 2, 3, 4):
+            for frag in self.fragments(width, nchannels=2):
+                for fac1, fac2 in ((1, 1), (0.5, 0.5), (1, 0), (0.3, -0.7)):
+                    self.assertEqual(shim.tomono(frag, width, fac1, fac2), cpython_audioop.tomono(frag, width, fac1, fac2))
+
+    def test_byteswap(self):
+        for width in (1, 2, 3, 4):
+            for frag in self.fragments(width):
+                self.assertEqual(shim.byteswap(frag, width), cpython_audioop.byteswap(frag, width))
+
+    def test_ratecv(self):
+        for width in (1, 2, 3, 4):
+            for nchannels in (1, 2):
+                for inrate, outrate in ((44100, 16000), (16000, 44100), (8000, 8000), (48000, 16000)):
+                    for weights in ((1, 0), (3, 1)):
+                        frag = random_fragment(self.rng, width, 500, nchannels)
+                        expected = cpython_audioop.ratecv(frag, width, nchannels, inrate, outrate, None, *weights)
+                        self.assertEqual(shim.ratecv(frag, width, nchannels, inrate, outrate, None, *weights), expected)
+
+    def test_ratecv_state_carries_across_chunks(self):
+        frags = [random_fragment(self.rng, 2, n) for n in (1024, 1, 0, 333)]
+        state_shim = state_cpython = None
+        for frag in frags:
+            out_shim, state_shim = shim.ratecv(frag, 2, 1, 44100, 16000, state_shim)
+            out_cpython, state_cpython = cpython_audioop.ratecv(frag, 2, 1, 44100, 16000, state_cpython)
+            self.assertEqual(out_shim, out_cpython)
+            self.assertEqual(state_shim, state_cpython)
+
+    def test_errors(self):
+        self.assertRaises(shim.error, shim.rms, b"\x00", 5)
+        self.assertRaises(shim.error, shim.rms, b"\x00\x00\x00", 2)
+        self.assertRaises(shim.error, shim.add, b"\x00\x00", b"\x00", 1)
+        self.assertRaises(shim.error, shim.ratecv, b"\x00\x00", 2, 0, 8000, 8000, None)
+        self.assertRaises(shim.error, shim.ratecv, b"\x00\x00", 2, 1, 0, 8000, None)
+        self.assertRaises(shim.error, shim.bias, b"", 3 + 4, 0)
+
+
+class TestAudioopNumpy(AudioopConformanceMixin, unittest.TestCase):
+    numpy_backend = True
+
+
+class TestAudioopArray(AudioopConformanceMixin, unittest.TestCase):
+    numpy_backend = False
+
+
+if __name__ == "__main__":
+    unittest.main()
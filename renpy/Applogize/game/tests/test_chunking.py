@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+
+import importlib.util
+import math
+import os
+import struct
+import threading
+import time
+import unittest
+
+import speech_recognition as sr
+from speech_recognition.chunking import split_at_pauses
+
+RATE = 16000
+
+
+def tone_and_silence(*pattern):
+    """16-bit AudioData from (seconds, loud) pairs."""
+    samples = []
+    for seconds, loud in pattern:
+        count = int(RATE * seconds)
+        samples += [int(8000 * math.sin(i * 0.1)) for i in range(count)] if loud else [0] * count
+    return sr.AudioData(struct.pack("<%dh" % len(samples), *samples), RATE, 2)
+
+
+class TestSplitAtPauses(unittest.TestCase):
+    def test_cuts_in_pauses(self):
+        audio = tone_and_silence((0.5, False), (2, True), (1, False), (2, True), (1, False), (2, True), (0.5, False))
+        spans = split_at_pauses(audio, 300, max_chunk_seconds=4)
+        self.assertEqual(len(spans), 3)
+        for (start, end), tone_start in zip(spans, [0.5, 3.5, 6.5]):
+            self.assertLessEqual(start, tone_start)
+            self.assertGreaterEqual(end, tone_start + 2)
+            self.assertLessEqual(end - start, 4)
+
+    def test_prefers_longest_chunk_within_limit(self):
+        audio = tone_and_silence((1, True), (0.5, False), (1, True), (0.5, False), (1, True))
+        self.assertEqual(len(split_at_pauses(audio, 300, max_chunk_seconds=10)), 1)
+        self.assertEqual(len(split_at_pauses(audio, 300, max_chunk_seconds=3)), 2)
+
+    def test_cuts_long_speech_at_limit(self):
+        spans = split_at_pauses(tone_and_silence((10, True)), 300, max_chunk_seconds=3)
+        self.assertEqual(len(spans), 4)
+        self.assertTrue(all(end - start <= 3 for start, end in spans))
+        self.assertAlmostEqual(spans[-1][1], 10)
+
+    def test_skips_silence(self):
+        self.assertEqual(split_at_pauses(tone_and_silence((5, False)), 300), [])
+        spans = split_at_pauses(tone_and_silence((4, False), (1, True), (4, False)), 300, max_chunk_seconds=2)
+        self.assertEqual(len(spans), 1)
+
+
+class TestRecognizeLong(unittest.TestCase):
+    def setUp(self):
+        self.audio = tone_and_silence(*[(1, True), (0.5, False)] * 6)
+        self.recognizer = sr.Recognizer()
+
+    def test_transcribes_chunks_concurrently_in_order(self):
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def slow_recognizer(audio_data):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.1)
+            with lock:
+                active[0] -= 1
+            return "%.1f" % (len(audio_data.frame_data) / float(RATE * 2))
+
+        chunks = self.recognizer.recognize_long(self.audio, slow_recognizer, max_chunk_seconds=1.4, workers=3)
+        self.assertEqual(len(chunks), 6)
+        self.assertEqual([c.start for c in chunks], sorted(c.start for c in chunks))
+        self.assertEqual(peak[0], 3)
+        for chunk in chunks:
+            self.assertAlmostEqual(float(chunk.text), chunk.end - chunk.start, delta=0.05)
+
+    def test_leaves_out_unintelligible_chunks(self):
+        calls = []
+
+        def every_other(audio_data):
+            calls.append(audio_data)
+            if len(calls) % 2:
+                raise sr.UnknownValueError()
+            return "words"
+
+        chunks = self.recognizer.recognize_long(self.audio, every_other, max_chunk_seconds=1.4, workers=1)
+        self.assertEqual([c.text for c in chunks], ["words"] * 3)
+
+    def test_errors_propagate(self):
+        def failing(audio_data):
+            raise sr.RequestError("service down")
+
+        self.assertRaises(sr.RequestError, self.recognizer.recognize_long, self.audio, failing)
+
+    def test_method_name_and_kwargs(self):
+        self.recognizer.recognize_upper = lambda audio_data, word: word.upper()
+        chunks = self.recognizer.recognize_long(self.audio, "recognize_upper", max_chunk_seconds=5, word="hi")
+        self.assertTrue(chunks)
+        self.assertEqual({c.text for c in chunks}, {"HI"})
+
+    @unittest.skipUnless(importlib.util.find_spec("pocketsphinx"), "requires pocketsphinx")
+    def test_sphinx(self):
+        one_two_three = sr.AudioData.from_file(os.path.join(os.path.dirname(os.path.realpath(__file__)), "english.wav"))
+        silence = b"\x00" * (one_two_three.sample_rate * one_two_three.sample_width)
+        frame_data = silence.join([one_two_three.get_raw_data()] * 3)
+        audio = sr.AudioData(frame_data, one_two_three.sample_rate, one_two_three.sample_width)
+        duration = len(one_two_three.get_raw_data()) / float(one_two_three.sample_rate * one_two_three.sample_width)
+        chunks = self.recognizer.recognize_long(audio, "recognize_sphinx", max_chunk_seconds=duration + 0.9)
+        self.assertEqual([c.text for c in chunks], ["one two three"] * 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+import os
+import subprocess
+import sys
+import unittest
+
+import speech_recognition as sr
+
+GAME_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+# Cumulative ``-X importtime`` budget for ``import speech_recognition`` (it was ~280 ms when every
+# recognizer and its dependencies loaded eagerly); override for slow machines.
+IMPORT_BUDGET_US = int(os.environ.get("SPEECH_RECOGNITION_IMPORT_BUDGET_MS", "150")) * 1000
+
+# Modules that must not be loaded by ``import speech_recognition`` alone.
+HEAVY_MODULES = [
+    "numpy", "urllib.request", "http.client", "ssl", "json", "uuid", "subprocess", "tempfile",
+    "typing_extensions", "speech_recognition.recognizers", "speech_recognition.aio",
+]
+
+
+def import_profile(statement):
+    """Runs ``statement`` in a fresh interpreter; returns the modules it imported and {module: cumulative microseconds}
+    from ``-X importtime`` (which does not see modules loaded through ``importlib.import_module``)."""
+    # ``-X importtime`` lists every module imported in the process, including the interpreter's own startup
+    # ones, so modules already loaded before the statement are excluded.
+    code = "import sys; before = set(sys.modules); {}; print(sorted(set(sys.modules) - before))".format(statement)
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=GAME_DIR, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, check=True,
+    )
+    imported = set(eval(process.stdout))
+    profile = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit() and name.strip() in imported:
+            profile[name.strip()] = int(cumulative)
+    return imported, profile
+
+
+class TestImportTime(unittest.TestCase):
+    def test_import_stays_light(self):
+        imported, profile = import_profile("import speech_recognition")
+        loaded = [name for name in HEAVY_MODULES if name in imported]
+        self.assertEqual(loaded, [])
+        self.assertLess(profile["speech_recognition"], IMPORT_BUDGET_US)
+
+    def test_recognizer_module_loads_on_first_use(self):
+        imported, _ = import_profile("import speech_recognition as sr; sr.Recognizer().recognize_wit")
+        self.assertIn("speech_recognition.recognizers.legacy", imported)
+        self.assertNotIn("speech_recognition.recognizers.google", imported)
+
+
+class TestLazyAttributes(unittest.TestCase):
+    def test_recognizer_methods_resolve(self):
+        from speech_recognition.recognizers import legacy, pocketsphinx
+
+        r = sr.Recognizer()
+        self.assertEqual(r.recognize_sphinx.__func__, pocketsphinx.recognize)
+        self.assertEqual(sr.Recognizer.recognize_ibm, legacy.recognize_ibm)
+        self.assertEqual(sr.Recognizer.recognize_api.__func__, legacy.recognize_api)
+
+    def test_module_attributes_resolve(self):
+        from speech_recognition import aio, audio
+
+        self.assertIs(sr.get_flac_converter, audio.get_flac_converter)
+        self.assertIs(sr.AsyncRecognizer, aio.AsyncRecognizer)
+        self.assertIn("AsyncRecognizer", dir(sr))
+        self.assertRaises(AttributeError, getattr, sr, "no_such_attribute")
+
+
+if __name__ == "__main__":
+    unittest.main()
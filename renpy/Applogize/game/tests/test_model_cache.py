@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+import threading
+import time
+import unittest
+
+from speech_recognition.recognizers import model_cache
+
+
+class Loader:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return object()
+
+
+class TestModelCache(unittest.TestCase):
+    def test_reuses_loaded_model(self):
+        cache = model_cache.ModelCache()
+        load = Loader()
+        first = cache.get("base", load)
+        second = cache.get("base", load)
+        self.assertIs(first.model, second.model)
+        self.assertEqual(load.calls, 1)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_keys_include_options(self):
+        self.assertNotEqual(
+            model_cache.make_key("whisper", "base", {"device": "cpu"}),
+            model_cache.make_key("whisper", "base", {"device": "cuda"}),
+        )
+        self.assertEqual(
+            model_cache.make_key("faster_whisper", "base", {"device": "cpu", "compute_type": "int8"}),
+            model_cache.make_key("faster_whisper", "base", {"compute_type": "int8", "device": "cpu"}),
+        )
+
+    def test_lru_eviction_under_memory_cap(self):
+        cache = model_cache.ModelCache(max_bytes=250)
+        size = lambda _: 100
+        cache.get("a", Loader(), size)
+        cache.get("b", Loader(), size)
+        cache.get("a", Loader(), size)  # a becomes most recently used
+        cache.get("c", Loader(), size)
+        self.assertEqual(cache.keys(), ["a", "c"])
+        self.assertEqual(cache.total_bytes(), 200)
+
+    def test_oversized_model_is_still_kept(self):
+        cache = model_cache.ModelCache(max_bytes=50)
+        cache.get("small", Loader(), lambda _: 10)
+        cache.get("large", Loader(), lambda _: 100)
+        self.assertEqual(cache.keys(), ["large"])
+        cache.set_max_bytes(0)
+        self.assertEqual(len(cache), 1)
+
+    def test_concurrent_requests_load_once(self):
+        cache = model_cache.ModelCache()
+        load = Loader(delay=0.05)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get("base", load).model)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(load.calls, 1)
+        self.assertEqual(len(set(map(id, results))), 1)
+
+    def test_failed_load_is_not_cached(self):
+        cache = model_cache.ModelCache()
+
+        def broken():
+            raise RuntimeError("no weights")
+
+        self.assertRaises(RuntimeError, cache.get, "base", broken)
+        self.assertNotIn("base", cache)
+        load = Loader()
+        cache.get("base", load)
+        self.assertEqual(load.calls, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+import prefetch  # noqa: E402
+
+
+# Stand-ins for Ren'Py AST nodes; prefetch only looks at class names and attributes.
+class Node(object):
+    next = None
+
+
+class Show(Node):
+    def __init__(self, name, expression=None):
+        self.imspec = (tuple(name.split()), expression, None, [], None, None, None)
+
+
+class Scene(Show):
+    pass
+
+
+class Say(Node):
+    pass
+
+
+class Code(object):
+    def __init__(self, source):
+        self.source = source
+
+
+class Python(Node):
+    def __init__(self, source):
+        self.code = Code(source)
+
+
+class Jump(Node):
+    def __init__(self, target):
+        self.target = target
+        self.expression = False
+
+
+def chain(*nodes):
+    for node, following in zip(nodes, nodes[1:]):
+        node.next = following
+    return nodes
+
+
+class TestStatementScan(unittest.TestCase):
+    def test_targets(self):
+        movie = Show("intro_first", 'Movie(play="video/intro_video.mkv", loop=False, size=(1920, 1080))')
+        self.assertEqual(prefetch.statement_targets(movie), [prefetch.Target("movie", "video/intro_video.mkv")])
+        self.assertEqual(prefetch.statement_targets(Show("gf angry1")), [prefetch.Target("image", ("gf", "angry1"))])
+        self.assertEqual(prefetch.statement_targets(Python("renpy.movie_cutscene('video/we_are_done.mp4')")), [prefetch.Target("movie", "video/we_are_done.mp4")])
+        self.assertEqual(prefetch.statement_targets(Say()), [])
+
+    def test_upcoming_follows_jumps(self):
+        first = chain(Say(), Say(), Jump("later"))
+        later = chain(Say(), Show("gf angry1"), Say())
+        labels = {"later": later[0]}
+        upcoming = prefetch.upcoming_statements(first[0], labels.get, 10)
+        self.assertEqual(upcoming, [first[1], first[2], later[0], later[1], later[2]])
+        self.assertEqual(len(prefetch.upcoming_statements(first[0], labels.get, 3)), 3)
+
+
+class TestStoryPrefetcher(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        for name in ("intro.mkv", "angry.png"):
+            with open(os.path.join(self.root, name), "wb") as f:
+                f.write(os.urandom(3 * prefetch.BLOCK_SIZE // 2))
+        self.opened = []
+
+        def open_file(name, directory):
+            self.opened.append((name, directory))
+            return open(os.path.join(self.root, name), "rb")
+
+        self.warmer = prefetch.FileWarmer(open_file)
+        self.predicted = []
+        self.prefetcher = prefetch.StoryPrefetcher(
+            self.warmer, {}.get, lambda name: [("angry.png", "images")] if name == ("gf", "angry1") else [],
+            lambda name, start: self.predicted.append((name, start)), lookahead=3,
+        )
+
+    def tearDown(self):
+        self.warmer.close()
+        shutil.rmtree(self.root)
+
+    def run_story(self, nodes):
+        for node in nodes:
+            self.prefetcher.on_statement(node)
+            self.warmer.wait_idle(5)
+
+    def test_warms_before_show(self):
+        story = chain(Say(), Say(), Show("intro_first", 'Movie(play="intro.mkv")'), Say(), Show("gf angry1"), Say())
+        self.run_story(story)
+        stats = self.warmer.stats
+        self.assertEqual((stats.hits, stats.misses, stats.errors), (2, 0, 0))
+        self.assertEqual(stats.hit_rate, 1.0)
+        self.assertEqual(stats.bytes_read, 2 * (3 * prefetch.BLOCK_SIZE // 2))
+        self.assertEqual(sorted(self.opened), [("angry.png", "images"), ("intro.mkv", "audio")])  # each file read once
+        self.assertEqual(self.predicted, [(("gf", "angry1"), True), (("gf", "angry1"), False)])
+
+    def test_too_late_is_a_miss(self):
+        self.run_story(chain(Show("gf angry1"), Say()))
+        self.assertEqual((self.warmer.stats.hits, self.warmer.stats.misses), (0, 1))
+
+    def test_missing_files_are_counted(self):
+        self.run_story(chain(Say(), Show("clip", 'Movie(play="missing.webm")')))
+        self.assertEqual(self.warmer.stats.errors, 1)
+        self.assertEqual(self.warmer.stats.misses, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
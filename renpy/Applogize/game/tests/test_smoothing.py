@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+
+import json
+import math
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+import smoothing  # noqa: E402
+
+
+class TestFilters(unittest.TestCase):
+    def test_ema(self):
+        ema = smoothing.Ema(100.0)
+        self.assertEqual(ema.update(1.0, 0.0), 0.0)
+        self.assertAlmostEqual(ema.update(1.0, 100.0), 1.0 - math.exp(-1.0))
+        for _ in range(50):
+            ema.update(1.0, 100.0)
+        self.assertAlmostEqual(ema.value, 1.0)
+        bounded = smoothing.Ema(100.0, low=0.0, high=1.0)
+        self.assertEqual(bounded.step(5.0, 1.0), 1.0)
+        self.assertEqual(bounded.step(-5.0, 1.0), 0.0)
+
+    def test_hysteresis(self):
+        gate = smoothing.Hysteresis(0.42, 0.28)
+        self.assertEqual([gate.update(x) for x in (0.3, 0.42, 0.5, 0.3, 0.28, 0.4)], [False, False, True, True, False, False])
+        self.assertFalse(gate.reset())
+
+    def test_event_counter(self):
+        events = smoothing.EventCounter(0.5, 0.35)
+        fired = [events.update(x) for x in (0.2, 0.5, 0.9, 0.4, 0.6, 0.3, 0.55)]
+        self.assertEqual(fired, [False, True, False, False, False, False, True])
+        self.assertEqual(events.count, 2)
+
+
+class TestWindows(unittest.TestCase):
+    def test_ring_window(self):
+        window = smoothing.RingWindow(3)
+        self.assertEqual((len(window), window.mean, window.min, window.max), (0, 0.0, 0.0, 0.0))
+        for x in (4, 1, 7, 2, 9):
+            window.push(x)
+        self.assertEqual(len(window), 3)
+        self.assertEqual((window.min, window.max, window.last), (2.0, 9.0, 9.0))
+        self.assertAlmostEqual(window.mean, 6.0)
+        self.assertRaises(ValueError, smoothing.RingWindow, 0)
+
+    def test_ring_window_mean_stays_exact(self):
+        window = smoothing.RingWindow(10)
+        for i in range(100000):
+            window.push(0.1 * (i % 7))
+        self.assertAlmostEqual(window.mean, sum(0.1 * (i % 7) for i in range(99990, 100000)) / 10, places=12)
+
+    def test_running_stats(self):
+        stats = smoothing.RunningStats()
+        for x in (0.5, 0.2, 0.9):
+            stats.push(x)
+        self.assertEqual((stats.count, stats.min, stats.max), (3, 0.2, 0.9))
+        self.assertAlmostEqual(stats.mean, 1.6 / 3)
+
+    def test_slots(self):
+        for obj in (smoothing.Ema(1), smoothing.Hysteresis(1, 0), smoothing.EventCounter(1, 0), smoothing.RingWindow(1), smoothing.StageStats()):
+            self.assertFalse(hasattr(obj, "__dict__"), type(obj).__name__)
+
+
+def sample(ts, smile=0.0, look_away=0.0, looking_away=False, gesture="—", heart=False):
+    return {"ts": ts, "smile": smile, "sadness": 0.1, "lookAway": look_away, "lookingAway": looking_away,
+            "handPresent": gesture != "—", "gesture": gesture, "heartScore": 0.8 if heart else 0.0, "heart": heart, "dialog": ""}
+
+
+class TestStageStats(unittest.TestCase):
+    def test_summary(self):
+        samples = [sample(10.0 + 0.1 * i, smile=0.6 if 10 <= i < 20 or 40 <= i < 45 else 0.1) for i in range(50)]
+        for i in range(20, 30):
+            samples[i] = sample(10.0 + 0.1 * i, look_away=0.7, looking_away=True, gesture="TWO_HAND_HEART", heart=True)
+        stats = smoothing.summarize_lines([json.dumps(s) for s in samples] + ['{"ts": 15.0, "smi'], recent=5)
+        self.assertEqual(stats["samples"], 50)
+        self.assertAlmostEqual(stats["duration"], 4.9)
+        self.assertEqual(stats["smile_events"], 2)
+        self.assertAlmostEqual(stats["looking_away_s"], 1.0)
+        self.assertAlmostEqual(stats["heart_s"], 1.0)
+        self.assertEqual(stats["gestures"], {"TWO_HAND_HEART": 10})
+        self.assertEqual(stats["smile"]["max"], 0.6)
+        self.assertAlmostEqual(stats["smile"]["mean"], (15 * 0.6 + 25 * 0.1) / 50, places=4)
+        self.assertEqual(stats["smile"]["recent_mean"], 0.1)
+        self.assertEqual(stats["lookAway"]["max"], 0.7)
+
+    def test_gaps_are_capped(self):
+        stats = smoothing.summarize_lines([json.dumps(sample(0.0, looking_away=True)), json.dumps(sample(30.0, looking_away=True))])
+        self.assertEqual(stats["duration"], smoothing.MAX_SAMPLE_GAP_S)
+        self.assertEqual(stats["looking_away_s"], smoothing.MAX_SAMPLE_GAP_S)
+
+    def test_summarize_file(self):
+        fd, path = tempfile.mkstemp(suffix=".jsonl")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(json.dumps(sample(1.0, smile=0.7)) + "\n\n" + json.dumps(sample(1.08)) + "\n")
+        try:
+            stats = smoothing.summarize_file(path)
+        finally:
+            os.remove(path)
+        self.assertEqual((stats["samples"], stats["smile_events"]), (2, 1))
+        self.assertEqual(smoothing.summarize_lines([])["samples"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+import io
+import math
+import struct
+import unittest
+import wave
+
+import speech_recognition as sr
+from speech_recognition.recognizers import streaming
+from speech_recognition.recognizers.streaming import Hypothesis
+
+
+class ByteCountSession(streaming.StreamingSession):
+    """Reports how much audio it has been fed instead of recognizing it."""
+
+    def __init__(self, sample_rate, sample_width, every=0.5):
+        super().__init__(sample_rate, sample_width)
+        self.every = every
+        self.reported = 0.0
+
+    def _accept(self, pcm16):
+        if self.elapsed - self.reported < self.every:
+            return []
+        self.reported = self.elapsed
+        return [Hypothesis("%.1f" % self.elapsed, False, 0.0, self.elapsed)]
+
+    def finish(self):
+        return Hypothesis("%.1f" % self.elapsed, True, 0.0, self.elapsed)
+
+
+streaming.register_engine("byte_count", ByteCountSession)
+
+
+def wav_file(rate, seconds_silence, seconds_tone):
+    samples = [0] * int(rate * seconds_silence)
+    samples += [int(8000 * math.sin(i * 0.1)) for i in range(int(rate * seconds_tone))]
+    samples += [0] * int(rate * 2)
+    data = io.BytesIO()
+    with wave.open(data, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(struct.pack("<%dh" % len(samples), *samples))
+    data.seek(0)
+    return data
+
+
+class TestStreamingSession(unittest.TestCase):
+    def test_converts_to_engine_rate_across_chunks(self):
+        session = ByteCountSession(44100, 2)
+        chunk = b"\x00\x01" * 4410
+        for _ in range(10):
+            session.feed(chunk)
+        self.assertAlmostEqual(session.elapsed, 1.0, delta=0.001)
+
+    def test_converts_8_bit_audio(self):
+        session = ByteCountSession(16000, 1)
+        session.feed(b"\x80" * 16000)
+        self.assertEqual(session.samples_fed, 16000)
+
+    def test_unknown_engine(self):
+        self.assertRaises(ValueError, streaming.open_session, "no-such-engine", 16000, 2)
+
+
+class TestRecognizeStream(unittest.TestCase):
+    def test_yields_partials_then_final(self):
+        r = sr.Recognizer()
+        r.dynamic_energy_threshold = False
+        with sr.AudioFile(wav_file(16000, 1.0, 2.0)) as source:
+            hypotheses = list(r.recognize_stream(source, engine="byte_count"))
+            seconds_per_buffer = source.CHUNK / float(source.SAMPLE_RATE)
+        partials, final = hypotheses[:-1], hypotheses[-1]
+        self.assertTrue(final.is_final)
+        self.assertTrue(partials)
+        self.assertFalse(any(h.is_final for h in partials))
+        self.assertEqual([h.end for h in partials], sorted(h.end for h in partials))
+        # The phrase is the 2 s tone plus the pause that ended it, not the whole leading silence
+        # (buffer granularity adds up to a few buffers).
+        self.assertGreater(final.end, 2.0)
+        self.assertLess(final.end, 2.0 + r.non_speaking_duration + r.pause_threshold + 3 * seconds_per_buffer)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+
+import http.server
+import json
+import os
+import threading
+import unittest
+from unittest import mock
+from urllib.error import HTTPError, URLError
+
+import speech_recognition as sr
+from speech_recognition.transport import HTTPTransport, TokenCache
+
+GOOGLE_RESULT = b'{"result":[]}\n' + json.dumps(
+    {"result": [{"alternative": [{"transcript": "hello there", "confidence": 0.9}], "final": True}], "result_index": 0}
+).encode()
+
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive unless the handler says otherwise
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_POST(self):
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            body = b""
+            while True:
+                size = int(self.rfile.readline().split(b";")[0], 16)
+                if size == 0:
+                    self.rfile.readline()
+                    break
+                body += self.rfile.read(size)
+                self.rfile.readline()
+        else:
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.requests.append((self.path, body))
+        status, response, *headers = self.server.responses.pop(0) if self.server.responses else (200, GOOGLE_RESULT)
+        if status is None:  # drop the connection after reading the request
+            self.close_connection = True
+            return
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(response)))
+        for name, value in (headers[0] if headers else {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(response)
+        if self.server.close_after_response:
+            self.close_connection = True  # without telling the client, like a server dropping idle connections
+
+    do_GET = do_POST
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.connections = 0
+        self.requests = []
+        self.responses = []  # (status, body[, headers]) to answer with before falling back to GOOGLE_RESULT
+        self.close_after_response = False
+        self.url = "http://127.0.0.1:%d" % self.server_address[1]
+        threading.Thread(target=self.serve_forever, args=(0.05,), daemon=True).start()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class TestHTTPTransport(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer()
+        self.transport = HTTPTransport(backoff=0.01)
+
+    def tearDown(self):
+        self.transport.close()
+        self.server.stop()
+
+    def test_back_to_back_recognitions_reuse_connection(self):
+        r = sr.Recognizer()
+        r.transport = self.transport
+        audio = sr.AudioData(b"\x00\x10" * 16000, 16000, 2)
+        try:
+            texts = [r.recognize_google(audio, endpoint=self.server.url + "/recognize") for _ in range(3)]
+        except OSError as e:  # no FLAC encoder available
+            self.skipTest(str(e))
+        self.assertEqual(texts, ["hello there"] * 3)
+        self.assertEqual(self.transport.connections_opened, 1)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_preconnect(self):
+        self.transport.preconnect(self.server.url)
+        self.transport.request("POST", self.server.url + "/a", b"x")
+        self.assertEqual(self.transport.connections_opened, 1)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_resends_on_stale_connection(self):
+        self.server.close_after_response = True
+        for i in range(3):
+            response = self.transport.request("POST", self.server.url + "/%d" % i, b"x")
+            self.assertEqual(response.status, 200)
+        self.assertEqual([path for path, _ in self.server.requests], ["/0", "/1", "/2"])
+
+    def test_chunked_request_body(self):
+        self.transport.request("POST", self.server.url, b"abcdef", {"Transfer-Encoding": "chunked"})
+        self.assertEqual(self.server.requests, [("/", b"abcdef")])
+
+    def test_retries_unavailable(self):
+        self.server.responses = [(503, b"busy"), (503, b"busy")]
+        self.assertEqual(self.transport.request("POST", self.server.url, b"x").read(), GOOGLE_RESULT)
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_retries_are_bounded(self):
+        self.transport.retries = 1
+        self.server.responses = [(503, b"busy")] * 3
+        with self.assertRaises(HTTPError) as raised:
+            self.transport.request("POST", self.server.url, b"x")
+        self.assertEqual(raised.exception.code, 503)
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_client_errors_are_not_retried(self):
+        self.server.responses = [(400, b"bad")]
+        self.assertRaises(HTTPError, self.transport.request, "POST", self.server.url, b"x")
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_error_after_sending_is_not_retried(self):
+        self.server.responses = [(None, b"")]
+        self.assertRaises(URLError, self.transport.request, "POST", self.server.url, b"x")
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_follows_redirects(self):
+        self.server.responses = [(302, b"", {"Location": "/b"}), (307, b"", {"Location": self.server.url + "/c"})]
+        response = self.transport.request("POST", self.server.url + "/a", b"x")
+        self.assertEqual(response.read(), GOOGLE_RESULT)
+        self.assertEqual(self.server.requests, [("/a", b"x"), ("/b", b""), ("/c", b"")])
+
+    def test_post_is_not_redirected_with_307(self):
+        self.server.responses = [(307, b"", {"Location": "/b"})]
+        with self.assertRaises(HTTPError) as raised:
+            self.transport.request("POST", self.server.url + "/a", b"x")
+        self.assertEqual(raised.exception.code, 307)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_redirect_loop(self):
+        self.transport.max_redirections = 2
+        self.server.responses = [(302, b"", {"Location": "/a"})] * 3
+        self.assertRaises(HTTPError, self.transport.request, "GET", self.server.url + "/a")
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_uses_proxy(self):
+        environ = {"http_proxy": self.server.url, "no_proxy": "", "NO_PROXY": ""}
+        with mock.patch.dict(os.environ, environ):
+            response = self.transport.request("POST", "http://recognizer.invalid/recognize", b"x")
+        self.assertEqual(response.read(), GOOGLE_RESULT)
+        self.assertEqual(self.server.requests, [("http://recognizer.invalid/recognize", b"x")])
+        self.assertEqual(self.transport.connections_opened, 0)
+
+    def test_connection_refused(self):
+        self.transport.retries = 0
+        self.server.stop()
+        self.assertRaises(URLError, self.transport.request, "GET", self.server.url)
+        self.server = StubServer()  # for tearDown
+
+
+class TestTokenCache(unittest.TestCase):
+    def test_reuses_until_expiry(self):
+        fetched = []
+
+        def fetch():
+            fetched.append(1)
+            return "token%d" % len(fetched), 600
+
+        cache = TokenCache()
+        self.assertEqual(cache.get("key", fetch), "token1")
+        self.assertEqual(cache.get("key", fetch), "token1")
+        cache.invalidate("key")
+        self.assertEqual(cache.get("key", fetch), "token2")
+        expired = TokenCache(margin=600)
+        self.assertEqual(expired.get("key", fetch), "token3")
+        self.assertEqual(expired.get("key", fetch), "token4")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+
+import math
+import os
+import random
+import struct
+import sys
+import tempfile
+import unittest
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+import voice_dsp  # noqa: E402
+
+RATE = 16000
+CHUNK = 1024
+SECONDS_PER_CHUNK = CHUNK / float(RATE)
+
+
+def pcm(samples):
+    return struct.pack("<%dh" % len(samples), *samples)
+
+
+def take(rng, lead_s, speech_s, tail_s, amplitude):
+    noise = lambda seconds: [int(rng.gauss(0, 20)) for _ in range(int(RATE * seconds))]
+    speech = [int(amplitude * math.sin(i * 0.07)) for i in range(int(RATE * speech_s))]
+    return noise(lead_s) + speech + noise(tail_s)
+
+
+class VoiceDspMixin:
+    def setUp(self):
+        self.rng = random.Random(7)
+        self.saved_np = voice_dsp._np
+        if self.numpy_backend:
+            if voice_dsp._np is None:
+                self.skipTest("NumPy is not installed")
+        else:
+            voice_dsp._np = None
+
+    def tearDown(self):
+        voice_dsp._np = self.saved_np
+
+    def test_trims_leading_and_trailing_silence(self):
+        result = voice_dsp.process(pcm(take(self.rng, 1.0, 2.0, 1.5, 12000)), RATE)
+        pad = RATE * voice_dsp.TRIM_PAD_MS // 1000
+        self.assertAlmostEqual(result.start, RATE - pad, delta=RATE // 100)
+        self.assertAlmostEqual(result.end, 3 * RATE + pad, delta=RATE // 100)
+        self.assertEqual(len(result.data), 2 * (result.end - result.start))
+        self.assertEqual(result.gain, 1.0)
+
+    def test_quiet_take_is_boosted_without_clipping(self):
+        samples = take(self.rng, 0.5, 1.0, 0.5, 4000)
+        result = voice_dsp.process(pcm(samples), RATE, trim=False)
+        self.assertEqual(result.gain, voice_dsp.GAIN_TARGET_PEAK / float(max(abs(s) for s in samples)))
+        self.assertEqual(result.peak, voice_dsp.GAIN_TARGET_PEAK)
+        expected = [int(s * result.gain) for s in samples]
+        self.assertEqual(result.data, pcm(expected))
+
+    def test_apply_gain_clips(self):
+        samples = voice_dsp._samples(pcm([30000, -30000, 5]))
+        self.assertEqual(voice_dsp._to_bytes(voice_dsp.apply_gain(samples, 2.0)), pcm([32767, -32768, 10]))
+
+    def test_silence_and_empty_input(self):
+        self.assertEqual(voice_dsp.process(b"", RATE).peak, 0)
+        result = voice_dsp.process(pcm([0] * RATE), RATE)
+        self.assertEqual((result.peak, result.gain, result.start, result.end), (0, 1.0, 0, RATE))
+
+    def test_highpass_removes_dc(self):
+        result = voice_dsp.process(pcm([3000] * RATE), RATE, highpass_hz=100, trim=False)
+        self.assertLess(max(abs(s) for s in struct.unpack("<%dh" % RATE, result.data)[RATE // 10:]), 2)
+
+
+def silence(rng, seconds):
+    # Room noise: mostly low-frequency (mains hum) with a little broadband hiss.
+    return [int(30 * math.sin(2 * math.pi * 60 * i / RATE) + rng.gauss(0, 3)) for i in range(int(RATE * seconds))]
+
+
+def voiced(rng, seconds, amplitude=5000):
+    return [int(amplitude * math.sin(2 * math.pi * 200 * i / RATE) + rng.gauss(0, 200)) for i in range(int(RATE * seconds))]
+
+
+def fricative(rng, seconds, level=200):
+    return [int(rng.gauss(0, level)) for _ in range(int(RATE * seconds))]
+
+
+def hum(seconds, level=200):
+    return [int(level * math.sqrt(2) * math.sin(2 * math.pi * 50 * i / RATE)) for i in range(int(RATE * seconds))]
+
+
+def endpoint_corpus(rng):
+    """name -> (samples, expected endpoint in seconds or None, Endpointer kwargs)."""
+    return {
+        "speech_then_silence": (silence(rng, 1) + voiced(rng, 2) + silence(rng, 3), 3.0, {}),
+        "pause_inside_phrase": (silence(rng, 1) + voiced(rng, 1) + silence(rng, 0.5) + voiced(rng, 1) + silence(rng, 3), 3.5, {}),
+        "noise_only": (silence(rng, 4), None, {}),
+        "click_only": (silence(rng, 1) + voiced(rng, 0.1) + silence(rng, 3), None, {}),
+        "fricative_tail": (silence(rng, 1) + voiced(rng, 1) + fricative(rng, 0.5) + silence(rng, 3), 2.5,
+                           {"dynamic_energy_threshold": False}),
+        "hum_tail": (silence(rng, 1) + voiced(rng, 1) + hum(0.5) + silence(rng, 3), 2.0,
+                     {"dynamic_energy_threshold": False}),
+    }
+
+
+class TestEndpointer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.corpus = {}
+        for name, (samples, expected, kwargs) in endpoint_corpus(random.Random(3)).items():
+            path = os.path.join(self.tmp.name, name + ".wav")
+            with wave.open(path, "wb") as wf:
+                wf.setnchannels(1)
+                wf.setsampwidth(2)
+                wf.setframerate(RATE)
+                wf.writeframes(pcm(samples))
+            self.corpus[name] = (path, expected, kwargs)
+
+    def run_endpointer(self, path, **kwargs):
+        endpointer = voice_dsp.Endpointer(RATE, CHUNK, **kwargs)
+        kept = []
+        with wave.open(path, "rb") as wf:
+            while not endpointer.ended:
+                chunk = wf.readframes(CHUNK)
+                if not chunk:
+                    break
+                kept.extend(endpointer.push(chunk))
+        kept.extend(endpointer.finish())
+        return endpointer, b"".join(kept)
+
+    def test_endpoint_timing(self):
+        for name, (path, expected, kwargs) in self.corpus.items():
+            with self.subTest(name=name):
+                endpointer, kept = self.run_endpointer(path, **kwargs)
+                if expected is None:
+                    self.assertFalse(endpointer.ended)
+                    continue
+                self.assertTrue(endpointer.ended)
+                # Fires pause_threshold (rounded up to whole chunks) after speech ends.
+                pause = (endpointer.pause_buffer_count + 1) * SECONDS_PER_CHUNK
+                self.assertAlmostEqual(endpointer.end_time(), expected + pause, delta=2 * SECONDS_PER_CHUNK)
+
+    def test_kept_audio_is_trimmed(self):
+        path, expected, kwargs = self.corpus["speech_then_silence"]
+        endpointer, kept = self.run_endpointer(path, **kwargs)
+        kept_seconds = len(kept) / 2.0 / RATE
+        # 2 s of speech plus at most non_speaking_duration on each side.
+        margin = endpointer.non_speaking_buffer_count * SECONDS_PER_CHUNK
+        self.assertGreaterEqual(kept_seconds, 2.0)
+        self.assertLessEqual(kept_seconds, 2.0 + 2 * margin + 2 * SECONDS_PER_CHUNK)
+
+    def test_noise_only_keeps_nothing(self):
+        path, expected, kwargs = self.corpus["noise_only"]
+        endpointer, kept = self.run_endpointer(path, **kwargs)
+        self.assertFalse(endpointer.speech_started)
+        self.assertEqual(kept, b"")
+
+
+class TestVoiceDspNumpy(VoiceDspMixin, unittest.TestCase):
+    numpy_backend = True
+
+
+class TestVoiceDspArray(VoiceDspMixin, unittest.TestCase):
+    numpy_backend = False
+
+
+if __name__ == "__main__":
+    unittest.main()
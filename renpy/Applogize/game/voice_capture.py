@@ -0,0 +1,278 @@
+"""Persistent microphone capture for the game process, plus the /analyze/stream uploader.
+
+The subprocess path (record_to_wav.py) pays interpreter + PortAudio startup on every take.
+CaptureService opens one PyAudio input stream, keeps it running between takes and hands
+captured PCM straight to a ChunkUploader. record_to_wav.py reuses ChunkUploader for --stream.
+"""
+import json
+import queue
+import threading
+import time
+import urllib.request
+
+import voice_dsp
+
+RATE = 16000
+CHUNK = 1024
+SECONDS = 15
+CHANNELS = 1
+SAMPLE_WIDTH = 2
+# CHUNK reads batched per upload (8 * 1024 frames ~= 0.5 s at 16 kHz).
+STREAM_BATCH = 8
+# End takes automatically once the player stops talking (voice_dsp.Endpointer).
+ENDPOINTING = True
+# speech_recognition streaming engine for live partial transcripts ("vosk", "faster_whisper"),
+# or None. The answer still comes from /analyze; partials are only shown while recording.
+PARTIAL_ENGINE = None
+
+
+def make_endpointer():
+    return voice_dsp.Endpointer(RATE, CHUNK) if ENDPOINTING else None
+
+
+def post_json(url, data, content_type, timeout):
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": content_type}, method="POST")
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        return json.loads(resp.read().decode("utf-8"))
+
+
+class ChunkUploader:
+    """Posts PCM chunks to an /analyze/stream session from a background thread."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip("/")
+        self.stream_id = None
+        self.error = None
+        self._queue = queue.Queue()
+        # The session is opened on the upload thread so capture can start right away.
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            self.stream_id = post_json(self.base_url, b"", "application/json", 10)["stream_id"]
+        except Exception as e:
+            self.error = e
+        url = "%s/%s/chunk" % (self.base_url, self.stream_id)
+        while True:
+            data = self._queue.get()
+            if data is None:
+                return
+            if self.error is not None:
+                continue
+            try:
+                post_json(url, data, "application/octet-stream", 10)
+            except Exception as e:
+                self.error = e
+
+    def send(self, data):
+        self._queue.put(data)
+
+    def cancel(self):
+        """Stop the upload thread without finishing; the server drops the idle session."""
+        self._queue.put(None)
+
+    def finish(self, last):
+        """Flush pending chunks, send the last one and return the server's /analyze result."""
+        self._queue.put(None)
+        self._thread.join()
+        if self.error is not None:
+            raise self.error
+        url = "%s/%s/finish" % (self.base_url, self.stream_id)
+        return post_json(url, last, "application/octet-stream", 70)
+
+
+class PartialTranscriber:
+    """Feeds captured PCM to a speech_recognition streaming session on a background thread.
+
+    on_text(text) is called from that thread with the committed text plus the latest partial."""
+
+    def __init__(self, engine, on_text, **options):
+        self.on_text = on_text
+        self.error = None
+        self._queue = queue.Queue()
+        # Opening the session may load a model, so it happens on the worker thread too.
+        self._thread = threading.Thread(target=self._run, args=(engine, options), daemon=True)
+        self._thread.start()
+
+    def _run(self, engine, options):
+        try:
+            from speech_recognition.recognizers.streaming import open_session
+            session = open_session(engine, RATE, SAMPLE_WIDTH, **options)
+        except Exception as e:
+            self.error = e
+            session = None
+        committed = []
+        while True:
+            data = self._queue.get()
+            if data is None:
+                return
+            if session is None:
+                continue
+            try:
+                hypotheses = session.feed(data)
+            except Exception as e:
+                self.error = e
+                session = None
+                continue
+            partial = ""
+            for hypothesis in hypotheses:
+                if hypothesis.is_final:
+                    committed.append(hypothesis.text)
+                    partial = ""
+                else:
+                    partial = hypothesis.text
+            if hypotheses:
+                self.on_text(" ".join(t for t in committed + [partial] if t))
+
+    def send(self, data):
+        self._queue.put(data)
+
+    def close(self):
+        self._queue.put(None)
+
+
+class Take:
+    """One recording attempt fed by CaptureService's stream callback."""
+
+    def __init__(self, on_chunk=None, seconds=SECONDS, requested_at=None, endpointer=None):
+        # Wall-clock so it is comparable with record_to_wav.py's LATENCY line.
+        self.requested_at = time.time() if requested_at is None else requested_at
+        self.first_sample_at = None
+        self.on_chunk = on_chunk
+        self.endpointer = endpointer
+        self.max_frames = int(RATE / CHUNK * seconds)
+        self.frames_read = 0
+        self.pending = []
+        self.done = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def start_latency(self):
+        """Seconds from the request (begin_take or the Record click) to the first captured buffer."""
+        if self.first_sample_at is None:
+            return None
+        return self.first_sample_at - self.requested_at
+
+    def _feed(self, data):
+        with self._lock:
+            if self.done.is_set():
+                return
+            if self.first_sample_at is None:
+                self.first_sample_at = time.time()
+            self.frames_read += 1
+            if self.endpointer is None:
+                self.pending.append(data)
+            else:
+                self.pending.extend(self.endpointer.push(data))
+            if self.on_chunk is not None and len(self.pending) >= STREAM_BATCH:
+                # Only the unsent tail is kept when streaming.
+                self.on_chunk(b"".join(self.pending))
+                self.pending = []
+            if self.frames_read >= self.max_frames or (self.endpointer is not None and self.endpointer.ended):
+                self.done.set()
+
+    def wait(self, timeout=None):
+        return self.done.wait(timeout)
+
+    def stop(self):
+        self.done.set()
+
+    def tail(self):
+        """PCM captured but not yet passed to on_chunk (the whole take without on_chunk).
+
+        Call after the take is done; it also collects the part of the trailing pause the
+        endpointer still holds."""
+        with self._lock:
+            if self.endpointer is not None:
+                self.pending.extend(self.endpointer.finish())
+            return b"".join(self.pending)
+
+
+class CaptureService:
+    """Keeps one PyAudio input stream open and warm, routing buffers to the active Take."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pa = None
+        self._stream = None
+        self._take = None
+        self._continue = None
+        self.open_seconds = None
+
+    @staticmethod
+    def available():
+        try:
+            import pyaudio  # noqa: F401
+        except Exception:
+            return False
+        return True
+
+    def warm_up(self):
+        """Open the input stream if it is not running yet. Safe to call repeatedly."""
+        with self._lock:
+            if self._stream is not None and self._stream.is_active():
+                return
+            import pyaudio
+            t0 = time.perf_counter()
+            self._continue = pyaudio.paContinue
+            if self._pa is None:
+                self._pa = pyaudio.PyAudio()
+            self._stream = self._pa.open(
+                format=pyaudio.paInt16,
+                channels=CHANNELS,
+                rate=RATE,
+                input=True,
+                frames_per_buffer=CHUNK,
+                stream_callback=self._callback,
+            )
+            self._stream.start_stream()
+            self.open_seconds = time.perf_counter() - t0
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        take = self._take
+        if take is not None:
+            take._feed(in_data)
+        return (None, self._continue)
+
+    def begin_take(self, on_chunk=None, seconds=SECONDS, requested_at=None, endpointer=None):
+        take = Take(on_chunk=on_chunk, seconds=seconds, requested_at=requested_at, endpointer=endpointer)
+        self.warm_up()
+        previous, self._take = self._take, take
+        if previous is not None:
+            previous.stop()
+        return take
+
+    def end_take(self, take):
+        take.stop()
+        if self._take is take:
+            self._take = None
+
+    def close(self):
+        with self._lock:
+            self._take = None
+            if self._stream is not None:
+                try:
+                    self._stream.stop_stream()
+                    self._stream.close()
+                except Exception:
+                    pass
+                self._stream = None
+            if self._pa is not None:
+                self._pa.terminate()
+                self._pa = None
+
+
+_service = None
+
+
+def get_service():
+    global _service
+    if _service is None:
+        _service = CaptureService()
+    return _service
+
+
+def shutdown():
+    if _service is not None:
+        _service.close()
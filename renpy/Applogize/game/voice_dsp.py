@@ -0,0 +1,291 @@
+"""DSP for 16-bit mono PCM: peak/RMS, clipped gain, high-pass, silence trimming and endpointing.
+
+Works on whole buffers at once (NumPy when importable, the array module otherwise) instead of
+unpacking them into tuples of Python ints. record_to_wav.py runs process() on the hang-up path;
+Endpointer decides when a take is over while it is being captured.
+"""
+import math
+import sys
+from array import array
+from collections import namedtuple
+from operator import mul
+
+try:
+    import numpy as _np
+except ImportError:
+    _np = None
+
+FRAME_MS = 10
+# Same low-level boost record_to_wav.py always applied.
+# (Hume sometimes returns empty transcript when audio is too quiet.)
+GAIN_PEAK_THRESHOLD = 8000
+GAIN_TARGET_PEAK = 20000
+GAIN_MAX = 8.0
+# Silence trimming: a frame is voiced when its RMS is TRIM_RATIO times the quietest
+# frames' level (and at least TRIM_MIN_RMS); TRIM_PAD_MS of audio is kept around speech.
+TRIM_MIN_RMS = 200
+TRIM_RATIO = 3.0
+TRIM_PAD_MS = 200
+
+DspResult = namedtuple("DspResult", "data peak rms gain start end")
+DspResult.__doc__ = """Processed PCM plus stats: peak/rms after gain, applied gain, kept sample range [start, end)."""
+
+
+def _samples(raw):
+    if _np is not None:
+        return _np.frombuffer(raw, dtype="<i2")
+    samples = array("h")
+    samples.frombytes(raw)
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return samples
+
+
+def _to_bytes(samples):
+    if _np is not None:
+        return samples.astype("<i2").tobytes()
+    if sys.byteorder == "big":
+        samples = array("h", samples)
+        samples.byteswap()
+    return samples.tobytes()
+
+
+def _peak(samples):
+    if len(samples) == 0:
+        return 0
+    if _np is not None:
+        return int(_np.abs(samples.astype(_np.int32)).max())
+    return max(max(samples), -min(samples))
+
+
+def peak_and_rms(samples):
+    """Peak absolute value and RMS of a sample sequence from _samples()."""
+    n = len(samples)
+    if n == 0:
+        return 0, 0.0
+    if _np is not None:
+        wide = samples.astype(_np.float64)
+        return _peak(samples), float(_np.sqrt(_np.dot(wide, wide) / n))
+    return _peak(samples), (sum(map(mul, samples, samples)) / n) ** 0.5
+
+
+def frame_levels(samples, rate, frame_ms=FRAME_MS):
+    """RMS level of each complete frame_ms frame."""
+    size = max(1, rate * frame_ms // 1000)
+    count = len(samples) // size
+    if _np is not None:
+        frames = samples[:count * size].astype(_np.float64).reshape(count, size)
+        return _np.sqrt(_np.einsum("ij,ij->i", frames, frames) / size)
+    levels = []
+    for i in range(count):
+        frame = samples[i * size:(i + 1) * size]
+        levels.append((sum(map(mul, frame, frame)) / size) ** 0.5)
+    return levels
+
+
+def voiced_span(levels, min_rms=TRIM_MIN_RMS, ratio=TRIM_RATIO):
+    """(first, last + 1) voiced frame indexes, or None when no frame is voiced."""
+    if len(levels) == 0:
+        return None
+    ordered = sorted(levels)
+    noise_floor = ordered[len(ordered) // 10]
+    threshold = max(min_rms, noise_floor * ratio)
+    voiced = [i for i, level in enumerate(levels) if level >= threshold]
+    if not voiced:
+        return None
+    return voiced[0], voiced[-1] + 1
+
+
+def highpass(samples, rate, cutoff_hz):
+    """Remove rumble/DC below roughly cutoff_hz by subtracting a moving average."""
+    window = max(2, int(rate / cutoff_hz))
+    if _np is not None:
+        wide = samples.astype(_np.float64)
+        csum = _np.concatenate(([0.0], _np.cumsum(wide)))
+        idx = _np.arange(len(wide))
+        lo = _np.maximum(0, idx - window + 1)
+        mean = (csum[idx + 1] - csum[lo]) / (idx + 1 - lo)
+        return _np.clip(_np.rint(wide - mean), -32768, 32767).astype(_np.int16)
+    out = array("h")
+    total = 0
+    for i, s in enumerate(samples):
+        total += s
+        if i >= window:
+            total -= samples[i - window]
+        v = int(round(s - total / min(i + 1, window)))
+        out.append(32767 if v > 32767 else -32768 if v < -32768 else v)
+    return out
+
+
+def apply_gain(samples, gain):
+    """Scale by gain, truncating toward zero and clipping to the 16-bit range."""
+    if _np is not None:
+        return _np.clip(samples.astype(_np.float64) * gain, -32768, 32767).astype(_np.int16)
+    if _peak(samples) * gain <= 32767:
+        # No sample can clip (always the case for process()'s boost), so skip the bounds checks.
+        return array("h", map(int, map(float(gain).__mul__, samples)))
+    return array("h", [32767 if v > 32767 else -32768 if v < -32768 else v for v in (int(s * gain) for s in samples)])
+
+
+def process(raw, rate, highpass_hz=None, trim=True, pad_ms=TRIM_PAD_MS):
+    """Trim leading/trailing silence, optionally high-pass, and boost quiet takes.
+
+    raw is little-endian 16-bit mono PCM. The per-frame levels are computed once and serve
+    both the trimming decision and the RMS; the buffer is only rescaled when gain is needed."""
+    samples = _samples(raw)
+    if highpass_hz:
+        samples = highpass(samples, rate, highpass_hz)
+    size = max(1, rate * FRAME_MS // 1000)
+    levels = frame_levels(samples, rate)
+    first, last = 0, len(levels)
+    start, end = 0, len(samples)
+    if trim:
+        span = voiced_span(levels)
+        if span is not None:
+            pad = rate * pad_ms // 1000
+            start = max(0, span[0] * size - pad)
+            end = min(len(samples), span[1] * size + pad)
+            first, last = start // size, min(len(levels), -(-end // size))
+            samples = samples[start:end]
+    kept = levels[first:last]
+    rms = (sum(level * level for level in kept) / len(kept)) ** 0.5 if len(kept) else 0.0
+    peak = _peak(samples)
+    gain = 1.0
+    if 0 < peak < GAIN_PEAK_THRESHOLD:
+        gain = min(GAIN_MAX, GAIN_TARGET_PEAK / float(peak))
+        samples = apply_gain(samples, gain)
+        peak, rms = _peak(samples), rms * gain
+    return DspResult(_to_bytes(samples), peak, float(rms), gain, start, end)
+
+
+def chunk_energy_and_zcr(chunk):
+    """RMS energy and zero-crossing rate (crossings per sample) of one 16-bit PCM chunk."""
+    samples = _samples(chunk)
+    n = len(samples)
+    if n == 0:
+        return 0.0, 0.0
+    if _np is not None:
+        wide = samples.astype(_np.float64)
+        negative = samples < 0
+        crossings = int(_np.count_nonzero(negative[1:] != negative[:-1]))
+        return float(_np.sqrt(_np.dot(wide, wide) / n)), crossings / float(n)
+    negative = [s < 0 for s in samples]
+    crossings = sum(map(bool.__ne__, negative[1:], negative[:-1]))
+    return (sum(map(mul, samples, samples)) / n) ** 0.5, crossings / float(n)
+
+
+class Endpointer:
+    """Incremental energy + zero-crossing VAD that ends a take after trailing silence.
+
+    The energy logic follows speech_recognition.Recognizer._listen: energy_threshold adapts to the
+    ambient level (same asymmetric damping) until speech starts, a phrase needs phrase_threshold
+    seconds of speech, and pause_threshold seconds of non-speech end it. The ambient
+    zero-crossing rate is tracked the same way; chunks below the energy threshold but within
+    unvoiced_energy_ratio of it whose zero-crossing rate is well above the ambient one
+    (fricatives such as a final "s") also count as speech, so word endings are not cut.
+
+    push() returns the chunks worth keeping as they become known: up to non_speaking_duration of
+    audio before speech starts, the speech itself, and pauses once speech resumes. Leading
+    silence and the trailing pause beyond non_speaking_duration are dropped; finish() returns
+    the held part of the tail that should still be kept.
+    """
+
+    def __init__(self, rate, chunk_frames, energy_threshold=300, dynamic_energy_threshold=True,
+                 dynamic_energy_adjustment_damping=0.15, dynamic_energy_ratio=1.5,
+                 pause_threshold=0.8, phrase_threshold=0.3, non_speaking_duration=0.5,
+                 unvoiced_energy_ratio=0.5, unvoiced_zcr=0.3, unvoiced_zcr_margin=0.1):
+        assert pause_threshold >= non_speaking_duration >= 0
+        self.seconds_per_buffer = float(chunk_frames) / rate
+        self.energy_threshold = energy_threshold
+        self.dynamic_energy_threshold = dynamic_energy_threshold
+        self.damping = dynamic_energy_adjustment_damping ** self.seconds_per_buffer
+        self.dynamic_energy_ratio = dynamic_energy_ratio
+        self.unvoiced_energy_ratio = unvoiced_energy_ratio
+        self.unvoiced_zcr = unvoiced_zcr
+        self.unvoiced_zcr_margin = unvoiced_zcr_margin
+        self.ambient_zcr = None
+        self.pause_buffer_count = int(math.ceil(pause_threshold / self.seconds_per_buffer))
+        self.phrase_buffer_count = int(math.ceil(phrase_threshold / self.seconds_per_buffer))
+        self.non_speaking_buffer_count = int(math.ceil(non_speaking_duration / self.seconds_per_buffer))
+        self.chunks_seen = 0
+        self.speech_chunk = None  # index of the first chunk of the current phrase
+        self.end_chunk = None  # index of the chunk after the phrase's last speech chunk
+        self.ended = False
+        self._held = []
+        self._phrase_count = 0
+        self._pause_count = 0
+
+    @property
+    def speech_started(self):
+        return self.speech_chunk is not None
+
+    def end_time(self):
+        """Seconds into the take at which the endpoint fired, or None."""
+        if not self.ended:
+            return None
+        return self.chunks_seen * self.seconds_per_buffer
+
+    def is_speech(self, chunk):
+        """(speech?, energy, zcr) for one chunk."""
+        energy, zcr = chunk_energy_and_zcr(chunk)
+        if energy > self.energy_threshold:
+            return True, energy, zcr
+        if self.ambient_zcr is None or energy <= self.energy_threshold * self.unvoiced_energy_ratio:
+            return False, energy, zcr
+        return zcr >= max(self.unvoiced_zcr, self.ambient_zcr + self.unvoiced_zcr_margin), energy, zcr
+
+    def _adapt(self, energy, zcr):
+        if self.ambient_zcr is None:
+            self.ambient_zcr = zcr
+        else:
+            self.ambient_zcr = self.ambient_zcr * self.damping + zcr * (1 - self.damping)
+        if self.dynamic_energy_threshold:
+            target_energy = energy * self.dynamic_energy_ratio
+            self.energy_threshold = self.energy_threshold * self.damping + target_energy * (1 - self.damping)
+
+    def push(self, chunk):
+        if self.ended:
+            return []
+        index = self.chunks_seen
+        self.chunks_seen += 1
+        speech, energy, zcr = self.is_speech(chunk)
+
+        if self.speech_chunk is None:
+            self._held.append(chunk)
+            if len(self._held) > self.non_speaking_buffer_count + 1:
+                self._held.pop(0)
+            if not speech:
+                self._adapt(energy, zcr)
+                return []
+            self.speech_chunk = index
+            self.end_chunk = index + 1
+            self._phrase_count = 1
+            self._pause_count = 0
+            released, self._held = self._held, []
+            return released
+
+        if speech:
+            self._phrase_count += 1
+            self._pause_count = 0
+            self.end_chunk = index + 1
+            released, self._held = self._held + [chunk], []
+            return released
+
+        self._pause_count += 1
+        self._held.append(chunk)
+        self._adapt(energy, zcr)
+        if self._pause_count > self.pause_buffer_count:
+            if self._phrase_count >= self.phrase_buffer_count:
+                self.ended = True
+            else:
+                # Too short to be a phrase (a click or pop): start waiting for speech again.
+                self.speech_chunk = self.end_chunk = None
+                self._held = self._held[-(self.non_speaking_buffer_count + 1):]
+        return []
+
+    def finish(self):
+        """Chunks still held back that belong to the take (at most non_speaking_duration of tail)."""
+        if self.speech_chunk is None:
+            return []
+        kept, self._held = self._held[:self.non_speaking_buffer_count], []
+        return kept
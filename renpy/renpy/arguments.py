@@ -147,6 +147,43 @@ class ArgumentParser(argparse.ArgumentParser):
             help="Prevents the compile command from deleting orphan rpyc files.",
         )
 
+        self.add_argument(
+            "--load-threads",
+            dest="load_threads",
+            default=0,
+            type=int,
+            metavar="THREADS",
+            help="The number of threads that read and decompress script files ahead of loading them. The default, 0, loads them one at a time.",
+        )
+
+        self.add_argument(
+            "--profile-load",
+            action="store_true",
+            dest="profile_load",
+            help="Reports how long each script file took to load.",
+        )
+
+        self.add_argument(
+            "--lazy-script",
+            action="store_true",
+            dest="lazy_script",
+            help="Keeps script files that don't run anything at init time unloaded until one of their labels is reached.",
+        )
+
+        self.add_argument(
+            "--save-benchmark",
+            action="store_true",
+            dest="save_benchmark",
+            help="Saves in both the zip and incremental save formats after every interaction, and reports the bytes written and time taken on quit.",
+        )
+
+        self.add_argument(
+            "--persistent-benchmark",
+            action="store_true",
+            dest="persistent_benchmark",
+            help="Reports how long finding changes to and writing large persistent data takes, when the persistent data is loaded.",
+        )
+
         self.add_argument("--lint", action="store_true", dest="lint", help=argparse.SUPPRESS)
 
         self.add_argument("--errors-in-editor", action="store_true", help="Causes errors to open in a text editor.")
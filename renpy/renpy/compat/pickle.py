@@ -335,6 +335,102 @@ def dumps(o: object, highest=False, bad_reduction_name: str | None = None) -> by
         raise
 
 
+# Types that are pickled by value in every chunk, rather than referenced in
+# the chunk that first pickled them.
+UNSHARED_TYPES = (str, bytes, int, float, bool, complex, types.NoneType, type, types.FunctionType, types.BuiltinFunctionType)
+
+
+class ChunkPickler(pickle.Pickler):
+    """
+    A pickler that writes a reference to objects pickled by an earlier chunk,
+    rather than the object itself.
+    """
+
+    def __init__(self, f, owned):
+        super().__init__(f, PROTOCOL)
+        self.owned = owned
+
+    def persistent_id(self, obj):
+        ido = id(obj)
+
+        if ido in self.owned:
+            return ido
+
+        return None
+
+
+class ChunkUnpickler(Unpickler):
+    """
+    An unpickler that resolves the references written by ChunkPickler.
+    """
+
+    def __init__(self, f, objects):
+        super().__init__(f, fix_imports=True, encoding="utf-8", errors="surrogateescape")
+        self.objects = objects
+
+    def persistent_load(self, pid):
+        return self.objects[pid]
+
+
+def dump_chunks(chunks: list[tuple[Any, object]]) -> list[tuple[Any, bytes]]:
+    """
+    Pickles a list of (key, object) pairs into a list of (key, data) pairs,
+    in order. An object pickled by one chunk is written as a reference by the
+    later chunks, so that the identity of shared objects is kept.
+
+    References are by the id of the object, not by the chunk that pickled it,
+    and each chunk ends with a table giving the ids of the objects it pickled.
+    So removing a chunk only changes the chunks that then pickle its objects
+    themselves, and the data of the others only changes when their objects do.
+    As ids differ between runs, the first save after the game starts or loads
+    writes every chunk again.
+    """
+
+    # A map from id(o) to o, for the objects pickled so far.
+    owned = {}
+    rv = []
+
+    for key, o in chunks:
+        f = io.BytesIO()
+        pickler = ChunkPickler(f, owned)
+        pickler.dump(o)
+
+        table = []
+
+        for ido, (index, oo) in pickler.memo.copy().items():
+            if ido not in owned and not isinstance(oo, UNSHARED_TYPES):
+                owned[ido] = oo
+                table.append((index, ido))
+
+        table.sort()
+        pickler.dump(table)
+
+        rv.append((key, f.getvalue()))
+
+    return rv
+
+
+def load_chunks(chunks: list[tuple[Any, bytes]]) -> list[Any]:
+    """
+    Loads a list of (key, data) pairs produced by dump_chunks, and returns
+    the list of objects.
+    """
+
+    objects = {}
+    rv = []
+
+    for _key, data in chunks:
+        unpickler = ChunkUnpickler(io.BytesIO(data), objects)
+        rv.append(unpickler.load())
+
+        memo = unpickler.memo.copy()
+
+        for index, ido in unpickler.load():
+            objects[ido] = memo[index]
+
+    return rv
+
+
 # The python AST module changed significantly between python 2 and 3. Old-style
 # screenlang support records raw python ast nodes into the rpyc data, making these
 # impossible to load normally. This dict contains mappings of nodes that need to be
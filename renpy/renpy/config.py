@@ -66,6 +66,23 @@ rollback_enabled = True
 # If the rollback is longer than this, we may trim it.
 rollback_length = 128
 
+# If true, the first change to a revertable dict, list, or set between
+# checkpoints records a delta that can undo it, rather than a copy.
+compact_rollback = False
+
+# If not None, the rollback entries between hard checkpoints are merged
+# into a single keyframe, except for the last this many hard checkpoints.
+rollback_keyframes = None
+
+# If true, the objects found reachable when rollback purges unreachable
+# objects are kept, and the next purge only walks the objects that have
+# been changed since, and those newly reachable from them.
+incremental_reachability = False
+
+# When incremental_reachability is true, every object is walked again
+# after this many incremental purges.
+full_reachability_interval = 20
+
 # If set to True, clicking while in rollback will keep the roll forward
 # buffer if the data has not changed.
 keep_rollback_data = False
@@ -1075,6 +1092,11 @@ debug_text_alignment = False
 # reported to log.txt.
 profile_init = 0.25
 
+# If true, the bytecode cache is saved as a memory-mapped startup snapshot
+# (cache/snapshot-*.rpys), which is searched and unmarshalled as code is
+# first run, rather than loaded all at once at startup.
+startup_snapshot = False
+
 # Should live2d interpolate movements?
 live2d_interpolate = False
 
@@ -1451,6 +1473,26 @@ save = True
 # Should the persistent file be updated?
 save_persistent = True
 
+# If true, saves pickle each rollback entry and store module as a separate
+# chunk, and only write the chunks that changed since they were last saved.
+incremental_saves = False
+
+# If true, on Linux, saves are pickled and written by a forked process, so
+# the game only pauses for the fork.
+background_saves = False
+
+# If true, the time each save blocks the game for is written to log.txt.
+profile_saves = False
+
+# If not None, a number of seconds. Persistent data changed in that time is
+# written together, from a background thread where possible, rather than
+# each time it changes. Quitting and renpy.save_persistent write at once.
+persistent_flush_interval = None
+
+# If true, each save location keeps an index of the json and screenshot of
+# its slots, so the file screens don't need to open every save file.
+save_slot_index = False
+
 # Should new drags be added to the top of a drag group.
 drag_group_add_top = True
 
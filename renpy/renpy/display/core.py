@@ -1891,6 +1891,7 @@ class Interface:
             renpy.loadsave.save("_reload-1", include_screenshot=False)
 
         renpy.persistent.update(True)
+        renpy.persistent.wait_for_write()
         renpy.persistent.save_on_quit_MP()
 
     def mobile_unlink(self):
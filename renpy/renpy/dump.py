@@ -123,6 +123,8 @@ def dump(error):
     # Labels.
     label = location["label"] = {}
 
+    renpy.game.script.materialize_all()
+
     for name, n in renpy.game.script.namemap.items():
         filename = n.filename
         line = n.linenumber
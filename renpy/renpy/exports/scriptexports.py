@@ -56,6 +56,10 @@ def get_all_labels():
         if isinstance(i.name, str):
             rv.append(i.name)
 
+    for name in renpy.game.script.deferred_names:
+        if isinstance(name, str):
+            rv.append(name)
+
     return renpy.revertable.RevertableSet(rv)
 
 
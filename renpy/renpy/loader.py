@@ -25,6 +25,8 @@ import renpy
 import os
 import os.path
 import sys
+import mmap
+import struct
 import threading
 import zlib
 import re
@@ -236,6 +238,138 @@ class RPAv1ArchiveHandler(object):
 archive_handlers.append(RPAv1ArchiveHandler)
 
 
+# The layout of an RPAM archive, all little-endian:
+#
+# * A header: the magic, the number of entries, the offset of the entry table, and the
+#   offset and length of the name block, padded to MAPPED_HEADER_SIZE bytes.
+# * The file data.
+# * The name block, the utf-8 encoded names one after another.
+# * The entry table, one fixed-size entry per file, sorted by the utf-8 encoded name:
+#   the offset and length of the name within the name block, and the offset and length
+#   of the data within the archive.
+MAPPED_MAGIC = b"RPA-M1.0"
+MAPPED_HEADER = struct.Struct("<8sQQQQ")
+MAPPED_HEADER_SIZE = 64
+MAPPED_ENTRY = struct.Struct("<IIQQ")
+
+
+class MappedArchiveIndex(object):
+    """
+    The index of an RPAM archive. Instead of being loaded into a dict, the sorted entry
+    table is binary-searched where it lies in a read-only memory map of the archive, and
+    files are read as memoryview slices of the same map, so nothing is copied and
+    nothing is allocated per entry until it is used.
+
+    This supports the parts of the dict interface the loader uses on an index.
+    """
+
+    def __init__(self, mapping):
+        self.mapping = mapping
+        self.view = memoryview(mapping)
+
+        magic, self.count, self.table_offset, self.names_offset, names_length = MAPPED_HEADER.unpack_from(mapping, 0)
+
+        if magic != MAPPED_MAGIC:
+            raise Exception("Not an RPAM archive.")
+
+        if self.table_offset + self.count * MAPPED_ENTRY.size > len(mapping) or self.names_offset + names_length > len(mapping):
+            raise Exception("The RPAM archive is truncated.")
+
+    def entry(self, i):
+        """
+        Returns (name, data offset, data length) for the i-th entry, with name as bytes.
+        """
+
+        name_offset, name_length, offset, length = MAPPED_ENTRY.unpack_from(self.mapping, self.table_offset + i * MAPPED_ENTRY.size)
+        start = self.names_offset + name_offset
+        return self.mapping[start:start + name_length], offset, length
+
+    def find(self, name):
+        """
+        Returns (offset, length) of the file `name`, or None if it's not in the archive.
+        """
+
+        if isinstance(name, str):
+            try:
+                name = name.encode("utf-8")
+            except UnicodeEncodeError:
+                return None
+
+        lo = 0
+        hi = self.count
+
+        while lo < hi:
+            mid = (lo + hi) // 2
+            entry_name, offset, length = self.entry(mid)
+
+            if entry_name < name:
+                lo = mid + 1
+            elif entry_name > name:
+                hi = mid
+            else:
+                return offset, length
+
+        return None
+
+    def data(self, name):
+        """
+        Returns a memoryview of the contents of `name`, or None if it's not in the archive.
+        """
+
+        t = self.find(name)
+
+        if t is None:
+            return None
+
+        offset, length = t
+        return self.view[offset:offset + length]
+
+    def __contains__(self, name):
+        return self.find(name) is not None
+
+    def __getitem__(self, name):
+        t = self.find(name)
+
+        if t is None:
+            raise KeyError(name)
+
+        return [t]
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self.entry(i)[0].decode("utf-8")
+
+    def keys(self):
+        return iter(self)
+
+
+class RPAMArchiveHandler(object):
+    """
+    Archive handler handling RPAM (memory-mapped) archives.
+    """
+
+    archive_extension = ".rpa"
+
+    @staticmethod
+    def get_supported_extensions():
+        return [".rpa"]
+
+    @staticmethod
+    def get_supported_headers():
+        return [MAPPED_MAGIC]
+
+    @staticmethod
+    def read_index(infile):
+        # The map stays valid after infile is closed.
+        return MappedArchiveIndex(mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+archive_handlers.append(RPAMArchiveHandler)
+
+
 def index_files():
     """
     Bootstraps the various file indexes.
@@ -576,6 +710,14 @@ def load_from_archive(name):
     Returns an open python file object of the given type from an archive file.
     """
     for afn, index in archives:
+        if isinstance(index, MappedArchiveIndex):
+            view = index.data(name)
+
+            if view is None:
+                continue
+
+            return RWopsIO.from_buffer(view, name=name)
+
         if not name in index:
             continue
 
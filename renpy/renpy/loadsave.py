@@ -28,17 +28,32 @@ import threading
 import shutil
 import os
 import time
+import hashlib
+import zlib
 
 import renpy
-from json import dumps as json_dumps
+from json import dumps as json_dumps, loads as json_loads
 
-from renpy.compat.pickle import dump, loads, dump_paths, find_bad_reduction
+from renpy.compat.pickle import dump, dumps, loads, dump_paths, find_bad_reduction, dump_chunks, load_chunks
 
 
 # This is used as a quick and dirty way of versioning savegame
 # files.
 savegame_suffix = renpy.savegame_suffix
 
+# The start of the log of an incremental save. The rest of the log is a
+# JSON list of [key, digest] pairs, giving the chunks the game state is
+# loaded from, in order. The chunks are stored in the chunks directory of the
+# save location, named by their digest. The manifest is JSON rather than a
+# pickle so that it can be read without trusting the save.
+CHUNKED_LOG_MAGIC = b"RENPY CHUNKED LOG 2\n"
+
+# The form of a chunk digest.
+chunk_digest_re = re.compile(r"^[0-9a-f]{64}$")
+
+# The number of bytes written to save files and chunks since startup.
+bytes_written = 0
+
 ################################################################################
 # Saving
 ################################################################################
@@ -81,21 +96,59 @@ class SaveRecord(object):
     information to a Ren'Py-standard format save file.
     """
 
-    def __init__(self, screenshot, extra_info, json, log):
+    def __init__(self, screenshot, extra_info, json, log, chunks=None):
         self.screenshot = screenshot
         self.extra_info = extra_info
         self.json = json
         self.log = log
 
+        # For an incremental save, a map from digest to the data of each chunk
+        # the log refers to.
+        self.chunks = chunks
+
         self.first_filename = None
 
+    def write_chunks(self, directory):
+        """
+        Writes the chunks that aren't in `directory` yet to it.
+        """
+
+        global bytes_written
+
+        if not self.chunks:
+            return
+
+        try:
+            os.makedirs(directory)
+        except Exception:
+            pass
+
+        for digest, data in self.chunks.items():
+            fn = os.path.join(directory, digest + ".chunk")
+
+            if os.path.exists(fn):
+                continue
+
+            data = zlib.compress(data, 3)
+
+            with open(fn + ".new", "wb") as f:
+                f.write(data)
+
+            safe_rename(fn + ".new", fn)
+
+            bytes_written += len(data)
+
     def write_file(self, filename):
         """
         This writes a standard-format savefile to `filename`.
         """
 
+        global bytes_written
+
         filename_new = filename + ".new"
 
+        self.write_chunks(os.path.join(os.path.dirname(filename), "chunks"))
+
         # For speed, copy the file after we've written it at least once.
         if self.first_filename is not None:
             try:
@@ -127,11 +180,89 @@ class SaveRecord(object):
             # The signatures.
             zf.writestr("signatures", renpy.savetoken.sign_data(self.log))
 
+        bytes_written += os.path.getsize(filename_new)
+
         safe_rename(filename_new, filename)
 
         self.first_filename = filename
 
 
+def dump_log(roots, log):
+    """
+    Pickles `roots` and `log` as an incremental save. Each rollback entry and
+    each store module is pickled as its own chunk, oldest entries first, so
+    that chunks that didn't change since the last save have the same digest.
+
+    Returns the log data, and a map from digest to chunk data.
+    """
+
+    chunks = []
+    keys = set()
+
+    for n, i in enumerate(log.log):
+        key = ("rollback", i.identifier)
+
+        # Entries from old saves may not have a unique identifier.
+        if (i.identifier is None) or (key in keys):
+            key = ("rollback", i.identifier, n)
+
+        keys.add(key)
+        chunks.append((key, i))
+
+    stores = {}
+
+    for k, v in roots.items():
+        stores.setdefault(k.rpartition(".")[0], {})[k] = v
+
+    for k, v in stores.items():
+        chunks.append((("store", k), v))
+
+    chunks.append((("log",), (roots, log)))
+
+    manifest = []
+    data = {}
+
+    for key, chunk in dump_chunks(chunks):
+        digest = hashlib.sha256(chunk).hexdigest()
+        manifest.append((key, digest))
+        data[digest] = chunk
+
+    return CHUNKED_LOG_MAGIC + json_dumps(manifest).encode("utf-8"), data
+
+
+def load_manifest(log_data):
+    """
+    Returns the list of (key, digest) pairs in the manifest of an incremental
+    save, given the log data after CHUNKED_LOG_MAGIC. This doesn't unpickle
+    anything, so it's safe to use on saves that haven't been checked.
+    """
+
+    rv = []
+
+    for key, digest in json_loads(log_data.decode("utf-8")):
+        if not chunk_digest_re.match(digest):
+            raise Exception("The save chunk {!r} has an invalid name.".format(digest))
+
+        rv.append((key, digest))
+
+    return rv
+
+
+def load_log(slotname, log_data):
+    """
+    Returns the (roots, log) pair pickled in `log_data`, the log of the save
+    in `slotname`, which may be an incremental save.
+    """
+
+    if not log_data.startswith(CHUNKED_LOG_MAGIC):
+        return loads(log_data)
+
+    manifest = load_manifest(log_data[len(CHUNKED_LOG_MAGIC) :])
+    chunks = [(key, location.load_chunk(slotname, digest)) for key, digest in manifest]
+
+    return load_chunks(chunks)[-1]
+
+
 def save(slotname, extra_info="", mutate_flag=False, include_screenshot=True, extra_json=None):
     """
     :doc: loadsave
@@ -165,6 +296,8 @@ def save(slotname, extra_info="", mutate_flag=False, include_screenshot=True, ex
     if not renpy.config.save:
         return
 
+    start = time.perf_counter()
+
     # Update persistent file, if needed. This is for the web and mobile
     # platforms, to make sure the persistent file is updated whenever the
     # game is saved. (But not auto-saved, for performance reasons.)
@@ -179,9 +312,55 @@ def save(slotname, extra_info="", mutate_flag=False, include_screenshot=True, ex
     if renpy.config.save_dump:
         dump_paths("save_dump.txt", **{"renpy.game.log": renpy.game.log}, **roots)
 
+    if can_save_in_background():
+        if include_screenshot:
+            screenshot = renpy.game.interface.get_screenshot()
+        else:
+            screenshot = None
+
+        json = save_json(extra_info, extra_json)
+
+        save_in_background(slotname, screenshot, extra_info, json, roots, mutate_flag)
+        record_save_time(slotname, time.perf_counter() - start)
+        return
+
+    log_data, chunks = dump_save(roots, mutate_flag)
+
+    if mutate_flag and renpy.revertable.mutate_flag:
+        raise SaveAbort()
+
+    if include_screenshot:
+        screenshot = renpy.game.interface.get_screenshot()
+    else:
+        screenshot = None
+
+    json = save_json(extra_info, extra_json)
+
+    sr = SaveRecord(screenshot, extra_info, json, log_data, chunks)
+    location.save(slotname, sr)
+
+    location.scan()
+    clear_slot(slotname)
+
+    record_save_time(slotname, time.perf_counter() - start)
+
+
+def dump_save(roots, mutate_flag):
+    """
+    Pickles `roots` and the game log, in the format given by
+    config.incremental_saves. Returns the log data and the chunks, or None
+    if the save isn't incremental.
+    """
+
     logf = io.BytesIO()
+    chunks = None
+
     try:
-        dump((roots, renpy.game.log), logf)
+        if renpy.config.incremental_saves:
+            log_data, chunks = dump_log(roots, renpy.game.log)
+            logf.write(log_data)
+        else:
+            dump((roots, renpy.game.log), logf)
     except Exception as e:
         if mutate_flag:
             raise
@@ -194,13 +373,13 @@ def save(slotname, extra_info="", mutate_flag=False, include_screenshot=True, ex
 
         raise
 
-    if mutate_flag and renpy.revertable.mutate_flag:
-        raise SaveAbort()
+    return logf.getvalue(), chunks
 
-    if include_screenshot:
-        screenshot = renpy.game.interface.get_screenshot()
-    else:
-        screenshot = None
+
+def save_json(extra_info, extra_json):
+    """
+    Returns the json metadata stored in a save, as a string.
+    """
 
     json = {
         "_save_name": extra_info,
@@ -216,15 +395,135 @@ def save(slotname, extra_info="", mutate_flag=False, include_screenshot=True, ex
     if extra_json is not None:
         json.update(extra_json)
 
-    json = json_dumps(json)
+    return json_dumps(json)
 
-    sr = SaveRecord(screenshot, extra_info, json, logf.getvalue())
-    location.save(slotname, sr)
 
-    location.scan()
+# The time the last call to save blocked the thread that called it, in
+# seconds.
+last_save_pause = None
+
+
+def record_save_time(slotname, pause):
+    """
+    Records that saving `slotname` blocked the calling thread for `pause`
+    seconds.
+    """
+
+    global last_save_pause
+
+    last_save_pause = pause
+
+    if renpy.config.profile_saves:
+        renpy.display.log.write("Saving %s blocked for %.1f ms.", slotname, pause * 1000)
+
+
+def can_save_in_background():
+    """
+    Returns true if saves can be pickled and written by a forked process.
+    """
+
+    return renpy.config.background_saves and renpy.linux and hasattr(os, "fork")
+
+
+# A map from slot name to the thread waiting for the process writing that
+# slot.
+background_saves = {}
+
+
+def save_in_background(slotname, screenshot, extra_info, json, roots, mutate_flag):
+    """
+    Forks a process that pickles `roots` and the game log, and writes them
+    to `slotname`. The forked process gets a copy-on-write snapshot of the
+    game, so this returns as soon as the fork does, and the game keeps
+    running while the save is written.
+    """
+
+    # Only one process writes at a time, so they don't write the same files.
+    wait_for_saves()
+
+    read_fd, write_fd = os.pipe()
+
+    # Hold the disk lock, so the child doesn't inherit it held by another
+    # thread.
+    with renpy.savelocation.disk_lock:
+        pid = os.fork()
+
+    if pid == 0:
+        status = 1
+
+        try:
+            os.close(read_fd)
+
+            log_data, chunks = dump_save(roots, mutate_flag)
+            location.write(slotname, SaveRecord(screenshot, extra_info, json, log_data, chunks))
+
+            status = 0
+
+        except BaseException:
+            import traceback
+
+            try:
+                os.write(write_fd, traceback.format_exc().encode("utf-8", "replace"))
+            except Exception:
+                pass
+
+        finally:
+            os._exit(status)
+
+    os.close(write_fd)
+
+    if mutate_flag and renpy.revertable.mutate_flag:
+        os.kill(pid, 9)
+        os.waitpid(pid, 0)
+        os.close(read_fd)
+        raise SaveAbort()
+
+    incremental = renpy.config.incremental_saves
+
+    t = threading.Thread(
+        target=finish_background_save, args=(slotname, pid, read_fd, incremental, time.perf_counter())
+    )
+    t.daemon = True
+    t.start()
+
+    background_saves[slotname] = t
+
+
+def finish_background_save(slotname, pid, read_fd, incremental, start):
+    """
+    Waits for the process forked by save_in_background to finish, then
+    rescans the save locations.
+    """
+
+    with os.fdopen(read_fd, "rb") as f:
+        error = f.read().decode("utf-8", "replace")
+
+    _, status = os.waitpid(pid, 0)
+
+    if status or error:
+        renpy.display.log.write("Saving %s in the background failed (status %d):\n%s", slotname, status, error)
+
+    elif renpy.config.profile_saves:
+        renpy.display.log.write(
+            "Saving %s finished in the background after %.1f ms.", slotname, (time.perf_counter() - start) * 1000
+        )
+
+    location.finish_save(slotname, incremental)
     clear_slot(slotname)
 
 
+def wait_for_saves():
+    """
+    Waits for the saves being written in the background to finish.
+    """
+
+    for slotname, t in list(background_saves.items()):
+        t.join()
+
+        if background_saves.get(slotname, None) is t:
+            del background_saves[slotname]
+
+
 # The thread used for autosave.
 autosave_thread = None
 
@@ -619,6 +918,8 @@ def load(filename):
     successfully, this function never returns.
     """
 
+    wait_for_saves()
+
     log_data, signature = location.load(filename)
 
     if not renpy.savetoken.check_load(log_data, signature):
@@ -633,7 +934,7 @@ def load(filename):
 
     renpy.exports.call_in_new_context("_before_load")
 
-    roots, log = loads(log_data)
+    roots, log = load_log(filename, log_data)
 
     log.unfreeze(roots, label="_after_load")
 
@@ -646,12 +947,15 @@ def get_save_data(filename):
     actually changing the game state. It returns a dictionary containing variable names relative to
     the default store, mapped to the value of those variables at the time of the save.
     """
+
+    wait_for_saves()
+
     log_data, signature = location.load(filename)
 
     if not renpy.savetoken.check_load(log_data, signature):
         return
 
-    roots, log = loads(log_data)
+    roots, log = load_log(filename, log_data)
 
     return {k[6:]: v for k, v in roots.items() if k.startswith("store.")}
 
@@ -663,6 +967,8 @@ def unlink_save(filename):
     Deletes the save slot with the given name (e.g. '3-2' for page 3, slot 2).
     """
 
+    wait_for_saves()
+
     location.unlink(filename)
     clear_slot(filename)
 
@@ -675,6 +981,8 @@ def rename_save(old, new):
     exist.)
     """
 
+    wait_for_saves()
+
     location.rename(old, new)
 
     clear_slot(old)
@@ -689,6 +997,8 @@ def copy_save(old, new):
     exist.)
     """
 
+    wait_for_saves()
+
     location.copy(old, new)
     clear_slot(new)
 
@@ -822,6 +1132,78 @@ def clear_cache():
     renpy.exports.restart_interaction()
 
 
+class SaveBenchmark(object):
+    """
+    Used by --save-benchmark. After every interaction, this saves the game
+    in the zip and the incremental formats, and records the bytes written
+    and the time taken by each. The totals are reported on quit, with the
+    saves made once the rollback log is full reported separately, as that's
+    the steady state of a long game.
+    """
+
+    def __init__(self):
+        # Maps from (incremental_saves, log_full) to the number of saves,
+        # bytes written, and seconds taken.
+        self.saves = {}
+        self.bytes = {}
+        self.seconds = {}
+
+    def interact(self):
+        if renpy.store.main_menu or renpy.game.after_rollback:
+            return
+
+        old_incremental_saves = renpy.config.incremental_saves
+        old_background_saves = renpy.config.background_saves
+
+        # Saves are written in this process, so the bytes they write are counted.
+        renpy.config.background_saves = False
+
+        log_full = len(renpy.game.log.log) >= renpy.config.rollback_length
+
+        try:
+            for incremental in (False, True):
+                renpy.config.incremental_saves = incremental
+
+                old_bytes_written = bytes_written
+                start = time.perf_counter()
+
+                save("_benchmark-" + ("incremental" if incremental else "zip"), include_screenshot=False)
+
+                key = (incremental, log_full)
+
+                self.seconds[key] = self.seconds.get(key, 0.0) + time.perf_counter() - start
+                self.bytes[key] = self.bytes.get(key, 0) + bytes_written - old_bytes_written
+                self.saves[key] = self.saves.get(key, 0) + 1
+
+        except Exception:
+            renpy.display.log.exception()
+
+        finally:
+            renpy.config.incremental_saves = old_incremental_saves
+            renpy.config.background_saves = old_background_saves
+
+    def report(self):
+        for key in sorted(self.saves):
+            incremental, log_full = key
+            saves = self.saves[key]
+
+            l = "{} saves in the {} format, {}: {:,d} bytes written, {:.1f} ms, {:.1f} ms per save.".format(
+                saves,
+                "incremental" if incremental else "zip",
+                "rollback log full" if log_full else "rollback log filling",
+                self.bytes[key],
+                self.seconds[key] * 1000,
+                self.seconds[key] * 1000 / saves,
+            )
+
+            print(l)
+            renpy.display.log.write("%s", l)
+
+
+# The SaveBenchmark used by --save-benchmark, if any.
+save_benchmark = None
+
+
 def init():
     """
     Scans all the metadata from the save slot cache.
@@ -831,6 +1213,16 @@ def init():
         if not i.startswith("_"):
             get_cache(i).preload()
 
+    global save_benchmark
+
+    if getattr(renpy.game.args, "save_benchmark", False):
+        if save_benchmark is None:
+            save_benchmark = SaveBenchmark()
+
+        if save_benchmark.interact not in renpy.config.interact_callbacks:
+            renpy.config.interact_callbacks.append(save_benchmark.interact)
+            renpy.config.quit_callbacks.append(save_benchmark.report)
+
 
 # Save locations are places where saves are saved to or loaded from, or a
 # collection of such locations. This is the default save location.
@@ -29,6 +29,7 @@ import sys
 import time
 import zipfile
 import gc
+import itertools
 import linecache
 import json
 
@@ -413,14 +414,19 @@ def main():
     log_clock("Loading script")
 
     if renpy.game.args.command == "load-test":  # type: ignore
-        start = time.time()
+        # Compare sequential loading with --load-threads, or 4 threads if it wasn't given.
+        for threads in sorted({0, renpy.game.args.load_threads or 4}):  # type: ignore
+            renpy.game.args.load_threads = threads  # type: ignore
 
-        for i in range(5):
-            print(i)
-            renpy.game.script = renpy.script.Script()
-            renpy.game.script.load_script()
+            start = time.time()
+
+            for i in range(5):
+                print(i)
+                renpy.game.script = renpy.script.Script()
+                renpy.game.script.load_script()
+
+            print("{} load threads: {:.3f}s".format(threads, time.time() - start))
 
-        print(time.time() - start)
         sys.exit(0)
 
     renpy.game.exception_info = "After loading the script."
@@ -439,7 +445,9 @@ def main():
     game.persistent = renpy.persistent.init()
     game.preferences = game.persistent._preferences
 
-    for i in renpy.game.script.translator.default_translates:
+    for i in itertools.chain(
+        renpy.game.script.translator.default_translates, renpy.game.script.translator.deferred_translates
+    ):
         if (i in renpy.game.persistent._seen_translates) or (
             renpy.astsupport.hash64(i) in renpy.game.persistent._seen_translates
         ):
@@ -614,6 +622,7 @@ def main():
 
                 # Give Ren'Py a couple of seconds to finish saving.
                 renpy.loadsave.autosave_not_running.wait(3.0)
+                renpy.loadsave.wait_for_saves()
 
                 # Run the at exit callbacks.
                 for cb in renpy.config.at_exit_callbacks:
@@ -626,6 +635,7 @@ def main():
             i()
 
         renpy.loader.auto_quit()
+        renpy.persistent.quit()
         renpy.savelocation.quit()
         renpy.translation.write_updated_strings()
 
@@ -313,6 +313,40 @@ def profile_memory_common(packages=["renpy", "store"], skip_constants=False):
     return walk_memory(roots)
 
 
+def deferred_script_usage():
+    """
+    Returns a (files, held, loaded) tuple, where `files` is the number of
+    script files that --lazy-script has kept unloaded, `held` is the number of
+    bytes their serialized statements take, and `loaded` is the number of
+    bytes the statements would take once loaded.
+    """
+
+    script = renpy.game.script
+
+    deferred = {id(i): i for i in script.deferred_names.values()}.values()
+
+    held = 0
+    loaded = 0
+
+    for i in deferred:
+        held += sys.getsizeof(i.data)
+        loaded += walk_memory([("stmts", script.load_deferred_stmts(i))])[0]["stmts"]
+
+    return len(deferred), held, loaded
+
+
+def write_deferred_script_usage():
+    files, held, loaded = deferred_script_usage()
+
+    if files:
+        write(
+            "{:13,d} Saved by keeping {} script files unloaded ({:,d} bytes when loaded, {:,d} bytes held).".format(
+                loaded - held, files, loaded, held
+            )
+        )
+        write("")
+
+
 def profile_memory(fraction=1.0, minimum=0, skip_constants=False):
     """
     :doc: memory
@@ -367,6 +401,8 @@ def profile_memory(fraction=1.0, minimum=0, skip_constants=False):
     write("{:13,d} Total object, surface, and texture memory usage (in bytes).".format(total))
     write("")
 
+    write_deferred_script_usage()
+
 
 old_usage = {}
 old_total = 0
@@ -422,6 +458,8 @@ def diff_memory(update=True, skip_constants=False):
     write("{:+14,d} {:13,d} {}".format(total - old_total, total, "Total memory usage (in bytes)."))
     write("")
 
+    write_deferred_script_usage()
+
     if update:
         old_usage = usage
         old_total = total
@@ -494,6 +532,35 @@ def profile_rollback():
 
     write("")
     write("{} Rollback objects exist.".format(len(log)))
+
+    keyframes = sum(1 for rb in log if rb.keyframe and rb.hard_checkpoint)
+    deltas = sum(1 for rb in log for _o, roll in rb.objects if isinstance(roll, renpy.revertable.RollbackDelta))
+    snapshots = sum(len(rb.objects) for rb in log)
+
+    write("{} of them are keyframes.".format(keyframes))
+    write("{} of {} object snapshots are deltas.".format(deltas, snapshots))
+
+    begin_times = renpy.game.log.begin_times
+
+    if begin_times:
+        write(
+            "Beginning a rollback took {:.3f} ms on average, and {:.3f} ms at most, over the last {}.".format(
+                1000 * sum(begin_times) / len(begin_times),
+                1000 * max(begin_times),
+                len(begin_times),
+            )
+        )
+
+    for incremental, kind in [(False, "full"), (True, "incremental")]:
+        times = [t for i, t in renpy.game.log.purge_times if i == incremental]
+
+        if times:
+            write(
+                "{} {} purges of unreachable objects took {:.3f} ms on average.".format(
+                    len(times), kind, 1000 * sum(times) / len(times)
+                )
+            )
+
     write("")
 
 
@@ -25,12 +25,142 @@ import os
 import copy
 import time
 import zlib
+import threading
 import weakref
 
 import renpy
 
 from renpy.compat.pickle import dumps, loads, find_bad_reduction
 
+
+class TrackedDict(dict):
+    """
+    A dict that counts the changes made to it in `version`, so find_changes
+    can tell if it changed without copying it. It pickles as a dict.
+    """
+
+    __slots__ = ["version"]
+
+    def __init__(self, *args, **kwargs):
+        dict.__init__(self, *args, **kwargs)
+        self.version = 0
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+    def __setitem__(self, key, value):
+        if (not dict.__contains__(self, key)) or (dict.__getitem__(self, key) is not value):
+            self.version += 1
+
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self.version += 1
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def clear(self):
+        self.version += 1
+        dict.clear(self)
+
+    def pop(self, key, *args):
+        if dict.__contains__(self, key):
+            self.version += 1
+
+        return dict.pop(self, key, *args)
+
+    def popitem(self):
+        self.version += 1
+        return dict.popitem(self)
+
+    def setdefault(self, key, default=None):
+        if not dict.__contains__(self, key):
+            self.version += 1
+
+        return dict.setdefault(self, key, default)
+
+    def update(self, *args, **kwargs):
+        self.version += 1
+        dict.update(self, *args, **kwargs)
+
+
+class TrackedSet(set):
+    """
+    A set that counts the changes made to it in `version`, like
+    TrackedDict. It pickles as a set.
+    """
+
+    __slots__ = ["version"]
+
+    def __init__(self, *args):
+        set.__init__(self, *args)
+        self.version = 0
+
+    def __reduce__(self):
+        return (set, (set(self),))
+
+    def add(self, item):
+        if item not in self:
+            self.version += 1
+
+        set.add(self, item)
+
+    def discard(self, item):
+        if item in self:
+            self.version += 1
+
+        set.discard(self, item)
+
+    def remove(self, item):
+        set.remove(self, item)
+        self.version += 1
+
+    def pop(self):
+        self.version += 1
+        return set.pop(self)
+
+    def mutator(method):  # type: ignore
+        def do_mutation(self, *args):
+            self.version += 1
+            return method(self, *args)
+
+        return do_mutation
+
+    __iand__ = mutator(set.__iand__)
+    __ior__ = mutator(set.__ior__)
+    __isub__ = mutator(set.__isub__)
+    __ixor__ = mutator(set.__ixor__)
+    clear = mutator(set.clear)
+    difference_update = mutator(set.difference_update)
+    intersection_update = mutator(set.intersection_update)
+    symmetric_difference_update = mutator(set.symmetric_difference_update)
+    update = mutator(set.update)
+
+    del mutator
+
+
+# The fields Ren'Py uses to track progress, which can grow large. These are
+# kept in a TrackedDict or TrackedSet.
+TRACKED_FIELDS = ["_seen_ever", "_seen_images", "_chosen", "_seen_audio", "_seen_translates"]
+
+
+def tracked(value):
+    """
+    Returns `value` as a TrackedDict or TrackedSet if it's a plain dict or
+    set, and unchanged otherwise.
+    """
+
+    if type(value) is dict:
+        return TrackedDict(value)
+    elif type(value) is set:
+        return TrackedSet(value)
+
+    return value
+
+
 # The class that's used to hold the persistent data.
 
 
@@ -130,6 +260,10 @@ class Persistent(object):
         if not self._seen_translates:
             self._seen_translates = set()
 
+        for name in TRACKED_FIELDS:
+            if name in self.__dict__:
+                self.__dict__[name] = tracked(self.__dict__[name])
+
         # A map from the name of a field to the time that field was last
         # changed at.
         if self._changed is None:
@@ -175,6 +309,42 @@ def safe_deepcopy(o, reduction_name: str):
     return rv
 
 
+class FieldVersion(object):
+    """
+    Stands in for the backup of a field holding a TrackedDict or TrackedSet,
+    which is compared by version rather than by value.
+    """
+
+    __slots__ = ["value", "version"]
+
+    def __init__(self, value):
+        self.value = value
+        self.version = value.version
+
+
+def backup_field(value, name):
+    """
+    Returns the backup of `value`, the value of the persistent field `name`.
+    """
+
+    if isinstance(value, (TrackedDict, TrackedSet)):
+        return FieldVersion(value)
+
+    return safe_deepcopy(value, name)
+
+
+def field_changed(old, new):
+    """
+    Returns True if `new`, the value of a persistent field, differs from
+    `old`, its backup.
+    """
+
+    if isinstance(old, FieldVersion):
+        return (old.value is not new) or (old.version != new.version)
+
+    return not (new == old)
+
+
 # A map from field names to a backup of the field names in the persistent
 # object.
 backup = {}
@@ -206,9 +376,9 @@ def find_changes():
         old = backup.get(f, None)
         new = pvars.get(f, None)
 
-        if not (new == old):
+        if field_changed(old, new):
             persistent._changed[f] = now  # type: ignore
-            backup[f] = safe_deepcopy(new, f)
+            backup[f] = backup_field(new, f)
 
             rv = True
 
@@ -277,7 +447,10 @@ def init():
 
     # Create the backup of the persistent data.
     for k, v in persistent.__dict__.items():
-        backup[k] = safe_deepcopy(v, k)
+        backup[k] = backup_field(v, k)
+
+    if getattr(renpy.game.args, "persistent_benchmark", False):
+        benchmark()
 
     return persistent
 
@@ -401,8 +574,12 @@ def merge(other):
 
         val = merge_func(old, new, pval)
 
+        # The merge functions return plain dicts and sets.
+        if f in TRACKED_FIELDS:
+            val = tracked(val)
+
         pvars[f] = val
-        backup[f] = safe_deepcopy(val, f)
+        backup[f] = backup_field(val, f)
         persistent._changed[f] = t  # type: ignore
 
 
@@ -416,6 +593,8 @@ def check_update():
     restarts the interaction.
     """
 
+    flush()
+
     for mtime, _data in renpy.loadsave.location.load_persistent():
         if mtime > persistent_mtime:
             break
@@ -457,12 +636,145 @@ def update(force_save=False):
 
     persistent_mtime = mtime
 
-    if need_save:
+    if force_save:
         save()
+    elif need_save:
+        request_save()
 
 
 should_save_persistent = True
 
+# The time a save was requested at, if it has been put off by
+# config.persistent_flush_interval, or None if no save is pending.
+save_requested = None
+
+# The time the persistent data was last saved.
+last_save = 0
+
+
+def request_save():
+    """
+    Saves the persistent data, or if config.persistent_flush_interval is
+    set, arranges for it to be saved with the other changes made in that
+    interval.
+    """
+
+    global save_requested
+
+    if renpy.config.persistent_flush_interval is None:
+        save()
+        return
+
+    if save_requested is None:
+        save_requested = time.time()
+
+    flush()
+
+
+def flush(force=False):
+    """
+    Saves the persistent data if a save has been put off, and either
+    `force` is true or config.persistent_flush_interval has passed since
+    the last save.
+    """
+
+    if save_requested is None:
+        return
+
+    interval = renpy.config.persistent_flush_interval or 0
+
+    if force or (time.time() - last_save >= interval):
+        save()
+
+
+def write(data):
+    """
+    Compresses, signs, and writes `data`, the pickled persistent data.
+    """
+
+    compressed = zlib.compress(data, 3)
+    compressed += renpy.savetoken.sign_data(data).encode("utf-8")
+    renpy.loadsave.location.save_persistent(compressed)
+
+
+# The thread that writes persistent data in the background, when
+# config.persistent_flush_interval is set.
+write_thread = None
+
+# The pickled persistent data waiting to be written by the write thread,
+# or None if there isn't any. Newer data replaces data that hasn't been
+# written yet.
+pending_write = None
+
+# True while the write thread is writing.
+writing = False
+
+# True if the write thread should quit once it's written pending_write.
+quit_write_thread = False
+
+write_condition = threading.Condition()
+
+
+def run_write_thread():
+    global pending_write
+    global writing
+
+    while True:
+        with write_condition:
+            while (pending_write is None) and (not quit_write_thread):
+                write_condition.wait()
+
+            data = pending_write
+            pending_write = None
+
+            if data is None:
+                return
+
+            writing = True
+
+        try:
+            write(data)
+        except Exception:
+            renpy.display.log.write("Writing persistent.")
+            renpy.display.log.exception()
+
+        with write_condition:
+            writing = False
+            write_condition.notify_all()
+
+
+def wait_for_write():
+    """
+    Waits for the write thread to finish writing any pending data.
+    """
+
+    with write_condition:
+        while (pending_write is not None) or writing:
+            write_condition.wait()
+
+
+def quit():
+    """
+    Writes any pending persistent data, and stops the write thread.
+    """
+
+    global write_thread
+    global quit_write_thread
+
+    flush(True)
+
+    if write_thread is None:
+        return
+
+    with write_condition:
+        quit_write_thread = True
+        write_condition.notify_all()
+
+    write_thread.join()
+
+    write_thread = None
+    quit_write_thread = False
+
 
 def save():
     """
@@ -470,6 +782,12 @@ def save():
     """
 
     global old_persistent_data
+    global save_requested
+    global last_save
+    global write_thread
+    global pending_write
+
+    save_requested = None
 
     if not renpy.config.save_persistent:
         return
@@ -477,11 +795,19 @@ def save():
     if not should_save_persistent:
         return
 
+    last_save = time.time()
+
     try:
         data = dumps(renpy.game.persistent, bad_reduction_name="persistent")
-        compressed = zlib.compress(data, 3)
-        compressed += renpy.savetoken.sign_data(data).encode("utf-8")
-        renpy.loadsave.location.save_persistent(compressed)
+
+        if (renpy.config.persistent_flush_interval is None) or renpy.emscripten:
+            # A write in progress would replace this one once it finishes.
+            if write_thread is not None:
+                wait_for_write()
+
+            write(data)
+            data = None
+
     except Exception:
         if renpy.config.developer:
             raise
@@ -490,6 +816,15 @@ def save():
         renpy.display.log.exception()
         return
 
+    if data is not None:
+        if write_thread is None:
+            write_thread = threading.Thread(target=run_write_thread, name="persistent writer", daemon=True)
+            write_thread.start()
+
+        with write_condition:
+            pending_write = data
+            write_condition.notify_all()
+
     global persistent_mtime
 
     # Prevent updates just after save
@@ -497,6 +832,58 @@ def save():
         persistent_mtime = max(persistent_mtime, mtime)
 
 
+def benchmark(entries=100000, lines=20):
+    """
+    Used by --persistent-benchmark. Simulates `lines` new lines being seen
+    with `entries` entries already in _seen_ever and _seen_translates, and
+    reports the time taken to find the changes by copying and comparing the
+    fields and by their versions, and the time taken by each write of the
+    persistent data.
+    """
+
+    def run(seen_ever, seen_translates, backup_value, changed):
+        fields = {"_seen_ever": seen_ever, "_seen_translates": seen_translates}
+        backups = {k: backup_value(v, k) for k, v in fields.items()}
+
+        start = time.perf_counter()
+
+        for i in range(lines):
+            seen_ever["benchmark-line-{}".format(i)] = True
+            seen_translates.add("benchmark-line-{}".format(i))
+
+            for k, v in fields.items():
+                if changed(backups[k], v):
+                    backups[k] = backup_value(v, k)
+
+        return time.perf_counter() - start
+
+    seen_ever = {"benchmark-{}".format(i): True for i in range(entries)}
+    seen_translates = {"benchmark-{}".format(i) for i in range(entries)}
+
+    copied = run(dict(seen_ever), set(seen_translates), safe_deepcopy, lambda old, new: not (new == old))
+    versioned = run(TrackedDict(seen_ever), TrackedSet(seen_translates), backup_field, field_changed)
+
+    start = time.perf_counter()
+    data = dumps({"_seen_ever": seen_ever, "_seen_translates": seen_translates})
+    zlib.compress(data, 3)
+    write_time = time.perf_counter() - start
+
+    report = [
+        "Persistent benchmark, {:,d} entries, {} lines:".format(entries, lines),
+        "Finding changes by copying: {:.1f} ms, {:.3f} ms per line.".format(
+            copied * 1000, copied * 1000 / lines
+        ),
+        "Finding changes by version: {:.1f} ms, {:.3f} ms per line.".format(
+            versioned * 1000, versioned * 1000 / lines
+        ),
+        "Each write pickles and compresses {:,d} bytes in {:.1f} ms.".format(len(data), write_time * 1000),
+    ]
+
+    for l in report:
+        print(l)
+        renpy.display.log.write("%s", l)
+
+
 ################################################################################
 # MultiPersistent
 ################################################################################
@@ -505,6 +892,11 @@ def save():
 MP_instances = weakref.WeakSet()
 
 
+# A map from the filename of a MultiPersistent to the data last written
+# to it, so unchanged data isn't written again.
+MP_written = {}
+
+
 def save_MP():
     """
     Called `save` for each `_MultiPersistent` instance.
@@ -563,8 +955,12 @@ class _MultiPersistent(object):
                 renpy.display.log.exception()
                 return
 
+        fn = self._filename
+
+        if MP_written.get(fn, None) == data:
+            return
+
         try:
-            fn = self._filename
             with open(fn + ".new", "wb") as f:
                 f.write(data)
         except OSError as e:
@@ -577,6 +973,8 @@ class _MultiPersistent(object):
                 os.unlink(fn)
                 os.rename(fn + ".new", fn)
 
+            MP_written[fn] = data
+
 
 def MultiPersistent(name, save_on_quit=False):
     """
@@ -866,6 +866,67 @@ py_compile_cache = {}
 old_py_compile_cache = {}
 
 
+class LazyBytecode(object):
+    """
+    Stands in for the bytecode of a PyCode that was found in the bytecode
+    cache, so that the code is only unmarshalled when it is first run. When
+    that happens, the code object replaces this in the PyCode.
+    """
+
+    __slots__ = ("pycode", "key", "data")
+
+    def __init__(self, pycode, key, data):
+        self.pycode = pycode
+        self.key = key
+        self.data = data
+
+    def load(self):
+        rv = py_compile_cache.get(self.key, None)
+
+        if rv is None:
+            script = renpy.game.script
+            script.bytecode_pending.pop(self.key, None)
+
+            try:
+                rv = marshal.loads(self.data)
+                script.bytecode_newcache[self.key] = self.data
+
+            except Exception:
+                # The cache entry is bad, so compile the code again, and
+                # replace the entry with the result.
+                pycode = self.pycode
+
+                rv = py_compile(
+                    pycode.source,
+                    pycode.mode,
+                    filename=pycode.filename,
+                    lineno=pycode.linenumber,
+                    py=pycode.py,
+                    hashcode=pycode.hashcode,
+                    column=pycode.col_offset,
+                    cache=False,
+                )
+
+                script.bytecode_newcache[self.key] = marshal.dumps(rv)
+                script.bytecode_dirty = True
+
+            py_compile_cache[self.key] = rv
+
+        self.pycode.bytecode = rv
+        return rv
+
+
+def resolve_bytecode(bytecode):
+    """
+    Returns `bytecode`, unmarshalling it first if it is a LazyBytecode.
+    """
+
+    if bytecode.__class__ is LazyBytecode:
+        return bytecode.load()
+
+    return bytecode
+
+
 class LocationFixer:
     """
     This class is responsible for fixing the locations of nodes in the AST. First,
@@ -1050,7 +1111,7 @@ def is_immutable_value(v):
     return False
 
 
-def py_compile(source, mode, filename="<none>", lineno=1, ast_node=False, cache=True, py=None, hashcode=None, column=0):
+def py_compile(source, mode, filename="<none>", lineno=1, ast_node=False, cache=True, py=None, hashcode=None, column=0, lazy=None):
     """
     Compiles the given source code using the supplied codegenerator.
     Lists, List Comprehensions, and Dictionaries are wrapped when
@@ -1077,6 +1138,11 @@ def py_compile(source, mode, filename="<none>", lineno=1, ast_node=False, cache=
 
     `column`
         A column offset to add to the column numbers of the source.
+
+    `lazy`
+        If given, the PyCode being compiled. If its bytecode is in the
+        bytecode cache, a LazyBytecode is returned rather than unmarshalling
+        it now.
     """
     global compile_warnings
 
@@ -1137,10 +1203,16 @@ def py_compile(source, mode, filename="<none>", lineno=1, ast_node=False, cache=
 
         if bytecode is not None:
             try:
-                rv = marshal.loads(bytecode)
-                py_compile_cache[key] = rv
-
-                renpy.game.script.bytecode_newcache[key] = bytecode
+                if lazy is not None:
+                    # This isn't known to load until it's first run, so it only
+                    # goes in the new cache then. (Until then, save_bytecode
+                    # keeps the entry as it was in the old cache.)
+                    rv = LazyBytecode(lazy, key, bytecode)
+                    renpy.game.script.bytecode_pending[key] = bytecode
+                else:
+                    rv = marshal.loads(bytecode)
+                    py_compile_cache[key] = rv
+                    renpy.game.script.bytecode_newcache[key] = bytecode
 
                 if warnings_key in renpy.game.script.bytecode_oldcache:
                     renpy.game.script.bytecode_newcache[warnings_key] = renpy.game.script.bytecode_oldcache[
@@ -1261,6 +1333,9 @@ def py_compile(source, mode, filename="<none>", lineno=1, ast_node=False, cache=
 
 
 def py_exec_bytecode(bytecode, hide=False, globals=None, locals=None, store="store"):
+    if bytecode.__class__ is LazyBytecode:
+        bytecode = bytecode.load()
+
     if hide:
         locals = {}
 
@@ -1286,6 +1361,9 @@ def py_exec(source, hide=False, store=None):
 
 
 def py_eval_bytecode(bytecode, globals=None, locals=None):
+    if bytecode.__class__ is LazyBytecode:
+        bytecode = bytecode.load()
+
     if bytecode.__class__ is tuple:
         return bytecode[1]
 
@@ -83,6 +83,255 @@ def mutator(method):
     return do_mutation
 
 
+def delta(obj):
+    """
+    Called before the revertable container `obj` is mutated. Records the
+    rollback information for `obj` if this is its first mutation since the
+    last checkpoint. Returns the RollbackDelta that the mutation should be
+    recorded in, or None if it doesn't need to be recorded.
+    """
+
+    global mutate_flag
+
+    mutated = renpy.game.log.mutated
+
+    v = mutated.get(id(obj), False)
+
+    if v is None:
+        return None
+
+    if v is False:
+        if renpy.config.compact_rollback:
+            clean = obj._delta()
+        else:
+            clean = obj._clean()
+
+        mutated[id(obj)] = (weakref.ref(obj), clean)
+        mutate_flag = True
+
+    else:
+        clean = v[1]
+
+    if isinstance(clean, RollbackDelta):
+        return clean
+
+    return None
+
+
+def full_mutator(method):
+    """
+    Like mutator, but for the methods of a container with a delta that
+    can't be recorded in the delta. Replaces the delta with a full copy
+    of the container, as it was before the first mutation.
+    """
+
+    @functools.wraps(method)
+    def do_mutation(self, *args, **kwargs):
+        d = delta(self)
+
+        if d is not None:
+            renpy.game.log.mutated[id(self)] = (weakref.ref(self), d.clean(self))
+
+        return method(self, *args, **kwargs)
+
+    return do_mutation
+
+
+def merge_rollback(older, newer):
+    """
+    Given the rollback information recorded for an object in two
+    consecutive rollback entries, returns information that rolls the object
+    back past both of them. Raises ValueError if that can't be done.
+    """
+
+    if older is None:
+        return newer
+
+    if newer is None:
+        return older
+
+    if isinstance(older, RollbackDelta):
+        return older.merge(newer)
+
+    if isinstance(older, CompressedList):
+        raise ValueError("A compressed list can't be merged.")
+
+    if isinstance(older, tuple) and any(isinstance(i, (CompressedList, RollbackDelta)) for i in older):
+        raise ValueError("A compressed list can't be merged.")
+
+    # Anything else is a copy of the object, which rolls it back to the
+    # start of the older entry no matter what happened afterwards.
+    return older
+
+
+class RollbackDelta(object):
+    """
+    The base class for the rollback information recorded for a container
+    when config.compact_rollback is true. Rather than being a copy of the
+    container taken before its first mutation, a delta records what is
+    needed to undo the mutations, sharing everything else with the
+    container.
+    """
+
+    def clean(self, obj):
+        """
+        Returns the full copy of `obj` that _clean would have returned
+        before the first mutation.
+        """
+
+        raise NotImplementedError()
+
+    def rollback(self, obj):
+        """
+        Undoes the mutations of `obj`.
+        """
+
+        raise NotImplementedError()
+
+    def merge(self, newer):
+        """
+        Merges this delta with `newer`, the rollback information for the
+        same object in the next rollback entry. See merge_rollback.
+        """
+
+        raise ValueError("{} can't be merged.".format(type(self).__name__))
+
+
+class DictDelta(RollbackDelta):
+    """
+    The delta of a dict that has only had keys set. Deletions replace
+    the delta with a copy, so the keys keep their order on rollback.
+    """
+
+    def __init__(self):
+        # A map from key to the value it had before it was first set.
+        self.old = {}
+
+        # The set of keys that were added.
+        self.added = set()
+
+    def record(self, d, key):
+        if (key in self.old) or (key in self.added):
+            return
+
+        if dict.__contains__(d, key):
+            self.old[key] = dict.__getitem__(d, key)
+        else:
+            self.added.add(key)
+
+    def clean(self, obj):
+        old = self.old
+        added = self.added
+
+        return [(k, old[k] if k in old else v) for k, v in dict.items(obj) if k not in added]
+
+    def rollback(self, obj):
+        for k in self.added:
+            if dict.__contains__(obj, k):
+                del obj[k]
+
+        for k, v in self.old.items():
+            obj[k] = v
+
+    def merge(self, newer):
+        if isinstance(newer, DictDelta):
+            rv = DictDelta()
+            rv.old = dict(newer.old)
+            rv.added = set(newer.added)
+
+            for k in self.added:
+                rv.old.pop(k, None)
+                rv.added.add(k)
+
+            for k, v in self.old.items():
+                rv.added.discard(k)
+                rv.old[k] = v
+
+            return rv
+
+        if isinstance(newer, list):
+            d = dict(newer)
+
+            for k in self.added:
+                d.pop(k, None)
+
+            d.update(self.old)
+
+            return list(d.items())
+
+        return super(DictDelta, self).merge(newer)
+
+
+class ListDelta(RollbackDelta):
+    """
+    The delta of a list that has only been appended to, which is rolled
+    back by truncating it.
+    """
+
+    def __init__(self, length):
+        # The length of the list before it was appended to.
+        self.length = length
+
+    def clean(self, obj):
+        return obj[: self.length]
+
+    def rollback(self, obj):
+        del obj[self.length :]
+
+    def merge(self, newer):
+        if isinstance(newer, ListDelta):
+            return ListDelta(self.length)
+
+        if isinstance(newer, list):
+            return newer[: self.length]
+
+        return super(ListDelta, self).merge(newer)
+
+
+class SetDelta(RollbackDelta):
+    """
+    The delta of a set that has had single items added and removed.
+    """
+
+    def __init__(self):
+        # The items that have been added to the set.
+        self.added = set()
+
+        # The items that have been removed from the set.
+        self.removed = set()
+
+    def record_add(self, item):
+        if item in self.removed:
+            self.removed.discard(item)
+        else:
+            self.added.add(item)
+
+    def record_remove(self, item):
+        if item in self.added:
+            self.added.discard(item)
+        else:
+            self.removed.add(item)
+
+    def clean(self, obj):
+        return list((set(obj) - self.added) | self.removed)
+
+    def rollback(self, obj):
+        set.difference_update(obj, self.added)
+        set.update(obj, self.removed)
+
+    def merge(self, newer):
+        if isinstance(newer, SetDelta):
+            rv = SetDelta()
+            rv.added = (self.added - newer.removed) | (newer.added - self.removed)
+            rv.removed = (self.removed - newer.added) | (newer.removed - self.added)
+            return rv
+
+        if isinstance(newer, list):
+            return list((set(newer) - self.added) | self.removed)
+
+        return super(SetDelta, self).merge(newer)
+
+
 class CompressedList(object):
     """
     Compresses the changes in a queue-like list. What this does is to try
@@ -159,17 +408,28 @@ class RevertableList(list):
 
         list.__init__(self, *args)
 
-    __delitem__ = mutator(list.__delitem__)
-    __setitem__ = mutator(list.__setitem__)
-    __iadd__ = mutator(list.__iadd__)
-    __imul__ = mutator(list.__imul__)
-    append = mutator(list.append)
-    extend = mutator(list.extend)
-    insert = mutator(list.insert)
-    pop = mutator(list.pop)
-    remove = mutator(list.remove)
-    reverse = mutator(list.reverse)
-    sort = mutator(list.sort)
+    __delitem__ = full_mutator(list.__delitem__)
+    __setitem__ = full_mutator(list.__setitem__)
+    __imul__ = full_mutator(list.__imul__)
+    insert = full_mutator(list.insert)
+    pop = full_mutator(list.pop)
+    remove = full_mutator(list.remove)
+    reverse = full_mutator(list.reverse)
+    sort = full_mutator(list.sort)
+
+    # These only add to the end of the list, so a ListDelta can undo them.
+
+    def __iadd__(self, other):
+        delta(self)
+        return list.__iadd__(self, other)
+
+    def append(self, item):
+        delta(self)
+        list.append(self, item)
+
+    def extend(self, iterable):
+        delta(self)
+        list.extend(self, iterable)
 
     def wrapper(method):  # type: ignore
         @functools.wraps(method)
@@ -208,12 +468,23 @@ class RevertableList(list):
 
         return self[:]
 
+    def _delta(self):
+        """
+        Returns the delta used to record mutations when config.compact_rollback
+        is true.
+        """
+
+        return ListDelta(len(self))
+
     def _compress(self, clean):
         """
         Takes a clean copy of this object, compresses it, and returns compressed
         information that can be passed to rollback.
         """
 
+        if isinstance(clean, RollbackDelta):
+            return clean
+
         if not self or not clean:
             return clean
 
@@ -233,7 +504,9 @@ class RevertableList(list):
         recognize and deal with old data.
         """
 
-        if isinstance(compressed, CompressedList):
+        if isinstance(compressed, RollbackDelta):
+            compressed.rollback(self)
+        elif isinstance(compressed, CompressedList):
             self[:] = compressed.decompress(self)
         else:
             self[:] = compressed
@@ -256,13 +529,43 @@ class RevertableDict(dict):
 
         dict.__init__(self, *args, **kwargs)
 
-    __delitem__ = mutator(dict.__delitem__)
-    __setitem__ = mutator(dict.__setitem__)
-    clear = mutator(dict.clear)
-    pop = mutator(dict.pop)
-    popitem = mutator(dict.popitem)
-    setdefault = mutator(dict.setdefault)
-    update = mutator(dict.update)
+    __delitem__ = full_mutator(dict.__delitem__)
+    clear = full_mutator(dict.clear)
+    pop = full_mutator(dict.pop)
+    popitem = full_mutator(dict.popitem)
+
+    # These only set keys, so a DictDelta can undo them.
+
+    def __setitem__(self, key, value):
+        d = delta(self)
+
+        if d is not None:
+            d.record(self, key)
+
+        dict.__setitem__(self, key, value)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            d = delta(self)
+
+            if d is not None:
+                d.record(self, key)
+
+        return dict.setdefault(self, key, default)
+
+    def update(self, *args, **kwargs):
+        d = delta(self)
+
+        if d is None:
+            dict.update(self, *args, **kwargs)
+            return
+
+        other = dict(*args, **kwargs)
+
+        for k in other:
+            d.record(self, k)
+
+        dict.update(self, other)
 
     itervalues = dict.values
     iterkeys = dict.keys
@@ -298,10 +601,17 @@ class RevertableDict(dict):
     def _clean(self):
         return list(self.items())
 
+    def _delta(self):
+        return DictDelta()
+
     def _compress(self, clean):
         return clean
 
     def _rollback(self, compressed):
+        if isinstance(compressed, RollbackDelta):
+            compressed.rollback(self)
+            return
+
         self.clear()
 
         for k, v in compressed:
@@ -359,20 +669,52 @@ class RevertableSet(set):
 
         set.__init__(self, *args)
 
-    __iand__ = mutator(set.__iand__)
-    __ior__ = mutator(set.__ior__)
-    __isub__ = mutator(set.__isub__)
-    __ixor__ = mutator(set.__ixor__)
-    add = mutator(set.add)
-    clear = mutator(set.clear)
-    difference_update = mutator(set.difference_update)
-    discard = mutator(set.discard)
-    intersection_update = mutator(set.intersection_update)
-    pop = mutator(set.pop)
-    remove = mutator(set.remove)
-    symmetric_difference_update = mutator(set.symmetric_difference_update)
-    union_update = mutator(set.update)
-    update = mutator(set.update)
+    __iand__ = full_mutator(set.__iand__)
+    __ior__ = full_mutator(set.__ior__)
+    __isub__ = full_mutator(set.__isub__)
+    __ixor__ = full_mutator(set.__ixor__)
+    clear = full_mutator(set.clear)
+    difference_update = full_mutator(set.difference_update)
+    intersection_update = full_mutator(set.intersection_update)
+    symmetric_difference_update = full_mutator(set.symmetric_difference_update)
+    union_update = full_mutator(set.update)
+    update = full_mutator(set.update)
+
+    # These add or remove a single item, so a SetDelta can undo them.
+
+    def add(self, item):
+        d = delta(self)
+
+        if (d is not None) and (item not in self):
+            d.record_add(item)
+
+        set.add(self, item)
+
+    def discard(self, item):
+        d = delta(self)
+
+        if (d is not None) and (item in self):
+            d.record_remove(item)
+
+        set.discard(self, item)
+
+    def remove(self, item):
+        d = delta(self)
+
+        if (d is not None) and (item in self):
+            d.record_remove(item)
+
+        set.remove(self, item)
+
+    def pop(self):
+        d = delta(self)
+
+        rv = set.pop(self)
+
+        if d is not None:
+            d.record_remove(rv)
+
+        return rv
 
     def wrapper(method):  # type: ignore
         @functools.wraps(method)
@@ -400,10 +742,17 @@ class RevertableSet(set):
     def _clean(self):
         return list(self)
 
+    def _delta(self):
+        return SetDelta()
+
     def _compress(self, clean):
         return clean
 
     def _rollback(self, compressed):
+        if isinstance(compressed, RollbackDelta):
+            compressed.rollback(self)
+            return
+
         set.clear(self)
         set.update(self, compressed)
 
@@ -485,6 +834,9 @@ class MultiRevertable(object):
     def _clean(self):
         return tuple(i._clean(self) for i in self._rollback_types())
 
+    def _delta(self):
+        return self._clean()
+
     def _compress(self, clean):
         return tuple(i._compress(self, c) for i, c in zip(self._rollback_types(), clean))
 
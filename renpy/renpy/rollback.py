@@ -28,6 +28,7 @@ from renpy.compat import PY2, basestring, bchr, bord, chr, open, pystr, range, r
 
 from typing import Optional, Any
 
+import copy
 import marshal
 import random
 import weakref
@@ -267,6 +268,14 @@ class Rollback(renpy.object.Object):
     checkpointing_suspended = False
     fixed = False
 
+    # True if this is a keyframe, made by merging the entries between two
+    # hard checkpoints, or if it has been checked and can't be merged.
+    keyframe = False
+
+    # If not None, the name of the node the forward data was logged at,
+    # when that isn't the node in the context.
+    forward_name = None
+
     def __init__(self):
         super(Rollback, self).__init__()
 
@@ -346,6 +355,22 @@ class Rollback(renpy.object.Object):
 
         self.purged = True
 
+        new_objects, _complete = self.find_objects(reachable, wait)
+
+        del self.objects[:]
+        self.objects.extend(new_objects)
+
+        return True
+
+    def find_objects(self, reachable, wait):
+        """
+        Adds the objects reachable from this rollback to `reachable`, and
+        finds the object update information that should be kept. Returns
+        a (new_objects, complete) tuple, where new_objects is the list that
+        should replace self.objects, and complete is True if every object
+        in self.objects was found to be reachable.
+        """
+
         # Add objects reachable from the stores. (Objects that might be
         # unreachable at the moment.)
         for changes in self.stores.values():
@@ -391,10 +416,9 @@ class Rollback(renpy.object.Object):
                 new_objects.append((o, rb))
                 reached(rb, reachable, wait)
 
-        del self.objects[:]
-        self.objects.extend(new_objects)
+        complete = all(id(o) in reachable for o, _rb in self.objects)
 
-        return True
+        return new_objects, complete
 
     def rollback(self):
         """
@@ -444,6 +468,45 @@ class Rollback(renpy.object.Object):
 
         self.rollback_control()
 
+    def merge(self, newer):
+        """
+        Merges `newer`, the next Rollback in the log, into this one, so that
+        rolling this back has the same effect as rolling back both. Raises
+        ValueError if this can't be done, in which case this is unchanged.
+        """
+
+        objects = {id(o): (o, rb) for o, rb in self.objects}
+
+        for o, rb in newer.objects:
+            id_o = id(o)
+
+            if id_o in objects:
+                objects[id_o] = (o, renpy.revertable.merge_rollback(objects[id_o][1], rb))
+            else:
+                objects[id_o] = (o, rb)
+
+        self.objects = list(objects.values())
+
+        for name, changes in newer.stores.items():
+            merged = dict(changes)
+            merged.update(self.stores.get(name, {}))
+            self.stores[name] = merged
+
+        for name, changes in newer.delta_ebc.items():
+            self.delta_ebc[name] = self.delta_ebc.get(name, set()) | changes
+
+        self.random = self.random + newer.random
+
+        if newer.forward is not None:
+            self.forward = newer.forward
+            self.fixed = newer.fixed
+            self.forward_name = newer.forward_name or newer.context.current
+
+        self.checkpoint = self.checkpoint or newer.checkpoint
+        self.hard_checkpoint = newer.hard_checkpoint
+        self.not_greedy = newer.not_greedy
+        self.purged = self.purged and newer.purged
+
     def rollback_control(self):
         """
         This rolls back only the control information, while leaving
@@ -474,7 +537,18 @@ class RollbackLog(renpy.object.Object):
 
     __version__ = 7
 
-    nosave = ["old_store", "mutated", "identifier_cache"]
+    nosave = [
+        "old_store",
+        "mutated",
+        "identifier_cache",
+        "begin_times",
+        "reachable",
+        "dirty",
+        "incremental_purges",
+        "purge_times",
+    ]
+    reachable = None
+    incremental_purges = 0
     identifier_cache = None
     force_checkpoint = False
 
@@ -508,9 +582,34 @@ class RollbackLog(renpy.object.Object):
         # statement?
         self.force_checkpoint = False
 
+        # The times begin took to complete the last rollback, most recent
+        # last, used by memory.profile_rollback.
+        self.begin_times = []
+
+        # When config.incremental_reachability is true, the map from id(obj)
+        # to obj found by the last purge_unreachable, or None if the next
+        # purge has to walk everything.
+        self.reachable = None
+
+        # A map from id(obj) to a weakref to obj, for the objects mutated
+        # since the last purge_unreachable.
+        self.dirty = {}
+
+        # The number of purges since everything was last walked.
+        self.incremental_purges = 0
+
+        # A list of (incremental, seconds) tuples giving the time the last
+        # purges took, used by memory.profile_rollback.
+        self.purge_times = []
+
     def after_setstate(self):
         self.mutated = {}
         self.rolled_forward = False
+        self.begin_times = []
+        self.reachable = None
+        self.dirty = {}
+        self.incremental_purges = 0
+        self.purge_times = []
 
     def after_upgrade(self, version):
         if version < 2:
@@ -576,6 +675,8 @@ class RollbackLog(renpy.object.Object):
 
         self.did_interaction = False
 
+        start = time.perf_counter()
+
         if self.current is not None:
             self.complete(True)
         else:
@@ -589,11 +690,18 @@ class RollbackLog(renpy.object.Object):
                 else:
                     self.rollback_limit -= 1
 
+        if renpy.config.rollback_keyframes is not None:
+            self.compact(renpy.config.rollback_keyframes)
+
+        self.begin_times.append(time.perf_counter() - start)
+        del self.begin_times[: -renpy.config.rollback_length]
+
         self.current = Rollback()
         self.current.retain_after_load = self.retain_after_load_flag
 
         self.log.append(self.current)
 
+        self.record_dirty()
         self.mutated.clear()
 
         # Flag a mutation as having happened. This is used by the
@@ -602,6 +710,90 @@ class RollbackLog(renpy.object.Object):
 
         self.rolled_forward = False
 
+    def compact(self, keep):
+        """
+        Merges the Rollbacks between each pair of hard checkpoints into a
+        single keyframe, except in the last `keep` hard checkpoints. Rolling
+        back past a keyframe has the same effect as greedily rolling back
+        past the hard checkpoint it ends with, but it's no longer possible
+        to stop between the Rollbacks that were merged into it.
+        """
+
+        # Find the end of the part of the log that is compacted.
+        hard = 0
+        end = 0
+
+        for i in range(len(self.log) - 1, -1, -1):
+            if self.log[i].hard_checkpoint:
+                hard += 1
+
+                if hard > keep:
+                    end = i + 1
+                    break
+
+        if not end or self.log[end - 1].keyframe:
+            return
+
+        log = []
+        segment = []
+
+        for rb in self.log[:end]:
+            segment.append(rb)
+
+            if not rb.hard_checkpoint:
+                continue
+
+            if not rb.keyframe:
+                segment = self.merge_segment(segment)
+
+            log.extend(segment)
+            segment = []
+
+        self.log[:end] = log
+        self.identifier_cache = None
+
+    def merge_segment(self, segment):
+        """
+        Tries to merge `segment`, a list of Rollbacks ending with a hard
+        checkpoint, into a keyframe. Returns a list containing the keyframe,
+        or the segment unchanged if it can't be merged.
+        """
+
+        for rb in segment:
+            rb.keyframe = True
+
+        if len(segment) == 1:
+            return segment
+
+        # Greedy rollback has to stop at the start of the segment, and there
+        # has to be a place to store the forward data.
+        for rb in segment:
+            if rb.retain_after_load:
+                return segment
+
+            if not renpy.game.script.has_label(rb.context.current):
+                return segment
+
+        for rb in segment[:-1]:
+            if rb.not_greedy:
+                return segment
+
+        if len([rb for rb in segment if rb.forward is not None]) > 1:
+            return segment
+
+        # Merge into a copy, so a failure leaves the segment unchanged.
+        keyframe = copy.copy(segment[0])
+        keyframe.stores = dict(keyframe.stores)
+        keyframe.delta_ebc = dict(keyframe.delta_ebc)
+
+        try:
+            for rb in segment[1:]:
+                keyframe.merge(rb)
+        except ValueError:
+            return segment
+
+        return [keyframe]
+
     def replace_node(self, old, new):
         """
         Replaces references to the `old` ast node with a reference to the
@@ -697,19 +889,147 @@ class RollbackLog(renpy.object.Object):
         global NOROLLBACK_TYPES
         NOROLLBACK_TYPES = (types.ModuleType, renpy.python.StoreModule, SlottedNoRollback, io.IOBase, type)
 
-        reachable = {}
+        start = time.perf_counter()
+
+        incremental = self.purge_incremental(roots, wait)
+
+        if not incremental:
+            reachable = {}
+
+            reached_vars(roots, reachable, wait)
+
+            revlog = self.log[:]
+            revlog.reverse()
+
+            for i in revlog:
+                if not i.purge_unreachable(reachable, wait):
+                    break
+
+            if renpy.config.incremental_reachability:
+                self.reachable = reachable
+            else:
+                # Break any cycles.
+                reachable.clear()
+
+            self.dirty.clear()
+            self.incremental_purges = 0
+
+        self.purge_times.append((incremental, time.perf_counter() - start))
+        del self.purge_times[: -renpy.config.rollback_length]
+
+    def record_dirty(self):
+        """
+        Records the objects in self.mutated as dirty, so the next incremental
+        purge walks them again. This is the write barrier that lets
+        purge_incremental skip the objects that haven't changed.
+        """
+
+        if self.reachable is None:
+            return
+
+        for _i in range(4):
+            try:
+                mutated = list(self.mutated.items())
+                break
+
+            except RuntimeError:
+                # This can occur when self.mutated is changed as we're
+                # copying it, when this is called from a save thread.
+                pass
+
+        else:
+            # Some objects may not be marked dirty, so walk everything.
+            self.reachable = None
+            return
+
+        for k, v in mutated:
+            if v is not None:
+                self.dirty[k] = v[0]
+
+    def purge_incremental(self, roots, wait):
+        """
+        Tries to purge unreachable objects starting from the objects found
+        reachable by the last purge, walking only the objects that have
+        been mutated since and anything newly reachable.
+
+        As objects that don't inherit from the revertable types can change
+        without being marked dirty, this can miss objects. So nothing is
+        purged unless every object with rollback information was found.
+        Returns False, leaving things unchanged, if that isn't the case, or
+        it's time to walk everything again.
+        """
+
+        if not renpy.config.incremental_reachability:
+            self.reachable = None
+            return False
+
+        if self.reachable is None:
+            return False
+
+        if self.incremental_purges >= renpy.config.full_reachability_interval:
+            return False
+
+        self.record_dirty()
+
+        reachable = self.reachable
+
+        if reachable is None:
+            return False
+
+        reachable = dict(reachable)
+
+        # The objects can be marked dirty by the main thread while a save
+        # thread purges, so work from a copy.
+        for _i in range(4):
+            try:
+                dirty = list(self.dirty.items())
+                break
+
+            except RuntimeError:
+                pass
+
+        else:
+            return False
+
+        # Walk the dirty objects again, as they may refer to new objects.
+        for k, ref in dirty:
+            obj = ref()
+
+            if obj is None:
+                continue
+
+            if reachable.pop(k, None) is not None:
+                reached(obj, reachable, wait)
 
         reached_vars(roots, reachable, wait)
 
-        revlog = self.log[:]
-        revlog.reverse()
+        found = []
 
-        for i in revlog:
-            if not i.purge_unreachable(reachable, wait):
+        for rb in reversed(self.log):
+            if rb.purged:
                 break
 
-        # Break any cycles.
-        reachable.clear()
+            new_objects, complete = rb.find_objects(reachable, wait)
+
+            if not complete:
+                return False
+
+            found.append((rb, new_objects))
+
+        for rb, new_objects in found:
+            rb.purged = True
+            del rb.objects[:]
+            rb.objects.extend(new_objects)
+
+        self.reachable = reachable
+
+        # Only forget the objects that were walked, not any marked dirty since.
+        for k, _ref in dirty:
+            self.dirty.pop(k, None)
+
+        self.incremental_purges += 1
+
+        return True
 
     def in_rollback(self):
         if self.forward:
@@ -1011,7 +1331,7 @@ class RollbackLog(renpy.object.Object):
             rb.rollback()
 
             if rb.forward is not None:
-                self.forward.insert(0, Forward(rb.context.current, rb.forward, rb.fixed))
+                self.forward.insert(0, Forward(rb.forward_name or rb.context.current, rb.forward, rb.fixed))
 
         if retained is not None:
             retained.rollback_control()
@@ -1047,6 +1367,11 @@ class RollbackLog(renpy.object.Object):
         self.mutated.clear()
         renpy.python.begin_stores()
 
+        # Objects were reverted without being marked dirty, so the next purge
+        # has to walk everything.
+        self.reachable = None
+        self.dirty.clear()
+
         # Restart the context or the top context.
         self.current = Rollback()
         self.current.context = renpy.game.context().rollback_copy()
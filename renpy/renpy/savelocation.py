@@ -30,6 +30,9 @@ from renpy.compat import PY2, basestring, bchr, bord, chr, open, pystr, range, r
 import os
 import zipfile
 import json
+import hashlib
+import struct
+import zlib
 
 import renpy
 import threading
@@ -101,6 +104,123 @@ def syncfs():
         emscripten.syncfs()
 
 
+# The number of chunk collections between the ones that read every save and
+# list the chunks directory.
+CHUNK_COLLECT_INTERVAL = 100
+
+# The name and version of the file that holds the slot index. The
+# screenshots of the indexed slots are kept as files in the thumbnails
+# directory, so the index stays small enough to rewrite.
+SLOT_INDEX = "slots.index"
+SLOT_INDEX_VERSION = 2
+
+# The inotify flags and event masks used by DirectoryWatcher.
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+IN_MODIFY = 0x2
+IN_ATTRIB = 0x4
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_MOVE_SELF = 0x800
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+
+INOTIFY_EVENT = struct.Struct("iIII")
+
+
+class DirectoryWatcher(object):
+    """
+    Uses inotify to find out if anything in a directory has changed, so the
+    directory only needs to be rescanned when it has. Raises an exception
+    if inotify isn't available.
+    """
+
+    def __init__(self, directory):
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed.")
+
+        mask = (
+            IN_MODIFY
+            | IN_ATTRIB
+            | IN_CLOSE_WRITE
+            | IN_MOVED_FROM
+            | IN_MOVED_TO
+            | IN_CREATE
+            | IN_DELETE
+            | IN_DELETE_SELF
+            | IN_MOVE_SELF
+        )
+
+        if libc.inotify_add_watch(fd, os.fsencode(directory), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(errno, "inotify_add_watch failed.")
+
+        self.fd = fd
+
+        # True if a change is known about but hasn't been reported yet. The
+        # first call to changed always returns True.
+        self.pending = True
+
+        # False once the watch stops working, at which point the location
+        # falls back to scanning every time.
+        self.alive = True
+
+    def changed(self):
+        """
+        Returns True if the directory may have changed since the last call.
+        """
+
+        rv = self.pending
+        self.pending = False
+
+        while self.alive:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            except OSError:
+                self.close()
+                return True
+
+            if not data:
+                break
+
+            rv = True
+
+            offset = 0
+
+            while offset + INOTIFY_EVENT.size <= len(data):
+                _wd, mask, _cookie, length = INOTIFY_EVENT.unpack_from(data, offset)
+                offset += INOTIFY_EVENT.size + length
+
+                if mask & (IN_Q_OVERFLOW | IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF):
+                    self.close()
+
+        return rv or not self.alive
+
+    def close(self):
+        if self.alive:
+            self.alive = False
+
+            try:
+                os.close(self.fd)
+            except Exception:
+                pass
+
+
 class FileLocation(object):
     """
     A location that saves files to a directory on disk.
@@ -142,6 +262,40 @@ class FileLocation(object):
         # The data loaded from the persistent file.
         self.persistent_data = None
 
+        # The directory incremental saves store their chunks in.
+        self.chunks = os.path.join(self.directory, "chunks")
+
+        # A map from slotname to the (mtime, digests) of the chunks that save
+        # uses, and a map from digest to the number of saves using it. None
+        # until the first collection, which reads every save.
+        self.chunk_manifests = None
+        self.chunk_refs = {}
+
+        # The number of chunk collections since everything was read.
+        self.chunk_collections = 0
+
+        # The slot index, a map from slotname to a dict giving the mtime,
+        # json, and screenshot of that slot. None if the index is disabled.
+        self.index = None
+
+        # The directory the screenshots of the indexed slots are stored in.
+        self.thumbnails = os.path.join(self.directory, "thumbnails")
+
+        # True if the index has changed since it was last written.
+        self.index_dirty = False
+
+        # Watches the directory for changes, if inotify is available.
+        self.watcher = None
+
+        if renpy.config.save_slot_index and self.active:
+            self.index = self.load_index()
+
+            if renpy.linux:
+                try:
+                    self.watcher = DirectoryWatcher(self.directory)
+                except Exception:
+                    self.watcher = None
+
     def filename(self, slotname):
         """
         Given a slot name, returns a filename.
@@ -164,6 +318,13 @@ class FileLocation(object):
         if not self.active:
             return
 
+        if self.watcher is not None:
+            if not self.watcher.changed():
+                return
+
+            if not self.watcher.alive:
+                self.watcher = None
+
         with disk_lock:
             old_mtimes = self.mtimes
             new_mtimes = {}
@@ -208,16 +369,200 @@ class FileLocation(object):
         Saves the save record in slotname.
         """
 
-        filename = self.filename(slotname)
+        self.write(slotname, record)
+        self.finish_save(slotname, record.chunks is not None)
+
+    def write(self, slotname, record):
+        """
+        Writes the save record to the file for slotname. This may be called
+        in a forked process, so it doesn't touch the rest of the game.
+        """
 
         with disk_lock:
-            record.write_file(filename)
+            record.write_file(self.filename(slotname))
 
-        renpy.util.expose_file(filename)
+    def finish_save(self, slotname, incremental):
+        """
+        Called after slotname has been written, to update the location.
+        """
+
+        renpy.util.expose_file(self.filename(slotname))
 
         self.sync()
         self.scan()
 
+        if incremental:
+            self.collect_chunks()
+
+    def load_index(self):
+        """
+        Loads the slot index from disk, returning an empty index if it
+        doesn't exist or can't be read.
+        """
+
+        try:
+            with open(os.path.join(self.directory, SLOT_INDEX), "rb") as f:
+                data = json.loads(zlib.decompress(f.read()))
+
+            if data["version"] != SLOT_INDEX_VERSION:
+                return {}
+
+            return data["slots"]
+        except Exception:
+            return {}
+
+    def write_index(self):
+        """
+        Writes the slot index to disk, if it has changed. This is only
+        called from the scan thread, so saving doesn't wait on it.
+        """
+
+        if (self.index is None) or (not self.index_dirty):
+            return
+
+        with disk_lock:
+            fn = os.path.join(self.directory, SLOT_INDEX)
+            fn_tmp = fn + tmp
+
+            data = json.dumps({"version": SLOT_INDEX_VERSION, "slots": self.index})
+
+            try:
+                with open(fn_tmp, "wb") as f:
+                    f.write(zlib.compress(data.encode("utf-8"), 3))
+
+                safe_rename(fn_tmp, fn)
+                renpy.util.expose_file(fn)
+            except Exception:
+                return
+
+            self.index_dirty = False
+
+    def thumbnail(self, slotname, screenshot):
+        """
+        Returns the filename the screenshot of `slotname` is stored in,
+        where `screenshot` is the name of the screenshot in the save file.
+        """
+
+        return os.path.join(self.thumbnails, renpy.exports.fsencode(slotname) + os.path.splitext(screenshot)[1])
+
+    def remove_thumbnails(self, slotname):
+        """
+        Removes the stored screenshots of `slotname`.
+        """
+
+        for i in ["screenshot.tga", "screenshot.png"]:
+            try:
+                os.unlink(self.thumbnail(slotname, i))
+            except Exception:
+                pass
+
+    def read_slot(self, slotname, mtime):
+        """
+        Reads the json and screenshot of `slotname` from its save file,
+        storing the screenshot in the thumbnails directory. Returns an
+        index entry, or None if the file can't be read.
+        """
+
+        try:
+            with zipfile.ZipFile(self.filename(slotname), "r") as zf:
+                names = zf.namelist()
+
+                if "json" in names:
+                    try:
+                        data = json.loads(zf.read("json"))
+                    except Exception:
+                        data = {}
+                elif "extra_info" in names:
+                    data = {"_save_name": zf.read("extra_info").decode("utf-8")}
+                else:
+                    data = {}
+
+                screenshot = None
+                screenshot_data = None
+
+                for i in ["screenshot.tga", "screenshot.png"]:
+                    if i in names:
+                        screenshot = i
+                        screenshot_data = zf.read(i)
+                        break
+
+            self.remove_thumbnails(slotname)
+
+            if screenshot is not None:
+                if not os.path.isdir(self.thumbnails):
+                    os.makedirs(self.thumbnails)
+
+                fn = self.thumbnail(slotname, screenshot)
+                fn_tmp = fn + tmp
+
+                with open(fn_tmp, "wb") as f:
+                    f.write(screenshot_data)
+
+                safe_rename(fn_tmp, fn)
+
+        except Exception:
+            return None
+
+        return {
+            "mtime": mtime,
+            "json": data,
+            "screenshot": screenshot,
+        }
+
+    def index_entry(self, slotname):
+        """
+        Returns the index entry for `slotname`, reading the save file if
+        the entry is missing or out of date. Returns None if the slot is
+        empty or the index is disabled.
+        """
+
+        if self.index is None:
+            return None
+
+        mtime = self.mtimes.get(slotname, None)
+
+        if mtime is None:
+            return None
+
+        rv = self.index.get(slotname, None)
+
+        if (rv is not None) and (rv["mtime"] == mtime):
+            return rv
+
+        with disk_lock:
+            rv = self.read_slot(slotname, mtime)
+
+            if rv is not None:
+                self.index[slotname] = rv
+                self.index_dirty = True
+
+        return rv
+
+    def refresh_index(self):
+        """
+        Brings the whole index up to date with the save files, and writes
+        it out if anything changed. This is called from the scan thread,
+        so the file screens find every slot already indexed.
+        """
+
+        if self.index is None:
+            return
+
+        for slotname in list(self.mtimes):
+            self.index_entry(slotname)
+
+        mtimes = self.mtimes
+
+        for slotname in list(self.index):
+            if slotname not in mtimes:
+                del self.index[slotname]
+                self.index_dirty = True
+
+                with disk_lock:
+                    self.remove_thumbnails(slotname)
+
+        self.write_index()
+
     def list(self):
         """
         Returns a list of all slots with savefiles in them, in arbitrary
@@ -269,6 +614,11 @@ class FileLocation(object):
         Returns None if the slot is empty.
         """
 
+        entry = self.index_entry(slotname)
+
+        if entry is not None:
+            return entry["json"]
+
         with disk_lock:
             try:
                 filename = self.filename(slotname)
@@ -297,6 +647,21 @@ class FileLocation(object):
         Returns None if the slot is empty.
         """
 
+        entry = self.index_entry(slotname)
+
+        if entry is not None:
+            if entry["screenshot"] is None:
+                return None
+
+            try:
+                with open(self.thumbnail(slotname, entry["screenshot"]), "rb") as f:
+                    data = f.read()
+
+                return renpy.display.im.Data(data, entry["screenshot"])
+            except Exception:
+                # Fall back to reading the save file.
+                pass
+
         with disk_lock:
             mtime = self.mtime(slotname)
 
@@ -340,6 +705,126 @@ class FileLocation(object):
 
             return log, token
 
+    def load_chunk(self, slotname, digest):
+        """
+        Returns the data of the chunk with `digest`, used by the incremental
+        save in `slotname`.
+        """
+
+        with disk_lock:
+            with open(os.path.join(self.chunks, digest + ".chunk"), "rb") as f:
+                data = zlib.decompress(f.read())
+
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise Exception("The save chunk {} is corrupt.".format(digest))
+
+        return data
+
+    def read_manifest(self, slotname):
+        """
+        Returns the set of digests of the chunks the save in `slotname` uses,
+        which is empty if it isn't an incremental save. Raises an exception
+        if the save can't be read.
+        """
+
+        magic = renpy.loadsave.CHUNKED_LOG_MAGIC
+
+        with zipfile.ZipFile(self.filename(slotname), "r") as zf:
+            with zf.open("log") as f:
+                if f.read(len(magic)) != magic:
+                    return frozenset()
+
+                return frozenset(digest for _key, digest in renpy.loadsave.load_manifest(f.read()))
+
+    def collect_chunks(self):
+        """
+        Deletes the chunks that no incremental save refers to.
+
+        The chunks each save uses are cached by slot and mtime, with a count
+        of the saves that use each chunk, so only the saves that changed are
+        read. Every CHUNK_COLLECT_INTERVAL calls, everything is read again and
+        the chunks directory is listed, to catch changes this missed.
+        """
+
+        if not os.path.isdir(self.chunks):
+            return
+
+        with disk_lock:
+            self.chunk_collections += 1
+
+            if self.chunk_collections >= CHUNK_COLLECT_INTERVAL:
+                self.chunk_manifests = None
+
+            full = self.chunk_manifests is None
+
+            if full:
+                self.chunk_manifests = {}
+                self.chunk_refs = {}
+                self.chunk_collections = 0
+
+            manifests = self.chunk_manifests
+            refs = self.chunk_refs
+            mtimes = self.mtimes
+
+            unused = set()
+
+            try:
+                for slotname, mtime in list(mtimes.items()):
+                    old = manifests.get(slotname, None)
+
+                    if (old is not None) and (old[0] == mtime):
+                        continue
+
+                    digests = self.read_manifest(slotname)
+                    manifests[slotname] = (mtime, digests)
+
+                    for i in digests:
+                        refs[i] = refs.get(i, 0) + 1
+
+                    if old is not None:
+                        unused.update(self.release_chunks(old[1]))
+
+                for slotname in list(manifests):
+                    if slotname not in mtimes:
+                        unused.update(self.release_chunks(manifests.pop(slotname)[1]))
+
+            except Exception:
+                # If we can't tell what a save uses, keep everything, and
+                # read every save again next time.
+                self.chunk_manifests = None
+                return
+
+            if full:
+                unused = set(fn[:-6] for fn in os.listdir(self.chunks) if fn.endswith(".chunk"))
+
+            for digest in unused:
+                if digest in refs:
+                    continue
+
+                try:
+                    os.unlink(os.path.join(self.chunks, digest + ".chunk"))
+                except Exception:
+                    pass
+
+    def release_chunks(self, digests):
+        """
+        Removes a reference to each of `digests` from the chunk counts,
+        returning the digests that are no longer used.
+        """
+
+        rv = []
+
+        for i in digests:
+            count = self.chunk_refs.get(i, 0) - 1
+
+            if count > 0:
+                self.chunk_refs[i] = count
+            else:
+                self.chunk_refs.pop(i, None)
+                rv.append(i)
+
+        return rv
+
     def unlink(self, slotname):
         """
         Deletes the file in slotname.
@@ -353,6 +838,8 @@ class FileLocation(object):
             self.sync()
             self.scan()
 
+        self.collect_chunks()
+
     def rename(self, old, new):
         """
         If old exists, renames it to new.
@@ -519,6 +1006,27 @@ class MultiLocation(object):
         if not saved:
             raise Exception("Not saved - no valid save locations.")
 
+    def write(self, slotname, record):
+        if not renpy.config.save:
+            return
+
+        saved = False
+
+        for l in self.active_locations():
+            l.write(slotname, record)
+            saved = True
+
+        if not saved:
+            raise Exception("Not saved - no valid save locations.")
+
+    def finish_save(self, slotname, incremental):
+        if not renpy.config.save:
+            return
+
+        with SyncfsLock():
+            for l in self.active_locations():
+                l.finish_save(slotname, incremental)
+
     def list(self):
         if not renpy.config.save:
             return []
@@ -581,6 +1089,10 @@ class MultiLocation(object):
         l = self.newest(slotname)
         return l.load(slotname)  # type: ignore
 
+    def load_chunk(self, slotname, digest):
+        l = self.newest(slotname)
+        return l.load_chunk(slotname, digest)  # type: ignore
+
     def unlink(self, slotname):
         if not renpy.config.save:
             return
@@ -630,6 +1142,10 @@ class MultiLocation(object):
         for l in self.locations:
             l.scan()
 
+    def refresh_index(self):
+        for l in self.active_locations():
+            l.refresh_index()
+
     def __eq__(self, other):
         if not isinstance(other, MultiLocation):
             return False
@@ -658,6 +1174,7 @@ def run_scan_thread():
     while not quit_scan_thread:
         try:
             renpy.loadsave.location.scan()
+            renpy.loadsave.location.refresh_index()
         except Exception:
             pass
 
@@ -26,6 +26,10 @@ from typing import Any
 
 import __future__
 import collections
+import concurrent.futures
+import io
+import marshal
+import mmap
 import pickletools
 import hashlib
 import os
@@ -63,6 +67,20 @@ RPYC2_HEADER = b"RENPY RPC2"
 OLD_BYTECODE_FILE = "cache/bytecode.rpyb"
 BYTECODE_FILE = "cache/bytecode-{}{}.rpyb".format(sys.version_info.major, sys.version_info.minor)
 
+# The startup snapshot, which replaces BYTECODE_FILE when config.startup_snapshot is true.
+SNAPSHOT_FILE = "cache/snapshot-{}{}.rpys".format(sys.version_info.major, sys.version_info.minor)
+
+# The layout of the startup snapshot, all little-endian: a header holding SNAPSHOT_MAGIC,
+# the snapshot version, a digest of what the cached bytecode depends on besides the source
+# (SNAPSHOT_VERSION, BYTECODE_VERSION, PYC_MAGIC and the Ren'Py version), and the number
+# of entries; then one fixed-size entry per cache key, sorted by the md5 of the key, giving
+# the offset, length and kind of its value; then the values. A kind of 0 means the value is
+# marshalled bytecode, stored as is; 1 means the value itself is marshalled.
+SNAPSHOT_MAGIC = b"RENPY SNAPSHOT\n"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct("<16sI16sQ")
+SNAPSHOT_ENTRY = struct.Struct("<16sQQI")
+
 
 class ScriptError(Exception):
     """
@@ -93,6 +111,165 @@ class LabelNotFound(ScriptError, LookupError):
             return f" Did you mean: '{suggestion}'?"
 
 
+def snapshot_digest():
+    """
+    Returns the digest stored in, and checked against, the startup snapshot.
+    """
+
+    return hashlib.md5(
+        repr((SNAPSHOT_VERSION, BYTECODE_VERSION, PYC_MAGIC, renpy.version_only)).encode("utf-8")
+    ).digest()
+
+
+def snapshot_key(key):
+    return hashlib.md5(repr(key).encode("utf-8")).digest()
+
+
+class BytecodeSnapshot(object):
+    """
+    The bytecode cache, read from a memory-mapped startup snapshot. Values
+    are found by binary search over the sorted entry table when they are
+    asked for, rather than unpickling the whole cache at startup. This
+    supports the parts of the dict interface py_compile uses.
+    """
+
+    def __init__(self, mapping):
+        self.mapping = mapping
+        self.count = 0
+
+        magic, version, digest, count = SNAPSHOT_HEADER.unpack_from(mapping, 0)
+
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION or digest != snapshot_digest():
+            raise Exception("The startup snapshot is out of date.")
+
+        if SNAPSHOT_HEADER.size + count * SNAPSHOT_ENTRY.size > len(mapping):
+            raise Exception("The startup snapshot is truncated.")
+
+        self.count = count
+
+    def find(self, key):
+        digest = snapshot_key(key)
+
+        lo = 0
+        hi = self.count
+
+        while lo < hi:
+            mid = (lo + hi) // 2
+            entry_digest, offset, length, kind = SNAPSHOT_ENTRY.unpack_from(
+                self.mapping, SNAPSHOT_HEADER.size + mid * SNAPSHOT_ENTRY.size
+            )
+
+            if entry_digest < digest:
+                lo = mid + 1
+            elif entry_digest > digest:
+                hi = mid
+            else:
+                return offset, length, kind
+
+        return None
+
+    def get(self, key, default=None):
+        t = self.find(key)
+
+        if t is None:
+            return default
+
+        offset, length, kind = t
+        data = self.mapping[offset : offset + length]
+
+        if kind == 1:
+            return marshal.loads(data)
+
+        return data
+
+    def __contains__(self, key):
+        return self.find(key) is not None
+
+    def __getitem__(self, key):
+        t = self.find(key)
+
+        if t is None:
+            raise KeyError(key)
+
+        return self.get(key)
+
+    def __len__(self):
+        return self.count
+
+    def entries(self):
+        """
+        Yields a (digest, data, kind) tuple for each entry, with the data
+        copied out of the map.
+        """
+
+        for i in range(self.count):
+            digest, offset, length, kind = SNAPSHOT_ENTRY.unpack_from(
+                self.mapping, SNAPSHOT_HEADER.size + i * SNAPSHOT_ENTRY.size
+            )
+
+            yield digest, self.mapping[offset : offset + length], kind
+
+    def close(self):
+        """
+        Releases the map, so the snapshot can be replaced. Afterwards, the
+        snapshot is empty.
+        """
+
+        self.count = 0
+        self.mapping.close()
+
+
+def open_bytecode_snapshot(fn):
+    """
+    Returns a BytecodeSnapshot for the startup snapshot in `fn`.
+    """
+
+    with open(fn, "rb") as f:
+        return BytecodeSnapshot(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def write_bytecode_snapshot(fn, cache, keep=None):
+    """
+    Writes `cache`, a dict in the form of Script.bytecode_newcache, to `fn`
+    as a startup snapshot.
+
+    `keep`
+        If given, a BytecodeSnapshot whose entries are kept when they're not
+        in `cache`. It's closed before `fn` is replaced.
+    """
+
+    entries = []
+
+    for key, value in cache.items():
+        if isinstance(value, bytes):
+            entries.append((snapshot_key(key), value, 0))
+        else:
+            entries.append((snapshot_key(key), marshal.dumps(value), 1))
+
+    if keep is not None:
+        digests = set(i[0] for i in entries)
+        entries.extend(i for i in keep.entries() if i[0] not in digests)
+
+    entries.sort(key=lambda i: i[0])
+
+    offset = SNAPSHOT_HEADER.size + len(entries) * SNAPSHOT_ENTRY.size
+
+    with open(fn + ".new", "wb") as f:
+        f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, snapshot_digest(), len(entries)))
+
+        for digest, data, kind in entries:
+            f.write(SNAPSHOT_ENTRY.pack(digest, offset, len(data), kind))
+            offset += len(data)
+
+        for _digest, data, _kind in entries:
+            f.write(data)
+
+    if keep is not None:
+        keep.close()
+
+    os.replace(fn + ".new", fn)
+
+
 def collapse_stmts(stmts):
     """
     Returns a flat list containing every statement in the tree
@@ -107,6 +284,128 @@ def collapse_stmts(stmts):
     return rv
 
 
+def lazy_node(node):
+    """
+    Returns true if `node` does nothing when its file is loaded, so the file
+    can stay serialized until one of its names is looked up.
+    """
+
+    if node.get_init() is not None:
+        return False
+
+    if isinstance(node, (renpy.ast.Testcase, renpy.ast.RPY, renpy.ast.TranslatePython, renpy.ast.TranslateBlock)):
+        return False
+
+    if isinstance(node, (renpy.ast.Translate, renpy.ast.TranslateSay)) and node.language is not None:
+        return False
+
+    # Python statements create their store when loaded, and the default store always exists.
+    if isinstance(node, renpy.ast.Python):
+        return node.store == "store"
+
+    return type(node).early_execute is renpy.ast.Node.early_execute
+
+
+class DeferredScript(object):
+    """
+    A script file whose statements are kept serialized until a name in it is
+    looked up. This is created from slot 3 of a .rpyc file, which lists the
+    names and default-language translate identifiers in the file.
+    """
+
+    def __init__(self, index, data):
+        # The names of the statements in the file.
+        self.names = index["names"]
+
+        # The identifiers of the default-language translates in the file.
+        self.translates = index["translates"]
+
+        # The slot 2 data of the .rpyc file.
+        self.data = data
+
+        # The filename passed to finish_load.
+        self.filename = None
+
+
+class PrefetchedScript(object):
+    """
+    The parts of loading a script file that do not touch the script: the
+    digests of the source and .rpyc files, and the .rpyc data with slot 2
+    decompressed. These are produced by Script.prefetch_file, on a worker
+    thread, while earlier files are being loaded.
+    """
+
+    def __init__(self):
+        # The md5 of the source file and RPYC_MAGIC, if there's a source file.
+        self.rpydigest = None
+
+        # The contents of the .rpyc file, and the md5 at its end.
+        self.rpycdata = None
+        self.rpycdigest = None
+
+        # A map from slot number to the decompressed data in that slot.
+        self.slots = {}
+
+        # How long prefetch_file took, in seconds.
+        self.duration = 0.0
+
+
+class ScriptPrefetcher(object):
+    """
+    Runs Script.prefetch_file for the files in `files`, in order, on a pool
+    of `threads` threads, keeping a bounded number of files ahead of the
+    files being loaded. Parsing, unpickling and finish_load stay on the
+    loading thread, as python early blocks run as files are loaded and
+    change how later files are parsed.
+    """
+
+    def __init__(self, script, compiled, source_extensions, files, threads):
+        self.script = script
+        self.compiled = compiled
+        self.source_extensions = source_extensions
+        self.queue = collections.deque(files)
+        self.threads = threads
+        self.futures = {}
+
+        if threads > 0:
+            self.executor = concurrent.futures.ThreadPoolExecutor(threads, thread_name_prefix="script-load")
+        else:
+            self.executor = None
+
+        self.fill()
+
+    def fill(self):
+        if self.executor is None:
+            return
+
+        while self.queue and len(self.futures) < self.threads * 4:
+            fn, dir = self.queue.popleft()
+            self.futures[fn, dir] = self.executor.submit(
+                self.script.prefetch_file, self.compiled, self.source_extensions, dir, fn
+            )
+
+    def get(self, fn, dir):
+        """
+        Returns the PrefetchedScript for `fn` in `dir`, or None if it isn't
+        available, in which case the file is read on the loading thread.
+        """
+
+        future = self.futures.pop((fn, dir), None)
+        self.fill()
+
+        if future is None:
+            return None
+
+        try:
+            return future.result()
+        except Exception:
+            return None
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+
+
 class Script(object):
     """
     This class represents a Ren'Py script, which is parsed out of a
@@ -163,6 +462,10 @@ class Script(object):
         self.bytecode_newcache = {}
         self.bytecode_dirty = False
 
+        # Entries of the old cache that were wrapped in a LazyBytecode, and
+        # haven't been loaded yet.
+        self.bytecode_pending = {}
+
         self.translator = renpy.translation.ScriptTranslator()
         self.init_bytecode()
 
@@ -202,6 +505,22 @@ class Script(object):
         # A set of languages to load.
         self.load_languages = set()
 
+        # A list of (filename, prefetch, wait, load) times, in seconds, if
+        # --profile-load is given.
+        self.load_profile = []
+
+        # If true, .rpyc files that don't run anything when loaded are kept
+        # serialized until a name in them is looked up.
+        self.lazy = getattr(renpy.game.args, "lazy_script", False) and (renpy.game.args.command == "run")
+
+        # A map from the name of a statement to the DeferredScript that
+        # contains it.
+        self.deferred_names = {}
+
+        # True once the script has been analyzed, after which newly loaded
+        # statements are analyzed as they're loaded.
+        self.analyzed = False
+
     def choose_backupdir(self):
         if renpy.mobile:
             return None
@@ -433,17 +752,10 @@ class Script(object):
 
         initcode = []
 
-        count = 0
+        files = []
         skipped = 0
 
         for fn, dir in script_files:
-            count += 1
-            renpy.display.presplash.progress("Loading script...", count, len(script_files))
-
-            # Pump the presplash window to prevent marking
-            # our process as unresponsive by OS
-            renpy.display.presplash.pump_window()
-
             if (fn, dir) in self.loaded_scripts:
                 continue
 
@@ -452,12 +764,45 @@ class Script(object):
                 continue
 
             self.loaded_scripts.add((fn, dir))
+            files.append((fn, dir))
+
+        profile = getattr(renpy.game.args, "profile_load", False)
+        threads = getattr(renpy.game.args, "load_threads", 0)
+        prefetcher = ScriptPrefetcher(self, ".rpyc", ["_ren.py", ".rpy"], files, threads)
+
+        load_start = time.perf_counter()
+
+        try:
+            for count, (fn, dir) in enumerate(files, 1):
+                renpy.display.presplash.progress("Loading script...", count, len(files))
 
-            self.load_appropriate_file(".rpyc", ["_ren.py", ".rpy"], dir, fn, initcode)
+                # Pump the presplash window to prevent marking
+                # our process as unresponsive by OS
+                renpy.display.presplash.pump_window()
+
+                start = time.perf_counter()
+                prefetched = prefetcher.get(fn, dir)
+                loaded = time.perf_counter()
+
+                self.load_appropriate_file(".rpyc", ["_ren.py", ".rpy"], dir, fn, initcode, prefetched)
+
+                if profile:
+                    self.load_profile.append(
+                        (fn if dir is None else dir + "/" + fn,
+                         prefetched.duration if prefetched is not None else 0.0,
+                         loaded - start,
+                         time.perf_counter() - loaded)
+                    )
+
+        finally:
+            prefetcher.close()
 
         if skipped:
             renpy.display.log.write("{} script files skipped.".format(skipped))
 
+        if profile:
+            self.report_load_profile(time.perf_counter() - load_start, threads)
+
         initcode.sort(key=lambda i: i[0])
 
         self.initcode.extend(initcode)
@@ -468,6 +813,30 @@ class Script(object):
 
         return initcode
 
+    def report_load_profile(self, total, threads):
+        """
+        Prints and logs the per-file times collected for --profile-load,
+        slowest first.
+        """
+
+        lines = ["Loaded {} script files in {:.0f} ms with {} load threads.".format(len(self.load_profile), total * 1000, threads)]
+        lines.append("{:>9} {:>9} {:>9}  file".format("prefetch", "wait", "load"))
+
+        for fn, prefetch, wait, load in sorted(self.load_profile, key=lambda i: i[3] + i[2], reverse=True):
+            lines.append("{:7.1f}ms {:7.1f}ms {:7.1f}ms  {}".format(prefetch * 1000, wait * 1000, load * 1000, fn))
+
+        lines.append("{:7.1f}ms {:7.1f}ms {:7.1f}ms  total".format(
+            sum(i[1] for i in self.load_profile) * 1000,
+            sum(i[2] for i in self.load_profile) * 1000,
+            sum(i[3] for i in self.load_profile) * 1000,
+        ))
+
+        for l in lines:
+            print(l)
+            renpy.display.log.write("%s", l)
+
+        self.load_profile = []
+
     def load_module(self, name):
         files = [(fn, dir) for fn, dir in self.module_files if fn == name]
 
@@ -805,6 +1174,143 @@ class Script(object):
 
         return zlib.decompress(data)
 
+    def index_stmts(self, data, stmts):
+        """
+        Returns the index stored in slot 3 of a .rpyc file, used to defer
+        loading the file's statements.
+        """
+
+        all_stmts = collapse_stmts(stmts)
+
+        lazy = all(lazy_node(i) for i in all_stmts)
+
+        if any(data["deferred_parse_errors"].values()):
+            lazy = False
+
+        return {
+            "version": script_version,
+            "key": data["key"],
+            "lazy": lazy,
+            "names": [i.name for i in all_stmts],
+            "translates": [
+                i.identifier for i in all_stmts if isinstance(i, (renpy.ast.Translate, renpy.ast.TranslateSay))
+            ],
+        }
+
+    def read_deferred(self, f, slots):
+        """
+        Returns a DeferredScript for the open .rpyc file `f`, or None if the
+        file has to be loaded now. `slots` is a map from slot number to
+        decompressed data that has already been read.
+        """
+
+        try:
+            bindata = slots[3] if 3 in slots else self.read_rpyc_data(f, 3)
+
+            if not bindata:
+                return None
+
+            index = loads(bindata)
+
+            if not isinstance(index, dict) or not index["lazy"] or index["version"] != script_version:
+                return None
+
+            if index["key"] != (self.key or "unlocked"):
+                return None
+
+            if 2 in slots:
+                data = slots[2]
+            else:
+                f.seek(0)
+                data = self.read_rpyc_data(f, 2)
+
+            if not data:
+                return None
+
+            return DeferredScript(index, data)
+
+        except Exception:
+            return None
+
+    def defer(self, deferred):
+        """
+        Registers the names in `deferred`, so that it's loaded when one of
+        them is looked up. If a name is already taken, loads it now, so
+        duplicates are reported as usual.
+        """
+
+        translator = self.translator
+
+        for name in deferred.names:
+            if (name in self.namemap) or (name in self.deferred_names):
+                self.materialize(deferred)
+                return
+
+        for identifier in deferred.translates:
+            if (identifier in translator.default_translates) or (identifier in translator.deferred_translates):
+                self.materialize(deferred)
+                return
+
+        for name in deferred.names:
+            self.deferred_names[name] = deferred
+
+        translator.deferred_translates.update(deferred.translates)
+
+    def materialize(self, deferred):
+        """
+        Loads the statements of `deferred`, a DeferredScript.
+        """
+
+        for name in deferred.names:
+            if self.deferred_names.get(name, None) is deferred:
+                del self.deferred_names[name]
+
+        self.translator.deferred_translates.difference_update(deferred.translates)
+
+        old_exception_info = renpy.game.exception_info
+        renpy.game.exception_info = "While loading the script."
+
+        try:
+            _data, stmts = loads(deferred.data)
+            deferred.data = None
+
+            initcode = []
+            self.finish_load(stmts, initcode, filename=deferred.filename)
+
+        finally:
+            renpy.game.exception_info = old_exception_info
+
+        self.translator.chain_translates()
+        self.compress()
+
+        if self.analyzed:
+            self.analyze()
+
+    def materialize_all(self):
+        """
+        Loads every deferred script file. This is used by the tools that
+        need to see every statement.
+        """
+
+        for deferred in list({id(i): i for i in self.deferred_names.values()}.values()):
+            self.materialize(deferred)
+
+    def load_deferred_stmts(self, deferred):
+        """
+        Returns a copy of the statements in `deferred`, without loading them
+        into the script. This is used by the memory profiler.
+        """
+
+        old_all_pyexpr = self.all_pyexpr
+        self.record_pycode = False
+        self.all_pyexpr = None
+
+        try:
+            return loads(deferred.data)[1]
+        finally:
+            self.record_pycode = True
+            self.all_pyexpr = old_all_pyexpr
+
     def static_transforms(self, stmts):
         """
         This performs transformations on the script that can be performed
@@ -815,7 +1321,56 @@ class Script(object):
         # Generate translate nodes.
         renpy.translation.restructure(stmts)
 
-    def load_file(self, dir, fn):
+    def prefetch_file(self, compiled, source_extensions, dir, fn):
+        """
+        Reads the script file `fn` from `dir` (None for an archive) into a
+        PrefetchedScript. This runs on a worker thread, so it must not touch
+        the script or the parser.
+        """
+
+        start = time.perf_counter()
+
+        rv = PrefetchedScript()
+
+        if dir is None:
+            with renpy.loader.load(fn + compiled, tl=False) as f:
+                rv.rpycdata = f.read()
+
+        else:
+            for source in source_extensions:
+                rpyfn = dir + "/" + fn + source
+
+                if os.path.exists(rpyfn):
+                    with open(rpyfn, "rb") as f:
+                        rv.rpydigest = hashlib.md5(f.read() + RPYC_MAGIC).digest()
+
+                    break
+
+            rpycfn = dir + "/" + fn + compiled
+
+            if os.path.exists(rpycfn):
+                with open(rpycfn, "rb") as f:
+                    rv.rpycdata = f.read()
+
+        if rv.rpycdata is not None:
+            rv.rpycdigest = rv.rpycdata[-hashlib.md5().digest_size :]
+
+            for slot in (3, 2) if self.lazy else (2,):
+                try:
+                    rv.slots[slot] = self.read_rpyc_data(io.BytesIO(rv.rpycdata), slot)
+                except Exception:
+                    pass
+
+        rv.duration = time.perf_counter() - start
+
+        return rv
+
+    def load_file(self, dir, fn, prefetched=None):
+        """
+        Loads the script file `fn` from `dir`. If `prefetched` is given, it's
+        a PrefetchedScript used for a .rpyc file instead of reading it again.
+        """
+
         # Used to only find the deferred parse errors from this file.
         old_deferred_parse_errors = renpy.parser.deferred_parse_errors
         renpy.parser.deferred_parse_errors = collections.defaultdict(list)
@@ -884,12 +1439,15 @@ class Script(object):
                     dumps((data, stmts), bad_reduction_name=f"<{fn} transformed rpyc data>")
                 )
 
+                index_data = dumps(self.index_stmts(data, stmts))
+
                 if not renpy.macapp:
                     try:
                         with open(rpycfn, "wb") as f:
                             self.write_rpyc_header(f)
                             self.write_rpyc_data(f, 1, pickle_data_before_static_transforms)
                             self.write_rpyc_data(f, 2, pickle_data_after_static_transforms)
+                            self.write_rpyc_data(f, 3, index_data)
 
                             with open(fullfn, "rb") as fullf:
                                 rpydigest = hashlib.md5(fullf.read() + RPYC_MAGIC).digest()
@@ -906,10 +1464,28 @@ class Script(object):
                 data = None
                 stmts = None
 
-                with renpy.loader.load(fn, tl=False) as f:
+                if prefetched is not None and prefetched.rpycdata is not None:
+                    rpycf = io.BytesIO(prefetched.rpycdata)
+                    slots = prefetched.slots
+                else:
+                    rpycf = renpy.loader.load(fn, tl=False)
+                    slots = {}
+
+                with rpycf as f:
+                    if self.lazy and fn.endswith(".rpyc"):
+                        deferred = self.read_deferred(f, slots)
+
+                        if deferred is not None:
+                            return {"version": script_version, "key": self.key or "unlocked"}, deferred
+
+                        f.seek(0)
+
                     for slot in [2, 1]:
                         try:
-                            bindata = self.read_rpyc_data(f, slot)
+                            if slot in slots:
+                                bindata = slots[slot]
+                            else:
+                                bindata = self.read_rpyc_data(f, slot)
 
                             if bindata:
                                 try:
@@ -960,7 +1536,7 @@ class Script(object):
 
             renpy.parser.deferred_parse_errors = old_deferred_parse_errors
 
-    def load_appropriate_file(self, compiled, source_extensions, dir, fn, initcode):
+    def load_appropriate_file(self, compiled, source_extensions, dir, fn, initcode, prefetched=None):
         data = None
 
         source = source_extensions[-1]
@@ -972,14 +1548,17 @@ class Script(object):
         if dir is None:
             rpyfn = fn + source
             lastfn = fn + compiled
-            data, stmts = self.load_file(dir, fn + compiled)
+            data, stmts = self.load_file(dir, fn + compiled, prefetched)
 
             if data is None:
                 raise Exception("Could not load from archive %s." % (lastfn,))
 
-            with renpy.loader.load(fn + compiled, tl=False) as f:
-                f.seek(-hashlib.md5().digest_size, 2)
-                digest = f.read(hashlib.md5().digest_size)
+            if prefetched is not None and prefetched.rpycdigest is not None:
+                digest = prefetched.rpycdigest
+            else:
+                with renpy.loader.load(fn + compiled, tl=False) as f:
+                    f.seek(-hashlib.md5().digest_size, 2)
+                    digest = f.read(hashlib.md5().digest_size)
 
         else:
             # Otherwise, we're loading from disk. So we need to decide if
@@ -1005,14 +1584,19 @@ class Script(object):
             elif rpyfns:
                 source, rpyfn = rpyfns[0]
 
-                with open(rpyfn, "rb") as f:
-                    rpydigest = hashlib.md5(f.read() + RPYC_MAGIC).digest()
+                if prefetched is not None and prefetched.rpydigest is not None:
+                    rpydigest = prefetched.rpydigest
+                else:
+                    with open(rpyfn, "rb") as f:
+                        rpydigest = hashlib.md5(f.read() + RPYC_MAGIC).digest()
             else:
                 source = source_extensions[-1]
                 rpyfn = dir + "/" + fn + source_extensions[-1]
 
             try:
-                if os.path.exists(rpycfn):
+                if prefetched is not None and prefetched.rpycdata is not None:
+                    rpycdigest = prefetched.rpycdigest
+                elif os.path.exists(rpycfn):
                     with open(rpycfn, "rb") as f:
                         f.seek(-hashlib.md5().digest_size, 2)
                         rpycdigest = f.read(hashlib.md5().digest_size)
@@ -1034,7 +1618,7 @@ class Script(object):
 
                 try:
                     if rpydigest == rpycdigest and not force_compile:
-                        data, stmts = self.load_file(dir, fn + compiled)
+                        data, stmts = self.load_file(dir, fn + compiled, prefetched)
 
                         if data is None:
                             print("Could not load " + rpycfn)
@@ -1054,7 +1638,7 @@ class Script(object):
 
             elif os.path.exists(rpycfn):
                 lastfn = rpycfn
-                data, stmts = self.load_file(dir, fn + compiled)
+                data, stmts = self.load_file(dir, fn + compiled, prefetched)
 
                 digest = rpycdigest
 
@@ -1079,7 +1663,11 @@ class Script(object):
                 + " does not share a key with at least one .rpyc file. To fix, delete all .rpyc files, or rerun Ren'Py with the --lock option."
             )
 
-        self.finish_load(stmts, initcode, filename=lastfn)  # type: ignore
+        if isinstance(stmts, DeferredScript):
+            stmts.filename = lastfn  # type: ignore
+            self.defer(stmts)
+        else:
+            self.finish_load(stmts, initcode, filename=lastfn)  # type: ignore
 
         self.digest.update(digest)  # type: ignore
 
@@ -1091,6 +1679,15 @@ class Script(object):
         if renpy.game.args.compile_python:
             return
 
+        # Prefer the startup snapshot, if there's an up-to-date one on disk. The
+        # snapshot is removed when the bytecode file is written, so it can't be
+        # older than the bytecode file. (config.startup_snapshot isn't set yet.)
+        try:
+            self.bytecode_oldcache = open_bytecode_snapshot(renpy.loader.transfn(SNAPSHOT_FILE))
+            return
+        except Exception:
+            pass
+
         # Load the oldcache.
         try:
             with renpy.loader.load(BYTECODE_FILE) as f:
@@ -1137,6 +1734,7 @@ class Script(object):
                     py=i.py,
                     hashcode=i.hashcode,
                     column=i.col_offset,
+                    lazy=i,
                 )
 
             except SyntaxError as e:
@@ -1163,7 +1761,47 @@ class Script(object):
         if renpy.macapp:
             return
 
-        if self.bytecode_dirty:
+        # Lazily loaded code that hasn't run yet is kept as it was. A bad
+        # entry is only replaced when it fails to load.
+        for k, v in self.bytecode_pending.items():
+            self.bytecode_newcache.setdefault(k, v)
+
+        # Deferred script files haven't compiled their code yet, so keep it.
+        if self.deferred_names and isinstance(self.bytecode_oldcache, dict):
+            for k, v in self.bytecode_oldcache.items():
+                self.bytecode_newcache.setdefault(k, v)
+
+        # The snapshot only stores digests of the keys, so the code of deferred
+        # files can't be moved from a snapshot into the bytecode file. Keep
+        # updating the snapshot until the switch can be made without them.
+        snapshot = isinstance(self.bytecode_oldcache, BytecodeSnapshot)
+
+        if renpy.config.startup_snapshot or (snapshot and self.deferred_names):
+            # Also write a snapshot when there's none yet, even if the bytecode is unchanged.
+            if self.bytecode_dirty or not isinstance(self.bytecode_oldcache, BytecodeSnapshot):
+                keep = None
+
+                if isinstance(self.bytecode_oldcache, BytecodeSnapshot):
+                    # Keep the code of deferred files, which hasn't been compiled yet.
+                    if self.deferred_names:
+                        keep = self.bytecode_oldcache
+                    else:
+                        self.bytecode_oldcache.close()
+
+                try:
+                    fn = renpy.loader.get_path(SNAPSHOT_FILE)
+                    write_bytecode_snapshot(fn, self.bytecode_newcache, keep)
+
+                    if self.deferred_names:
+                        self.bytecode_oldcache = open_bytecode_snapshot(fn)
+                except Exception:
+                    pass
+
+            return
+
+        # When the snapshot was loaded, the bytecode file may be out of date,
+        # so write it before removing the snapshot.
+        if self.bytecode_dirty or snapshot:
             try:
                 fn = renpy.loader.get_path(BYTECODE_FILE)
 
@@ -1179,6 +1817,17 @@ class Script(object):
             except Exception:
                 pass
 
+            # A snapshot left from when config.startup_snapshot was true would
+            # otherwise be preferred to the bytecode file just written.
+            if snapshot:
+                self.bytecode_oldcache.close()
+
+            fn = renpy.loader.get_path(SNAPSHOT_FILE)
+            try:
+                os.unlink(fn)
+            except Exception:
+                pass
+
     def lookup(self, label):
         """
         Looks up the given label in the game. If the label is not found,
@@ -1191,10 +1840,17 @@ class Script(object):
         label = renpy.config.label_overrides.get(label, label)
         original = label
 
+        if label in self.deferred_names:
+            self.materialize(self.deferred_names[label])
+
         rv = self.namemap.get(label, None)
 
         if (rv is None) and (renpy.config.missing_label_callback is not None):
             label = renpy.config.missing_label_callback(label)
+
+            if label in self.deferred_names:
+                self.materialize(self.deferred_names[label])
+
             rv = self.namemap.get(label, None)
 
         if rv is None:
@@ -1215,7 +1871,7 @@ class Script(object):
 
         label = renpy.config.label_overrides.get(label, label)
 
-        return label in self.namemap
+        return (label in self.namemap) or (label in self.deferred_names)
 
     def lookup_or_none(self, label):
         """
@@ -1239,6 +1895,7 @@ class Script(object):
             i.analyze()
 
         self.need_analysis = []
+        self.analyzed = True
 
     def compress(self):
         """
@@ -400,6 +400,7 @@ def nodes_on_line(filename, linenumber):
     """
 
     ensure_loaded(filename)
+    renpy.game.script.materialize_all()
 
     rv = []
 
@@ -416,6 +417,7 @@ def nodes_on_line_at_or_after(filename, linenumber):
     """
 
     ensure_loaded(filename)
+    renpy.game.script.materialize_all()
 
     lines = [
         i.linenumber
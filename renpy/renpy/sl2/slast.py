@@ -1870,7 +1870,7 @@ class SLPython(SLNode):
         analysis.python(self.code.source)
 
     def execute(self, context):
-        exec(self.code.bytecode, context.globals, context.scope)
+        exec(renpy.python.resolve_bytecode(self.code.bytecode), context.globals, context.scope)
 
     def prepare(self, analysis):
         self.constant = NOT_CONST
@@ -72,6 +72,10 @@ class ScriptTranslator(object):
         # language is None.
         self.default_translates = {}
 
+        # The identifiers of default translates in script files that haven't
+        # been loaded yet.
+        self.deferred_translates = set()
+
         # A map from (identifier, language) to the translate object used for that
         # language.
         self.language_translates = {}
@@ -115,7 +119,7 @@ class ScriptTranslator(object):
         Return the number of dialogue blocks in the game.
         """
 
-        return len(self.default_translates)
+        return len(self.default_translates) + len(self.deferred_translates)
 
     def take_translates(self, nodes: list[renpy.ast.Node]):
         """
@@ -312,6 +316,9 @@ class Restructurer(object):
         if identifier in renpy.game.script.translator.default_translates:
             return True
 
+        if identifier in renpy.game.script.translator.deferred_translates:
+            return True
+
         return False
 
     def unique_identifier(self, label, digest):
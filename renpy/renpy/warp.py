@@ -64,6 +64,8 @@ def warp():
 
     prev = {}
 
+    renpy.game.script.materialize_all()
+
     seenset = set(renpy.game.script.namemap.values())
 
     # This is called to indicate that next can be executed following node.